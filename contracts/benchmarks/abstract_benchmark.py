@@ -0,0 +1,93 @@
+from ..tests.abstract_test import ContractTester, accounts, keys
+from ethereum import tester as t
+import time
+
+
+class AbstractBenchmark(object):
+    """
+    Deploys the basic framework into a tester state and records gas and wall time of contract calls. Contracts are
+    compiled and deployed by a ContractTester. Subclasses implement run_cases.
+    run all benchmarks with python -m contracts.benchmarks.run
+    """
+
+    # Event and market creation for many outcomes is above the default gas limit
+    GAS_LIMIT = 4712388 * 100
+    # Outcome counts are passed as uint8 to markets and futarchy oracles
+    MAX_MARKET_OUTCOME_COUNT = 255
+    FEE = 50000  # 5%
+
+    def __init__(self):
+        self.tester = ContractTester()
+        t.gas_limit = self.GAS_LIMIT
+        self.results = []
+        self.description_count = 0
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
+        self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.ether_market_trader = self.create_contract('Markets/EtherMarketTrader.sol', params=[self.ether_token])
+        self.event_abi = self.create_abi('Events/CategoricalEvent.sol')
+        self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
+        self.oracle_abi = self.create_abi('Oracles/CentralizedOracle.sol')
+
+    @property
+    def s(self):
+        return self.tester.s
+
+    def create_contract(self, path, params=None, libraries=None, sender=None):
+        return self.tester.create_contract(path, params, libraries, sender)
+
+    def create_abi(self, path):
+        return self.tester.create_abi(path)
+
+    def contract_at(self, address, abi):
+        return self.tester.contract_at(address, abi)
+
+    def profile(self, contract, name, *args, **kwargs):
+        return self.tester.profile(contract, name, *args, **kwargs)
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        """Measures all cases of the benchmark for an outcome count. Runs no cases by default."""
+        pass
+
+    def measure(self, case, params, function, *args, **kwargs):
+        kwargs['profiling'] = True
+        start = time.time()
+        profiling = function(*args, **kwargs)
+        wall_time = time.time() - start
+        self.results.append({
+            'case': case,
+            'params': params,
+            'gas': profiling['gas'],
+            'time': wall_time
+        })
+        return profiling['output']
+
+    def create_oracle(self):
+        # Every event needs a new oracle as events are unique per oracle and outcome count
+        self.description_count += 1
+        description_hash = format(self.description_count, 'x').zfill(64).decode('hex')
+        return self.contract_at(self.centralized_oracle_factory.createCentralizedOracle(description_hash),
+                                self.oracle_abi)
+
+    def deposit_and_approve(self, spender, amount, sender):
+        self.ether_token.deposit(value=amount, sender=keys[sender])
+        self.ether_token.approve(spender, amount, sender=keys[sender])
+
+    def create_market(self, outcome_count, creator, params=None):
+        # Market creation is measured if params are given
+        oracle = self.create_oracle()
+        event = self.contract_at(
+            self.event_factory.createCategoricalEvent(self.ether_token.address, oracle.address, outcome_count),
+            self.event_abi
+        )
+        if params is None:
+            market_address = self.market_factory.createMarket(event.address, self.lmsr.address, self.FEE,
+                                                              sender=keys[creator])
+        else:
+            market_address = self.measure('DefaultMarketFactory.createMarket', params, self.market_factory.createMarket,
+                                          event.address, self.lmsr.address, self.FEE, sender=keys[creator])
+        market = self.contract_at(market_address, self.market_abi)
+        return oracle, event, market
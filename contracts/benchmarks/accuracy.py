@@ -0,0 +1,98 @@
+from .abstract_benchmark import AbstractBenchmark
+from decimal import Decimal, getcontext
+import click
+import json
+import logging
+import random
+import time
+
+
+# create logger
+logger = logging.getLogger('BENCHMARK')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+getcontext().prec = 100
+
+ONE = 2**64
+# e**x overflows 256 bits for larger inputs
+EXP_MAX_INPUT = 133 * ONE
+LN_MAX_INPUT = 2**256 - 1
+# relative errors of ln are only meaningful away from ln(1) = 0, smaller results are covered by the absolute error
+LN_MIN_RELATIVE_RESULT = Decimal(ONE) / 1024
+# max errors of the series based implementations replaced in Math, measured with the same sweep. The previous ln
+# additionally wrapped around for x = ONE and was off by up to 78% for x >= ONE * 2**191, which is excluded here.
+PREVIOUS_MAX_RELATIVE_ERROR = {'exp': 1.08e-5, 'ln': 5.22e-10}
+
+
+def exact_exp(x):
+    return (Decimal(x) / ONE).exp() * ONE
+
+
+def exact_ln(x):
+    return (Decimal(x) / ONE).ln() * ONE
+
+
+def get_inputs(function, samples, seed):
+    """Returns edge cases, log uniform inputs across the domain and uniform inputs in [ONE, 2 * ONE)"""
+    generator = random.Random(seed)
+    if function == 'exp':
+        inputs = [0, 1, ONE - 1, ONE, EXP_MAX_INPUT]
+        inputs += [int(EXP_MAX_INPUT * generator.random()) for _ in range(samples)]
+        inputs += [generator.randrange(ONE) for _ in range(samples)]
+    else:
+        inputs = [ONE, ONE + 1, 2 * ONE - 1, 2 * ONE, LN_MAX_INPUT]
+        inputs += [int(ONE * 2 ** generator.uniform(0, 191.9)) for _ in range(samples)]
+        inputs += [ONE + generator.randrange(ONE) for _ in range(samples)]
+    return inputs
+
+
+def sweep(math, function, samples, seed=0):
+    """Returns max relative and absolute error in units of ONE and the inputs causing them"""
+    exact = exact_exp if function == 'exp' else exact_ln
+    max_relative = max_absolute = Decimal(0)
+    max_relative_input = max_absolute_input = None
+    for x in get_inputs(function, samples, seed):
+        expected = exact(x)
+        error = abs(Decimal(getattr(math, function)(x)) - expected)
+        if error > max_absolute:
+            max_absolute, max_absolute_input = error, x
+        if function == 'exp' or expected >= LN_MIN_RELATIVE_RESULT:
+            if error / expected > max_relative:
+                max_relative, max_relative_input = error / expected, x
+    return {
+        'function': function,
+        'samples': 2 * samples + 5,
+        'max_relative_error': float(max_relative),
+        'max_relative_error_input': max_relative_input,
+        'max_absolute_error': float(max_absolute / ONE),
+        'max_absolute_error_input': max_absolute_input
+    }
+
+
+@click.command()
+@click.option('--samples', default=1000, help='Number of random inputs per range and function')
+@click.option('--seed', default=0, help='Seed of random inputs')
+@click.option('--output', default='accuracy.json', help='File results are written to')
+def setup(samples, seed, output):
+    math = AbstractBenchmark().math
+    results = []
+    for function in ('exp', 'ln'):
+        result = sweep(math, function, samples, seed)
+        logger.info('{}: max relative error {:.3e} (previously {:.3e}) at {}, max absolute error {:.3e} at {}'.format(
+            function, result['max_relative_error'], PREVIOUS_MAX_RELATIVE_ERROR[function],
+            result['max_relative_error_input'], result['max_absolute_error'], result['max_absolute_error_input']))
+        if result['max_relative_error'] > PREVIOUS_MAX_RELATIVE_ERROR[function]:
+            logger.error('{} is less accurate than the previous implementation'.format(function))
+        results.append(result)
+    with open(output, 'w') as results_file:
+        json.dump({'created': int(time.time()), 'seed': seed, 'results': results}, results_file, indent=2,
+                  sort_keys=True)
+    logger.info('Results written to {}'.format(output))
+
+if __name__ == '__main__':
+    setup()
@@ -0,0 +1,27 @@
+from .abstract_benchmark import AbstractBenchmark, keys
+
+
+class Benchmark(AbstractBenchmark):
+    """
+    Event creation and redemption across outcome counts
+    """
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        holder = 1
+        params = {'outcome_count': outcome_count}
+        oracle = self.create_oracle()
+        event = self.contract_at(
+            self.measure('EventFactory.createCategoricalEvent', params, self.event_factory.createCategoricalEvent,
+                         self.ether_token.address, oracle.address, outcome_count),
+            self.event_abi
+        )
+        for funding in fundings:
+            params = {'outcome_count': outcome_count, 'funding': funding}
+            self.deposit_and_approve(event.address, funding, holder)
+            self.measure('CategoricalEvent.buyAllOutcomes', params, event.buyAllOutcomes, funding,
+                         sender=keys[holder])
+        # Redeem winnings of last outcome
+        oracle.setOutcome(outcome_count - 1)
+        event.setWinningOutcome()
+        self.measure('CategoricalEvent.redeemWinnings', {'outcome_count': outcome_count}, event.redeemWinnings,
+                     sender=keys[holder])
@@ -0,0 +1,74 @@
+from .abstract_benchmark import AbstractBenchmark, keys
+
+
+class Benchmark(AbstractBenchmark):
+    """
+    Market and campaign creation, funding, trading and closing across outcome counts, funding levels and trade sizes
+    """
+
+    def __init__(self):
+        super(Benchmark, self).__init__()
+        self.campaign_factory = self.create_contract('Markets/CampaignFactory.sol')
+        self.campaign_abi = self.create_abi('Markets/Campaign.sol')
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        investor = 0
+        trader = 1
+        outcome = 0
+        if outcome_count > self.MAX_MARKET_OUTCOME_COUNT:
+            return
+        for funding in fundings:
+            params = {'outcome_count': outcome_count, 'funding': funding}
+            oracle, event, market = self.create_market(outcome_count, investor, params)
+            self.deposit_and_approve(market.address, funding, investor)
+            self.measure('DefaultMarket.fund', params, market.fund, funding, sender=keys[investor])
+            for trade_size in trade_sizes:
+                params = {'outcome_count': outcome_count, 'funding': funding, 'trade_size': trade_size}
+                # Buy
+                costs = self.measure('LMSRMarketMaker.calcCosts', params, self.lmsr.calcCosts, market.address,
+                                     outcome, trade_size)
+                costs += market.calcMarketFee(costs)
+                self.deposit_and_approve(market.address, costs, trader)
+                self.measure('DefaultMarket.buy', params, market.buy, outcome, trade_size, costs,
+                             sender=keys[trader])
+                # Sell
+                profits = self.lmsr.calcProfits(market.address, outcome, trade_size)
+                profits -= market.calcMarketFee(profits)
+                event.approveOutcomeTokens(outcome, market.address, trade_size, sender=keys[trader])
+                self.measure('DefaultMarket.sell', params, market.sell, outcome, trade_size, profits,
+                             sender=keys[trader])
+                # Buy and sell with Ether in one transaction each
+                costs = self.lmsr.calcCosts(market.address, outcome, trade_size)
+                costs += market.calcMarketFee(costs)
+                self.measure('EtherMarketTrader.buy', params, self.ether_market_trader.buy, market.address, outcome,
+                             trade_size, value=costs, sender=keys[trader])
+                profits = self.lmsr.calcProfits(market.address, outcome, trade_size)
+                profits -= market.calcMarketFee(profits)
+                event.approveOutcomeTokens(outcome, self.ether_market_trader.address, trade_size, sender=keys[trader])
+                self.measure('EtherMarketTrader.sell', params, self.ether_market_trader.sell, market.address, outcome,
+                             trade_size, profits, sender=keys[trader])
+                # Short sell
+                profits = self.lmsr.calcProfits(market.address, outcome, trade_size)
+                profits -= market.calcMarketFee(profits)
+                self.deposit_and_approve(market.address, trade_size, trader)
+                self.measure('DefaultMarket.shortSell', params, market.shortSell, outcome, trade_size, profits,
+                             sender=keys[trader])
+            self.measure('DefaultMarket.close', {'outcome_count': outcome_count, 'funding': funding},
+                         market.close, sender=keys[investor])
+            # Crowdfund a market with a campaign
+            params = {'outcome_count': outcome_count, 'funding': funding}
+            event = self.contract_at(
+                self.event_factory.createCategoricalEvent(self.ether_token.address, self.create_oracle().address,
+                                                          outcome_count),
+                self.event_abi
+            )
+            deadline = self.s.block.timestamp + 60*60  # in 1h
+            campaign = self.contract_at(
+                self.measure('CampaignFactory.createCampaigns', params, self.campaign_factory.createCampaigns,
+                             event.address, self.market_factory.address, self.lmsr.address, self.FEE, funding,
+                             deadline, sender=keys[investor]),
+                self.campaign_abi
+            )
+            self.deposit_and_approve(campaign.address, funding, investor)
+            self.measure('Campaign.fund', params, campaign.fund, funding, sender=keys[investor])
+            self.measure('Campaign.createMarket', params, campaign.createMarket, sender=keys[investor])
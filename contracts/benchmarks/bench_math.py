@@ -0,0 +1,22 @@
+from .abstract_benchmark import AbstractBenchmark
+
+ONE = 2**64
+
+
+class Benchmark(AbstractBenchmark):
+    """
+    Math library functions across input magnitudes. They don't depend on the outcome count, so they are only
+    measured for the first one.
+    """
+
+    INPUTS = (ONE, ONE * 3 / 2, ONE * 10, ONE * 100, ONE * 2**64, ONE * 2**127 + 1)
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        if self.results:
+            return
+        for x in self.INPUTS:
+            params = {'x': x}
+            self.measure('Math.ln', params, self.math.ln, x)
+            self.measure('Math.floorLog2', params, self.math.floorLog2, x)
+            if x <= ONE * 100:
+                self.measure('Math.exp', params, self.math.exp, x)
@@ -0,0 +1,57 @@
+from .abstract_benchmark import AbstractBenchmark, keys
+
+
+class Benchmark(AbstractBenchmark):
+    """
+    Futarchy oracle resolution across outcome counts and ultimate oracle creation, challenges and resolution
+    """
+
+    def __init__(self):
+        super(Benchmark, self).__init__()
+        self.futarchy_factory = self.create_contract('Oracles/FutarchyOracleFactory.sol', params=[self.event_factory])
+        self.futarchy_abi = self.create_abi('Oracles/FutarchyOracle.sol')
+        self.ultimate_factory = self.create_contract('Oracles/UltimateOracleFactory.sol')
+        self.ultimate_abi = self.create_abi('Oracles/UltimateOracle.sol')
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        creator = 0
+        lower = -100
+        upper = 100
+        if outcome_count > self.MAX_MARKET_OUTCOME_COUNT:
+            return
+        for funding in fundings:
+            params = {'outcome_count': outcome_count, 'funding': funding}
+            oracle = self.create_oracle()
+            deadline = self.s.block.timestamp + 60*60  # in 1h
+            futarchy = self.contract_at(
+                self.measure('FutarchyOracleFactory.createFutarchyOracle', params,
+                             self.futarchy_factory.createFutarchyOracle, self.ether_token.address, oracle.address,
+                             outcome_count, lower, upper, self.market_factory.address, self.lmsr.address, self.FEE,
+                             deadline, sender=keys[creator]),
+                self.futarchy_abi
+            )
+            self.deposit_and_approve(futarchy.address, funding, creator)
+            self.measure('FutarchyOracle.fund', params, futarchy.fund, funding, sender=keys[creator])
+            self.s.block.timestamp = deadline
+            self.measure('FutarchyOracle.setOutcome', params, futarchy.setOutcome)
+            # Ultimate oracle doesn't depend on outcome count or funding, it is measured once per outcome count
+            if funding != fundings[0]:
+                continue
+            params = {'outcome_count': outcome_count}
+            challenge_period = 200  # 200s
+            challenge_amount = 100  # 100 Wei
+            front_runner_period = 50  # 50s
+            ultimate = self.contract_at(
+                self.measure('UltimateOracleFactory.createUltimateOracle', params,
+                             self.ultimate_factory.createUltimateOracle, oracle.address, self.ether_token.address, 3,
+                             challenge_period, challenge_amount, front_runner_period),
+                self.ultimate_abi
+            )
+            oracle.setOutcome(1)
+            self.measure('UltimateOracle.setOutcome', params, ultimate.setOutcome)
+            self.deposit_and_approve(ultimate.address, challenge_amount, creator)
+            self.measure('UltimateOracle.challengeOutcome', params, ultimate.challengeOutcome, 2,
+                         sender=keys[creator])
+            self.measure('UltimateOracle.isOutcomeSet', params, ultimate.isOutcomeSet)
+            self.s.block.timestamp += front_runner_period + 1
+            self.measure('UltimateOracle.getOutcome', params, ultimate.getOutcome)
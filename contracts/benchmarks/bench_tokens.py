@@ -0,0 +1,25 @@
+from .abstract_benchmark import AbstractBenchmark, accounts, keys
+
+
+class Benchmark(AbstractBenchmark):
+    """
+    Ether token issuance, transfers and revocation across amounts. Token functions don't depend on the outcome count,
+    so they are only measured for the first one.
+    """
+
+    def run_cases(self, outcome_count, fundings, trade_sizes):
+        if self.results:
+            return
+        holder = 1
+        receiver = 2
+        spender = 3
+        for amount in trade_sizes:
+            params = {'amount': amount}
+            self.measure('EtherToken.deposit', params, self.ether_token.deposit, value=amount * 2,
+                         sender=keys[holder])
+            self.measure('EtherToken.transfer', params, self.ether_token.transfer, accounts[receiver], amount,
+                         sender=keys[holder])
+            self.ether_token.approve(accounts[spender], amount, sender=keys[holder])
+            self.measure('EtherToken.transferFrom', params, self.ether_token.transferFrom, accounts[holder],
+                         accounts[receiver], amount, sender=keys[spender])
+            self.measure('EtherToken.withdraw', params, self.ether_token.withdraw, amount, sender=keys[receiver])
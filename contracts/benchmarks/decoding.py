@@ -0,0 +1,86 @@
+from ..ethdecoder import EthDecoder
+import click
+import json
+import logging
+import random
+import time
+
+
+# create logger
+logger = logging.getLogger('BENCHMARK')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+EVENTS = ('Transfer(address,address,uint256)', 'CategoricalEventCreation(address,address,address,address,uint256)',
+          'ScalarEventCreation(address,address,address,address,int256,int256)',
+          'CampaignCreation(address,address,address,address,address,uint256,uint256,uint256)')
+
+
+def word(value):
+    return '{:064x}'.format(value % 2**256)
+
+
+def create_logs(decoder, count, seed):
+    """Returns logs in eth_getLogs format with random arguments of the benchmarked events"""
+    generator = random.Random(seed)
+    templates = [(topic, event_decoder) for (topic, _), event_decoder in decoder.events.items()
+                 if event_decoder.record.__name__ + '(' + ','.join(event_decoder.types) + ')' in EVENTS]
+    logs = []
+    for i in range(count):
+        topic, event_decoder = templates[i % len(templates)]
+        topics = [topic]
+        data = []
+        for _type, is_indexed in zip(event_decoder.types, event_decoder.indexed):
+            value = generator.getrandbits(160) if _type == 'address' else generator.getrandbits(64)
+            if is_indexed:
+                topics.append('0x' + word(value))
+            else:
+                data.append(word(value))
+        logs.append({
+            'address': '0x' + word(generator.getrandbits(160))[24:],
+            'topics': topics,
+            'data': '0x' + ''.join(data),
+            'blockNumber': hex(i // 10).rstrip('L'),
+            'transactionHash': '0x' + word(generator.getrandbits(256)),
+            'logIndex': hex(i % 10).rstrip('L')
+        })
+    return logs
+
+
+def decode_with_abi(decoder, logs):
+    """Decodes logs one by one with pyethereum's ABI decoder, the approach replaced by the decoder's fast path"""
+    from ethereum.abi import decode_abi
+    records = []
+    for log in logs:
+        event_decoder = decoder.events[(log['topics'][0], len(log['topics']))]
+        records.append(decode_abi(event_decoder.data_types, log['data'][2:].decode('hex')))
+    return records
+
+
+@click.command()
+@click.option('--count', default=100000, help='Number of decoded logs')
+@click.option('--seed', default=0, help='Seed of random arguments')
+@click.option('--output', default='decoding.json', help='File results are written to')
+def setup(count, seed, output):
+    start = time.time()
+    decoder = EthDecoder()
+    load_time = time.time() - start
+    logger.info('Loaded {} events and {} functions in {:.3f}s'.format(len(decoder.events), len(decoder.functions),
+                                                                      load_time))
+    logs = create_logs(decoder, count, seed)
+    results = {'created': int(time.time()), 'count': count, 'load_time': load_time}
+    for case, function in (('decoder', decoder.decode_logs), ('decode_abi', lambda l: decode_with_abi(decoder, l))):
+        start = time.time()
+        function(logs)
+        results[case] = time.time() - start
+        logger.info('{}: {:.3f}s, {:.0f} logs/s'.format(case, results[case], count / results[case]))
+    with open(output, 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+    logger.info('Results written to {}'.format(output))
+
+if __name__ == '__main__':
+    setup()
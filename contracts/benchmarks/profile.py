@@ -0,0 +1,78 @@
+from .abstract_benchmark import AbstractBenchmark, keys
+from ..ethprofiler import EthProfiler
+import click
+import json
+import logging
+
+
+# create logger
+logger = logging.getLogger('PROFILE')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+CASES = ('futarchy', 'short-sell')
+
+
+class Profile(AbstractBenchmark):
+    """
+    Profiles futarchy oracle creation and market short sells operation by operation.
+    """
+
+    def profile_futarchy(self, outcome_count, funding, trade_size):
+        futarchy_factory = self.create_contract('Oracles/FutarchyOracleFactory.sol', params=[self.event_factory])
+        self.create_abi('Oracles/FutarchyOracle.sol')
+        self.create_abi('Events/ScalarEvent.sol')
+        oracle = self.create_oracle()
+        deadline = self.s.block.timestamp + 60*60  # in 1h
+        return self.profile(futarchy_factory, 'createFutarchyOracle', self.ether_token.address, oracle.address,
+                            outcome_count, -100, 100, self.market_factory.address, self.lmsr.address, self.FEE,
+                            deadline)
+
+    def profile_short_sell(self, outcome_count, funding, trade_size):
+        investor = 0
+        trader = 1
+        outcome = 0
+        oracle, event, market = self.create_market(outcome_count, investor)
+        self.deposit_and_approve(market.address, funding, investor)
+        market.fund(funding, sender=keys[investor])
+        profits = self.lmsr.calcProfits(market.address, outcome, trade_size)
+        profits -= market.calcMarketFee(profits)
+        self.deposit_and_approve(market.address, trade_size, trader)
+        return self.profile(market, 'shortSell', outcome, trade_size, profits, sender=keys[trader])
+
+
+def log_top(profile, group, count):
+    entries = sorted(profile[group].items(), key=lambda item: item[1]['gas'], reverse=True)[:count]
+    for name, entry in entries:
+        logger.info('{:>40} {:>10} gas {:>6.2f}% {:>8} times'.format(
+            name, entry['gas'], entry['gas'] * 100.0 / profile['gas'] if profile['gas'] else 0, entry['count']))
+
+
+@click.command()
+@click.option('--case', type=click.Choice(CASES), default='short-sell', help='Profiled call')
+@click.option('--outcome-count', default=2, help='Number of outcomes of profiled event')
+@click.option('--funding', default=10**18, help='Market funding')
+@click.option('--trade-size', default=10**15, help='Number of short sold outcome tokens')
+@click.option('--top', default=10, help='Number of opcodes, contracts and functions logged')
+@click.option('--output', default='profile.folded', help='File stacks are written to, input of flamegraph.pl')
+@click.option('--json-output', help='File profile is written to as JSON')
+def setup(case, outcome_count, funding, trade_size, top, output, json_output):
+    profile_case = getattr(Profile(), 'profile_{}'.format(case.replace('-', '_')))
+    _, profile = profile_case(outcome_count, funding, trade_size)
+    logger.info('{} operations using {} gas'.format(profile['count'], profile['gas']))
+    for group in ('functions', 'contracts', 'opcodes'):
+        logger.info('Top {}:'.format(group))
+        log_top(profile, group, top)
+    with open(output, 'w') as stacks_file:
+        stacks_file.write('\n'.join(EthProfiler.get_folded_stacks(profile)) + '\n')
+    logger.info('Stacks written to {}'.format(output))
+    if json_output:
+        with open(json_output, 'w') as profile_file:
+            json.dump(profile, profile_file, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    setup()
@@ -0,0 +1,100 @@
+from ethereum.tester import TransactionFailed
+from importlib import import_module
+import click
+import json
+import logging
+import time
+
+
+# create logger
+logger = logging.getLogger('BENCHMARK')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+BENCHMARKS = ('events', 'markets', 'math', 'oracles', 'tokens')
+
+
+def parse_list(string):
+    return [int(x) for x in string.split(',') if x]
+
+
+def result_key(result):
+    return result['case'], tuple(sorted(result['params'].items()))
+
+
+def format_params(params):
+    return ', '.join('{}={}'.format(k, v) for k, v in sorted(params.items()))
+
+
+def run_benchmarks(names, outcome_counts, fundings, trade_sizes):
+    results = []
+    for name in names:
+        benchmark = import_module('contracts.benchmarks.bench_{}'.format(name)).Benchmark()
+        for outcome_count in outcome_counts:
+            logger.info('Running {} benchmark for {} outcomes'.format(name, outcome_count))
+            try:
+                benchmark.run_cases(outcome_count, fundings, trade_sizes)
+            except TransactionFailed:
+                logger.error('{} benchmark failed for {} outcomes'.format(name, outcome_count))
+                benchmark.results.append({
+                    'case': name,
+                    'params': {'outcome_count': outcome_count},
+                    'gas': None,
+                    'time': None,
+                    'error': 'TransactionFailed'
+                })
+        results += benchmark.results
+    return results
+
+
+def compare(previous_results, results):
+    """Returns (case, params, previous gas, gas, previous time, time) for results contained in both runs"""
+    previous = dict((result_key(r), r) for r in previous_results)
+    rows = []
+    for result in results:
+        key = result_key(result)
+        if key in previous:
+            rows.append((result['case'], result['params'], previous[key]['gas'], result['gas'],
+                         previous[key]['time'], result['time']))
+    return rows
+
+
+def relative_change(before, after):
+    if not before or after is None:
+        return 'n/a'
+    return '{:+.2f}%'.format((after - before) * 100.0 / before)
+
+
+@click.command()
+@click.option('--output', default='benchmark.json', help='File results are written to')
+@click.option('--compare-to', help='Results file of a previous run')
+@click.option('--benchmarks', default=','.join(BENCHMARKS), help='Comma separated list of benchmarks to run')
+@click.option('--outcome-counts', default='2,4,8,16,32,64,128,255', help='Comma separated list of outcome counts')
+@click.option('--fundings', default='{},{}'.format(10**18, 10**20), help='Comma separated list of market fundings')
+@click.option('--trade-sizes', default='{},{}'.format(10**15, 10**17), help='Comma separated list of trade sizes')
+def setup(output, compare_to, benchmarks, outcome_counts, fundings, trade_sizes):
+    names = [name for name in benchmarks.split(',') if name]
+    for name in names:
+        if name not in BENCHMARKS:
+            raise click.BadParameter('Unknown benchmark {}'.format(name))
+    results = run_benchmarks(names, parse_list(outcome_counts), parse_list(fundings), parse_list(trade_sizes))
+    with open(output, 'w') as results_file:
+        json.dump({'created': int(time.time()), 'results': results}, results_file, indent=2, sort_keys=True)
+    logger.info('{} results written to {}'.format(len(results), output))
+    if compare_to:
+        with open(compare_to, 'r') as previous_file:
+            previous_results = json.load(previous_file)['results']
+        logger.info('-' * 96)
+        for case, params, previous_gas, gas, previous_time, wall_time in compare(previous_results, results):
+            logger.info('{} ({}): gas {} -> {} ({}), time {}'.format(
+                case, format_params(params), previous_gas, gas, relative_change(previous_gas, gas),
+                relative_change(previous_time, wall_time)
+            ))
+        logger.info('-' * 96)
+
+if __name__ == '__main__':
+    setup()
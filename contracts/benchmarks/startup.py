@@ -0,0 +1,68 @@
+from contracts import ROOT_DIR
+import click
+import json
+import logging
+import subprocess
+import sys
+import time
+
+
+# create logger
+logger = logging.getLogger('BENCHMARK')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+# modules which should only be loaded by invocations needing them
+HEAVY_MODULES = ('ethereum._solidity', 'ethereum.abi', 'ethereum.transactions', 'ethereum.utils', 'rlp', 'ethjsonrpc')
+
+CASES = (
+    ('import ethdeploy', ['-c', 'import ethdeploy']),
+    ('import ethabi', ['-c', 'import ethabi']),
+    ('ethdeploy --help', ['ethdeploy.py', '--help']),
+    ('ethabi --help', ['ethabi.py', '--help'])
+)
+
+
+def measure(arguments, runs):
+    """Returns sorted wall times in seconds of running the python interpreter with arguments"""
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable] + arguments, cwd=ROOT_DIR, stdout=open('/dev/null', 'w'))
+        times.append(time.time() - start)
+    return sorted(times)
+
+
+def loaded_heavy_modules(module):
+    output = subprocess.check_output([sys.executable, '-c', 'import sys, {}; print(" ".join(sys.modules))'.format(
+        module)], cwd=ROOT_DIR)
+    modules = output.decode().split()
+    return [m for m in HEAVY_MODULES if m in modules]
+
+
+@click.command()
+@click.option('--runs', default=10, help='Number of runs per case')
+@click.option('--output', default='startup.json', help='File results are written to')
+def setup(runs, output):
+    results = []
+    for case, arguments in CASES:
+        times = measure(arguments, runs)
+        result = {'case': case, 'min': times[0], 'median': times[len(times) // 2], 'max': times[-1]}
+        logger.info('{}: min {:.3f}s, median {:.3f}s, max {:.3f}s'.format(case, times[0], times[len(times) // 2],
+                                                                          times[-1]))
+        if case.startswith('import '):
+            result['heavy_modules'] = loaded_heavy_modules(case.split()[1])
+            logger.info('{} loads {}'.format(case, ', '.join(result['heavy_modules']) if result['heavy_modules']
+                                             else 'no heavy modules'))
+        results.append(result)
+    with open(output, 'w') as results_file:
+        json.dump({'created': int(time.time()), 'runs': runs, 'results': results}, results_file, indent=2,
+                  sort_keys=True)
+    logger.info('Results written to {}'.format(output))
+
+if __name__ == '__main__':
+    setup()
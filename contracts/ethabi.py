@@ -1,4 +1,3 @@
-from ethereum import _solidity
 from subprocess import CalledProcessError
 import click
 import json
@@ -19,11 +18,19 @@ logger.addHandler(ch)
 class EthABI:
 
     def __init__(self, f, contract_dir, abi_dir):
-        self.solidity = _solidity.solc_wrapper()
+        self._solidity = None
         self.f = f
         self.contract_dir = contract_dir
         self.abi_dir = abi_dir
 
+    @property
+    def solidity(self):
+        # solc wrapper is created on first compilation
+        if self._solidity is None:
+            from ethereum import _solidity
+            self._solidity = _solidity.solc_wrapper()
+        return self._solidity
+
     @staticmethod
     def log(string):
         logger.info(string)
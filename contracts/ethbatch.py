@@ -0,0 +1,59 @@
+import json
+import urllib2
+
+
+def http_request(url):
+    """Returns a function sending a JSON-RPC request or batch to url and returning the decoded response"""
+    def request(payload):
+        return json.loads(urllib2.urlopen(urllib2.Request(url, json.dumps(payload),
+                                                          {'Content-Type': 'application/json'})).read())
+    return request
+
+
+def is_successful(receipt, gas):
+    """Returns whether the transaction of a receipt succeeded, by its status if the node reports one"""
+    if receipt.get('status') is not None:
+        return int(receipt['status'], 16) == 1
+    # failed transactions consume all gas provided
+    return int(receipt['gasUsed'], 16) < gas
+
+
+def is_mined(receipt):
+    return isinstance(receipt, dict) and 'gasUsed' in receipt
+
+
+class BatchClient:
+    """Sends one request per parameter list of a method in JSON-RPC batch requests of at most batch_size requests"""
+
+    def __init__(self, request, batch_size=100):
+        # request sends a JSON-RPC batch and returns its responses
+        self.request = request
+        self.batch_size = batch_size
+        self.batches = 0
+
+    def responses(self, method, params_list):
+        """Returns responses ordered like params_list"""
+        responses = []
+        for start in range(0, len(params_list), self.batch_size):
+            payload = [{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                       for i, params in enumerate(params_list[start:start + self.batch_size])]
+            batch_responses = self.request(payload)
+            self.batches += 1
+            if isinstance(batch_responses, dict):
+                raise ValueError('Batch request failed: {}'.format(batch_responses.get('error')))
+            # responses of a batch may arrive in any order
+            responses += sorted(batch_responses, key=lambda response: response['id'])
+        return responses
+
+    def results(self, method, params_list):
+        """Returns results ordered like params_list, error objects for failed requests"""
+        return [response.get('result') if 'error' not in response else response['error']
+                for response in self.responses(method, params_list)]
+
+    def checked_results(self, method, params_list):
+        """Returns results ordered like params_list, raises if any request failed"""
+        responses = self.responses(method, params_list)
+        for i, response in enumerate(responses):
+            if 'error' in response:
+                raise ValueError('Request {} failed: {}'.format(i, response['error']))
+        return [response['result'] for response in responses]
@@ -0,0 +1,267 @@
+from collections import namedtuple
+from ethbatch import BatchClient, http_request
+import click
+import json
+import keyword
+import logging
+import os
+
+
+# create logger
+logger = logging.getLogger('DECODER')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+LOG_FIELDS = ('address', 'block_number', 'transaction_hash', 'log_index')
+TRANSACTION_FIELDS = ('contract', 'sender', 'ether_value', 'transaction_hash', 'block_number')
+
+
+def decode_address(word):
+    return '0x' + word[24:]
+
+
+def decode_bool(word):
+    return int(word, 16) != 0
+
+
+def decode_uint(word):
+    return int(word, 16)
+
+
+def decode_int(word):
+    value = int(word, 16)
+    return value - 2**256 if value >= 2**255 else value
+
+
+def get_word_decoder(_type):
+    """Returns function decoding a hex encoded 32 byte word of a static type or None for other types"""
+    if '[' in _type:
+        return None
+    if _type == 'address':
+        return decode_address
+    if _type == 'bool':
+        return decode_bool
+    if _type.startswith('uint'):
+        return decode_uint
+    if _type.startswith('int'):
+        return decode_int
+    if _type.startswith('bytes') and _type[5:].isdigit():
+        size = int(_type[5:])
+        return lambda word: word[:2 * size].decode('hex')
+    return None
+
+
+def normalize(_type, value):
+    # values decoded by pyethereum encode addresses without 0x prefix
+    if _type.startswith('address'):
+        if isinstance(value, (list, tuple)):
+            return [normalize('address', v) for v in value]
+        return '0x' + value
+    return value
+
+
+def get_field_names(inputs, reserved):
+    names = []
+    for i, argument in enumerate(inputs):
+        name = argument['name'].lstrip('_') or 'arg{}'.format(i)
+        while keyword.iskeyword(name) or name in reserved or name in names:
+            name += '_'
+        names.append(name)
+    return names
+
+
+def strip_hex(value):
+    return value[2:] if value.startswith('0x') else value
+
+
+class Decoder:
+    """Decodes arguments of one event or function, static arguments are sliced from the hex encoded data"""
+
+    def __init__(self, name, types, fields, indexed=None):
+        self.types = types
+        self.indexed = indexed or [False] * len(types)
+        self.record = namedtuple(name, fields)
+        self.data_types = [_type for _type, is_indexed in zip(types, self.indexed) if not is_indexed]
+        word_decoders = [get_word_decoder(_type) for _type in self.data_types]
+        # data can only be sliced into words if all non indexed arguments are static
+        self.word_decoders = word_decoders if None not in word_decoders else None
+        # indexed dynamic arguments are logged as hashes
+        self.topic_decoders = [get_word_decoder(_type) or (lambda word: word.decode('hex'))
+                               for _type, is_indexed in zip(types, self.indexed) if is_indexed]
+
+    def decode_data(self, data):
+        if self.word_decoders is not None:
+            return [decode(data[i * 64:(i + 1) * 64]) for i, decode in enumerate(self.word_decoders)]
+        from ethereum.abi import decode_abi
+        return [normalize(_type, value) for _type, value in zip(self.data_types, decode_abi(self.data_types,
+                                                                                           data.decode('hex')))]
+
+    def decode_arguments(self, topics, data):
+        values = self.decode_data(data)
+        if not self.topic_decoders:
+            return values
+        values = iter(values)
+        topic_values = iter([decode(strip_hex(topic)) for decode, topic in zip(self.topic_decoders, topics)])
+        return [next(topic_values) if is_indexed else next(values) for is_indexed in self.indexed]
+
+
+class EthDecoder:
+    """
+    Decodes logs and transaction input of all contracts in the ABI directory into named tuples. ABIs are loaded once
+    into indexes mapping topics and selectors to decoders, so decoding a batch only needs one dict lookup per item.
+    Log records start with address, block number, transaction hash and log index, transaction records with contract,
+    sender, Ether value, transaction hash and block number, followed by the arguments. Argument names colliding with
+    these fields or Python keywords get a trailing underscore.
+    """
+
+    def __init__(self, abi_dir=None):
+        self.abi_dir = abi_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abi')
+        # events dict maps (topic, topic count) tuples to decoders, functions dict maps selectors to decoders
+        self.events = {}
+        self.functions = {}
+        # types dict maps signatures to record types
+        self.types = {}
+        for file_name in sorted(os.listdir(self.abi_dir)):
+            if file_name.endswith('.json'):
+                with open(os.path.join(self.abi_dir, file_name), 'r') as abi_file:
+                    self.add_abi(json.load(abi_file))
+
+    @staticmethod
+    def get_signature(description):
+        return '{}({})'.format(description['name'], ','.join(argument['type'] for argument in description['inputs']))
+
+    def add_abi(self, abi):
+        from ethereum.utils import sha3
+        for description in abi:
+            if description.get('type') not in ('event', 'function') or description.get('anonymous'):
+                continue
+            signature = self.get_signature(description)
+            types = [argument['type'] for argument in description['inputs']]
+            hash_hex = sha3(signature).encode('hex')
+            if description['type'] == 'event':
+                indexed = [argument.get('indexed', False) for argument in description['inputs']]
+                key = ('0x' + hash_hex, sum(indexed) + 1)
+                if key not in self.events:
+                    fields = LOG_FIELDS + tuple(get_field_names(description['inputs'], LOG_FIELDS))
+                    self.events[key] = Decoder(description['name'], types, fields, indexed)
+                    self.types[signature] = self.events[key].record
+            else:
+                selector = '0x' + hash_hex[:8]
+                if selector not in self.functions:
+                    fields = TRANSACTION_FIELDS + tuple(get_field_names(description['inputs'], TRANSACTION_FIELDS))
+                    self.functions[selector] = Decoder(description['name'], types, fields)
+                    self.types[signature] = self.functions[selector].record
+
+    def decode_log(self, log):
+        """Returns record of a log as returned by eth_getLogs or None if its event is unknown"""
+        records = self.decode_logs([log])
+        return records[0] if records else None
+
+    def decode_logs(self, logs):
+        """Returns records of all logs with known events"""
+        events = self.events
+        records = []
+        for log in logs:
+            topics = log['topics']
+            decoder = events.get((topics[0], len(topics))) if topics else None
+            if decoder is not None:
+                records.append(decoder.record(
+                    log['address'], int(log['blockNumber'], 16), log['transactionHash'], int(log['logIndex'], 16),
+                    *decoder.decode_arguments(topics[1:], strip_hex(log['data']))
+                ))
+        return records
+
+    def decode_transaction(self, transaction):
+        """Returns record of a transaction as returned by eth_getTransactionByHash or None if its function is unknown"""
+        records = self.decode_transactions([transaction])
+        return records[0] if records else None
+
+    def decode_transactions(self, transactions):
+        """Returns records of all transactions calling known functions"""
+        functions = self.functions
+        records = []
+        for transaction in transactions:
+            data = transaction.get('input') or '0x'
+            decoder = functions.get(data[:10])
+            if decoder is not None and transaction.get('to'):
+                block_number = transaction.get('blockNumber')
+                records.append(decoder.record(
+                    transaction['to'], transaction.get('from'), int(transaction.get('value') or '0x0', 16),
+                    transaction.get('hash'), int(block_number, 16) if block_number else None,
+                    *decoder.decode_arguments([], data[10:])
+                ))
+        return records
+
+
+def to_dict(record):
+    result = dict(record._asdict())
+    result['type'] = type(record).__name__
+    for name, value in result.items():
+        # bytes values are written hex encoded
+        if isinstance(value, str) and not value.startswith('0x') and name != 'type':
+            result[name] = '0x' + value.encode('hex')
+    return result
+
+
+class NodeReader:
+    """Reads logs and transactions of a block range in JSON-RPC batch requests"""
+
+    def __init__(self, protocol, host, port, batch_size=100):
+        self.request = http_request('{}://{}:{}'.format(protocol, host, port))
+        self.client = BatchClient(self.request, batch_size)
+
+    def get_logs(self, from_block, to_block, block_step, addresses=None):
+        ranges = [(start, min(start + block_step - 1, to_block)) for start in range(from_block, to_block + 1,
+                                                                                   block_step)]
+        params_list = []
+        for start, end in ranges:
+            filter_object = {'fromBlock': hex(start).rstrip('L'), 'toBlock': hex(end).rstrip('L')}
+            if addresses:
+                filter_object['address'] = addresses
+            params_list.append([filter_object])
+        return [log for logs in self.client.checked_results('eth_getLogs', params_list) for log in logs]
+
+    def get_transactions(self, from_block, to_block):
+        params_list = [[hex(number).rstrip('L'), True] for number in range(from_block, to_block + 1)]
+        return [transaction for block in self.client.checked_results('eth_getBlockByNumber', params_list) if block
+                for transaction in block['transactions']]
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--from-block', default=0, help='First block to decode')
+@click.option('--to-block', required=True, type=int, help='Last block to decode')
+@click.option('--block-step', default=1000, help='Number of blocks per eth_getLogs request')
+@click.option('--addresses', help='Comma separated list of contract addresses logs are read from')
+@click.option('--transactions', is_flag=True, help='Decode transaction input too')
+@click.option('--abi-dir', help='Path to ABI directory')
+@click.option('--output', default='decoded.jsonl', help='File records are written to as JSON Lines')
+def setup(protocol, host, port, from_block, to_block, block_step, addresses, transactions, abi_dir, output):
+    decoder = EthDecoder(abi_dir)
+    reader = NodeReader(protocol, host, port)
+    addresses = [address for address in addresses.split(',') if address] if addresses else None
+    logs = reader.get_logs(from_block, to_block, block_step, addresses)
+    records = decoder.decode_logs(logs)
+    logger.info('Decoded {} of {} logs'.format(len(records), len(logs)))
+    if transactions:
+        block_transactions = reader.get_transactions(from_block, to_block)
+        transaction_records = decoder.decode_transactions(block_transactions)
+        logger.info('Decoded {} of {} transactions'.format(len(transaction_records), len(block_transactions)))
+        records += transaction_records
+    counts = {}
+    with open(output, 'w') as output_file:
+        for record in records:
+            name = type(record).__name__
+            counts[name] = counts.get(name, 0) + 1
+            output_file.write(json.dumps(to_dict(record), sort_keys=True) + '\n')
+    for name, count in sorted(counts.items()):
+        logger.info('{}: {}'.format(name, count))
+
+if __name__ == '__main__':
+    setup()
@@ -1,12 +1,12 @@
-from ethjsonrpc import EthJsonRpc
-from ethereum.abi import ContractTranslator
-from ethereum.transactions import Transaction
-from ethereum.utils import privtoaddr
-from ethereum import _solidity
+from ethjournal import DeployJournal
+from ethinstructions import read_instructions
+from ethlink import link_bytecode
+from ethtransactions import TransactionTracker
+from ethmetrics import DeployMetrics, InstrumentedJsonRpc
 import click
 import time
 import json
-import rlp
+import hashlib
 import logging
 import os
 
@@ -23,19 +23,53 @@ logger.addHandler(ch)
 
 class EthDeploy:
 
-    def __init__(self, protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path):
-        # establish rpc connection
-        self.json_rpc = EthJsonRpc(protocol=protocol, host=host, port=port)
-        self.solidity = _solidity.solc_wrapper()
+    # references are only listed in the summary up to this number
+    SUMMARY_REFERENCE_LIMIT = 100
+
+    def __init__(self, protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path,
+                 dry_run=False, gas_plan_path=None, gas_margin=1.2, nonce=0, journal_path=None, build_cache_path=None,
+                 pipeline=False, pipeline_depth=100, key_pool_path=None, stuck_blocks=20, gas_price_bump=1.125,
+                 max_gas_price=None, endpoints=None, metrics_json_path=None, metrics_prometheus_path=None):
+        self._solidity = None
+        # time spent per phase and json rpc requests per method
+        self.metrics = DeployMetrics()
+        self.metrics_json_path = metrics_json_path
+        self.metrics_prometheus_path = metrics_prometheus_path
         self._from = None
         self.private_key = None
+        if private_key_path and not account:
+            with open(private_key_path, 'r') as private_key_file:
+                self.private_key = private_key_file.read().strip()
+        # lanes list contains addresses of the key pool, each sending with its own nonce sequence
+        self.lanes = []
+        # keys dict maps lane addresses to private keys
+        self.keys = {}
+        if key_pool_path:
+            with open(key_pool_path, 'r') as key_pool_file:
+                for line in key_pool_file:
+                    if line.strip():
+                        address = self.get_address(line.strip())
+                        self.lanes.append(address)
+                        self.keys[address] = line.strip()
+        if dry_run:
+            # execute instructions against a local tester chain
+            private_keys = [key.decode('hex') for key in [self.private_key] + self.keys.values() if key]
+            from ethtester import EthTesterRpc
+            self.json_rpc = EthTesterRpc(private_keys=private_keys, nonce=nonce)
+        elif endpoints:
+            # distribute requests over several nodes
+            from ethmultirpc import MultiEthJsonRpc
+            self.json_rpc = MultiEthJsonRpc(endpoints)
+        else:
+            # establish rpc connection
+            from ethjsonrpc import EthJsonRpc
+            self.json_rpc = EthJsonRpc(protocol=protocol, host=host, port=port)
+        self.json_rpc = InstrumentedJsonRpc(self.json_rpc, self.metrics)
         # set sending account
         if account:
             self._from = self.add_0x(account)
-        elif private_key_path:
-            with open(private_key_path, 'r') as private_key_file:
-                self.private_key = private_key_file.read().strip()
-            self._from = self.add_0x(privtoaddr(self.private_key.decode('hex')).encode('hex'))
+        elif self.private_key:
+            self._from = self.get_address(self.private_key)
         else:
             accounts = self.json_rpc.eth_accounts()['result']
             if len(accounts) == 0:
@@ -48,16 +82,80 @@ class EthDeploy:
         self.contract_dir = contract_dir
         self.gas = gas
         self.gas_price = gas_price
+        # transactions not mined within stuck blocks are replaced with a bumped gas price up to max gas price
+        self.tracker = TransactionTracker(stuck_blocks)
+        self.gas_price_bump = gas_price_bump
+        self.max_gas_price = max_gas_price if max_gas_price else gas_price * 10
+        self.dry_run = dry_run
+        self.gas_plan_path = gas_plan_path
+        self.gas_margin = gas_margin
+        # gas plan maps instruction indexes to gas estimates of a dry run
+        self.gas_plan = {}
+        # gas estimates dict maps instruction indexes to the gas their transaction needs in a dry run
+        self.gas_estimates = {}
+        if gas_plan_path and not dry_run:
+            with open(gas_plan_path, 'r') as gas_plan_file:
+                for entry in json.load(gas_plan_file)['instructions']:
+                    self.gas_plan[entry['index']] = entry['gas']
+        # fail instead of retrying when a transaction is rejected
+        self.fail_fast = dry_run or bool(self.gas_plan)
+        # index of processed instruction
+        self.instruction_index = None
+        self.instruction = None
+        # journal of completed instructions to resume deployments
+        self.journal = DeployJournal(journal_path) if journal_path else None
+        # predict contract addresses and wait for receipts only before calls or when pipeline is full
+        self.pipeline = pipeline or bool(self.lanes)
+        self.pipeline_depth = pipeline_depth
+        # pending list contains sent transactions whose receipts were not verified yet
+        self.pending = []
+        # nonces dict maps sending addresses to their next locally tracked nonce
+        self.nonces = {}
+        # group lanes dict maps instruction groups to the lane all their instructions are sent from
+        self.group_lanes = {}
+        # label lanes dict maps labels of contracts created by the key pool to instruction index and lane creating them
+        self.label_lanes = {}
+        # pending labels set contains labels of contracts whose creating transaction is pending
+        self.pending_labels = set()
+        self.next_lane = 0
+        # lane stats dict maps lane addresses to sent transactions, gas used and send times
+        self.lane_stats = dict((lane, {'transactions': 0, 'gas': 0, 'started': None, 'finished': None})
+                               for lane in self.lanes)
+        # planned instructions of a dry run
+        self.planned_instructions = []
         # references dict maps labels to addresses
         self.references = {}
-        # abis dict maps addresses to abis
+        # abis dict maps addresses to abi hashes
         self.abis = {}
+        # abi store maps abi hashes to abis shared by all addresses
+        self.abi_store = {}
+        # translators dict maps abi hashes to contract translators
+        self.translators = {}
+        # compiled dict maps source keys to unlinked bytecode and abi
+        self.compiled = {}
+        self.build_cache_path = build_cache_path
+        if build_cache_path and os.path.exists(build_cache_path):
+            with open(build_cache_path, 'r') as build_cache_file:
+                self.compiled = json.load(build_cache_file)
+        self.source_hash = None
         # total consumed gas
         self.total_gas = 0
         self.log('Instructions are sent from address: {}'.format(self._from))
         balance = self.hex2int(self.json_rpc.eth_getBalance(self._from)['result'])
         self.log('Address balance: {} Ether / {} Wei'.format(balance/10.0**18, balance))
 
+    @property
+    def solidity(self):
+        # solc wrapper is only created for instructions compiling code
+        if self._solidity is None:
+            from ethereum import _solidity
+            self._solidity = _solidity.solc_wrapper()
+        return self._solidity
+
+    def get_address(self, private_key):
+        from ethereum.utils import privtoaddr
+        return self.add_0x(privtoaddr(private_key.decode('hex')).encode('hex'))
+
     def is_address(self, string):
         return len(self.add_0x(string)) == 42
 
@@ -84,7 +182,7 @@ class EthDeploy:
     def format_reference(self, string):
         return self.add_0x(string) if self.is_address(string) else string
 
-    def log_transaction_receipt(self, transaction_receipt):
+    def log_transaction_receipt(self, transaction_receipt, label=None):
         gas_used = self.hex2int(transaction_receipt['gasUsed'])
         self.total_gas += gas_used
         self.log('Transaction receipt: {} block number, {} gas used, {} cumulative gas used'.format(
@@ -92,15 +190,79 @@ class EthDeploy:
             gas_used,
             self.hex2int(transaction_receipt['cumulativeGasUsed'])
         ))
+        if self.gas_plan and gas_used >= self.get_gas():
+            raise ValueError('Instruction {} used all gas provided'.format(self.instruction_index))
+        if transaction_receipt.get('status') and not self.hex2int(transaction_receipt['status']):
+            # failed transactions are included in a block, but did not change state
+            message = 'Instruction {} failed in transaction {}'.format(self.instruction_index,
+                                                                       transaction_receipt['transactionHash'])
+            if self.fail_fast:
+                raise ValueError(message)
+            self.log(message)
+        if self.dry_run:
+            # gas used is reduced by refunds, so gas limits are planned with the estimate
+            self.planned_instructions.append({
+                'index': self.instruction_index,
+                'label': label,
+                'gas': self.gas_estimates.get(self.instruction_index, gas_used),
+                'gas_used': gas_used,
+                'address': transaction_receipt['contractAddress']
+            })
 
     def get_transaction_receipt(self, transaction_hash):
         return self.json_rpc.eth_getTransactionReceipt(transaction_hash)['result']
 
+    def get_block_number(self):
+        return self.hex2int(self.json_rpc.eth_blockNumber()['result'])
+
     def wait_for_transaction_receipt(self, transaction_hash):
-        while self.get_transaction_receipt(transaction_hash) is None:
-            self.log('Waiting for transaction receipt {}'.format(transaction_hash))
-            time.sleep(5)
-        return self.get_transaction_receipt(transaction_hash)
+        with self.metrics.measure('wait'):
+            while True:
+                # any transaction sent with the same nonce can be mined
+                for sent_hash in self.tracker.get_hashes(transaction_hash):
+                    transaction_receipt = self.get_transaction_receipt(sent_hash)
+                    if transaction_receipt is not None:
+                        self.tracker.include(transaction_hash, transaction_receipt)
+                        return transaction_receipt
+                # block number is only needed to replace stuck transactions
+                block_number = self.get_block_number() if self.tracker.stuck_blocks else None
+                if block_number is not None and self.tracker.is_stuck(transaction_hash, block_number):
+                    self.replace_transaction(transaction_hash, block_number)
+                else:
+                    self.log('Waiting for transaction receipt {}'.format(transaction_hash))
+                    time.sleep(5)
+
+    def bump_gas_price(self, gas_price):
+        return int(gas_price * self.gas_price_bump) + 1
+
+    def replace_transaction(self, transaction_hash, block_number):
+        transaction = self.tracker.get(transaction_hash)
+        gas_price = self.bump_gas_price(transaction['gas_price'])
+        if gas_price > self.max_gas_price:
+            self.log('Transaction {} is stuck but gas price {} would exceed maximum gas price'.format(
+                transaction_hash, gas_price))
+            self.tracker.postpone(transaction_hash, block_number)
+            return
+        replacement_hash, gas_price, _ = self.submit(transaction['from'], transaction['to'], transaction['value'],
+                                                     transaction['data'], transaction['nonce'], gas_price,
+                                                     replacement=True)
+        if replacement_hash is None:
+            # replacement was rejected, e.g. because the transaction was mined meanwhile
+            self.tracker.postpone(transaction_hash, block_number)
+            return
+        replacement_hash = self.add_0x(replacement_hash)
+        self.tracker.replace(transaction_hash, replacement_hash, gas_price, block_number)
+        self.journal_instruction(DeployJournal.SENT, transaction_hash=replacement_hash)
+        self.log('Transaction {} not mined within {} blocks, replaced by {} with gas price {}'.format(
+            transaction_hash, self.tracker.stuck_blocks, replacement_hash, gas_price))
+
+    def log_inclusion_stats(self):
+        stats = self.tracker.get_stats()
+        if stats['transactions']:
+            self.log('Inclusion latency of {} transactions ({} replaced): median {:.1f}s / {} blocks, '
+                     '95th percentile {:.1f}s / {} blocks, max {:.1f}s / {} blocks'.format(
+                         stats['transactions'], stats['replaced'], stats['median_seconds'], stats['median_blocks'],
+                         stats['p95_seconds'], stats['p95_blocks'], stats['max_seconds'], stats['max_blocks']))
 
     def replace_references(self, a):
         if isinstance(a, list):
@@ -108,33 +270,248 @@ class EthDeploy:
         else:
             return self.references[a] if isinstance(a, basestring) and a in self.references else a
 
-    def get_nonce(self):
-        transaction_count = self.json_rpc.eth_getTransactionCount(self._from, default_block='pending')['result']
+    def get_nonce(self, address=None):
+        with self.metrics.measure('nonce'):
+            transaction_count = self.json_rpc.eth_getTransactionCount(address if address else self._from,
+                                                                      default_block='pending')['result']
         return self.hex2int(self.strip_0x(transaction_count))
 
-    def get_raw_transaction(self, to='', value=0, data=''):
-        nonce = self.get_nonce()
-        tx = Transaction(nonce, self.gas_price, self.gas, to, value, data.decode('hex'))
-        tx.sign(self.private_key.decode('hex'))
-        return self.add_0x(rlp.encode(tx).encode('hex'))
+    def get_key(self, _from):
+        if _from and self.add_0x(_from).lower() in self.keys:
+            return self.keys[self.add_0x(_from).lower()]
+        return self.private_key
+
+    def get_sender(self, _from):
+        if _from and self.add_0x(_from).lower() in self.keys:
+            return self.add_0x(_from).lower()
+        # transactions signed with the private key are always sent from its address
+        return self.add_0x(_from if _from and not self.private_key else self._from)
+
+    def get_instruction_references(self, a):
+        if isinstance(a, dict):
+            return [r for v in a.values() for r in self.get_instruction_references(v)]
+        elif isinstance(a, list):
+            return [r for v in a for r in self.get_instruction_references(v)]
+        return [a] if isinstance(a, basestring) else []
+
+    def choose_lane(self, instruction):
+        """Returns lane address an instruction without explicit sender is sent from"""
+        group = instruction.get('group')
+        references = [r for r in self.get_instruction_references(instruction) if r in self.label_lanes]
+        if group is not None and group in self.group_lanes:
+            lane = self.group_lanes[group]
+        elif group is None and references:
+            # instructions are sent from the key which created the latest referenced contract, so creator-only
+            # functions succeed
+            lane = max(self.label_lanes[r] for r in references)[1]
+        else:
+            # groups are independent instruction sequences spread across the key pool
+            lane = self.lanes[self.next_lane % len(self.lanes)]
+            self.next_lane += 1
+            if group is not None:
+                self.group_lanes[group] = lane
+        # instructions referencing contracts created by pending transactions of other lanes are sent after them
+        if any(r in self.pending_labels and self.label_lanes[r][1] != lane for r in references):
+            self.wait_for_pending()
+        label = instruction.get('label')
+        if instruction['type'] == 'deployment' and not label and 'file' in instruction:
+            label = instruction['file'].split('/')[-1].split('.')[0]
+        if label:
+            # labelled transactions create contracts, e.g. with a factory, whose address was read by a labelled call
+            self.label_lanes[label] = (self.instruction_index, lane)
+            self.pending_labels.add(label)
+        return lane
+
+    def log_lane_stats(self):
+        for lane in self.lanes:
+            stats = self.lane_stats[lane]
+            duration = stats['finished'] - stats['started'] if stats['finished'] else 0
+            self.log('Lane {}: {} transactions, {} gas used, {:.2f} transactions/s'.format(
+                lane, stats['transactions'], stats['gas'], stats['transactions'] / duration if duration else 0))
+
+    def reserve_nonce(self, address):
+        if address not in self.nonces:
+            self.nonces[address] = self.get_nonce(address)
+        nonce = self.nonces[address]
+        self.nonces[address] += 1
+        return nonce
+
+    def predict_contract_address(self, address, nonce):
+        from ethereum.utils import mk_contract_address
+        return mk_contract_address(self.strip_0x(address).decode('hex'), nonce).encode('hex')
+
+    def get_gas(self):
+        if self.instruction_index in self.gas_plan:
+            return int(self.gas_plan[self.instruction_index] * self.gas_margin)
+        return self.gas
+
+    def get_raw_transaction(self, to='', value=0, data='', nonce=None, key=None, gas_price=None):
+        from ethereum.transactions import Transaction
+        import rlp
+        key = key if key else self.private_key
+        if nonce is None:
+            nonce = self.get_nonce(self.get_address(key))
+        tx = Transaction(nonce, gas_price if gas_price else self.gas_price, self.get_gas(), to, value,
+                         data.decode('hex'))
+        with self.metrics.measure('sign'):
+            tx.sign(key.decode('hex'))
+            return self.add_0x(rlp.encode(tx).encode('hex'))
+
+    @staticmethod
+    def abi_hash(abi):
+        return hashlib.sha256(json.dumps(abi, sort_keys=True)).hexdigest()
+
+    def store_abi(self, abi):
+        abi_hash = self.abi_hash(abi)
+        if abi_hash not in self.abi_store:
+            self.abi_store[abi_hash] = abi
+        return abi_hash
+
+    def get_abi_hash(self, address, abi):
+        return self.abis[address] if address in self.abis else self.store_abi([abi])
+
+    def get_translator(self, abi_hash):
+        if abi_hash not in self.translators:
+            from ethereum.abi import ContractTranslator
+            self.translators[abi_hash] = ContractTranslator(self.abi_store[abi_hash])
+        return self.translators[abi_hash]
+
+    def journal_instruction(self, status, **kwargs):
+        if self.journal:
+            self.journal.append(self.instruction_index, self.instruction, status, **kwargs)
+
+    def restore_instruction(self, entry):
+        self.total_gas += entry.get('gas_used', 0)
+        self.references.update(entry.get('references', {}))
+        for address, abi in entry.get('abis', {}).iteritems():
+            self.abis[address] = self.store_abi(abi)
+        self.log('Instruction {} was completed in a previous run'.format(self.instruction_index))
+
+    def get_in_flight_transactions(self):
+        if self.journal:
+            return self.journal.get_in_flight_transactions(self.instruction_index, self.instruction)
+        return []
+
+    def estimate_gas(self, sender, to, value, data):
+        with self.metrics.measure('estimate'):
+            response = self.json_rpc.eth_estimateGas(to_address=self.add_0x(to) if to else None, from_address=sender,
+                                                     value=value, data=self.add_0x(data))
+        if 'error' in response:
+            raise ValueError('Gas estimation of instruction {} failed with error {}'.format(
+                self.instruction_index, response['error']['message']))
+        self.gas_estimates[self.instruction_index] = self.hex2int(response['result'])
+
+    def send(self, _from, to, value, data, nonce=None):
+        transaction_hashes = self.get_in_flight_transactions()
+        if transaction_hashes:
+            self.log('Transaction {} was sent in a previous run'.format(', '.join(transaction_hashes)))
+            # receipt of any transaction sent for the instruction is accepted
+            self.tracker.resume([self.add_0x(transaction_hash) for transaction_hash in transaction_hashes])
+            return transaction_hashes[0]
+        sender = self.get_sender(_from)
+        if sender in self.lane_stats:
+            self.lane_stats[sender]['transactions'] += 1
+            if self.lane_stats[sender]['started'] is None:
+                self.lane_stats[sender]['started'] = time.time()
+        # nonce is set explicitly, so stuck transactions can be replaced
+        if nonce is None:
+            nonce = self.get_nonce(sender)
+        if self.dry_run:
+            self.estimate_gas(sender, to, value, data)
+        transaction_hash, gas_price, nonce = self.submit(_from, to, value, data, nonce, self.gas_price)
+        self.tracker.track(self.add_0x(transaction_hash), **{
+            'from': _from, 'to': to, 'value': value, 'data': data, 'nonce': nonce, 'gas_price': gas_price
+        })
+        self.journal_instruction(DeployJournal.SENT, transaction_hash=transaction_hash)
+        return transaction_hash
+
+    def submit(self, _from, to, value, data, nonce, gas_price, replacement=False):
+        """
+        Returns hash, gas price and nonce of accepted transaction, bumping the gas price of underpriced transactions and
+        reading the nonce again if it was rejected
+        """
+        key = self.get_key(_from)
+        delay = 5
+        while True:
+            if key:
+                raw_tx = self.get_raw_transaction(to=to, value=value, data=data, nonce=nonce, key=key,
+                                                  gas_price=gas_price)
+                with self.metrics.measure('submit'):
+                    tx_response = self.json_rpc.eth_sendRawTransaction(raw_tx)
+            else:
+                with self.metrics.measure('submit'):
+                    tx_response = self.json_rpc.eth_sendTransaction(self.add_0x(_from if _from else self._from),
+                                                                    to_address=self.add_0x(to) if to else None,
+                                                                    value=value,
+                                                                    data=self.add_0x(data),
+                                                                    gas=self.get_gas(),
+                                                                    gas_price=gas_price,
+                                                                    nonce=nonce)
+            if 'error' not in tx_response:
+                return tx_response['result'], gas_price, nonce
+            message = tx_response['error']['message']
+            if replacement:
+                self.log('Replacement transaction failed with error {}'.format(message))
+                return None, gas_price, nonce
+            if self.fail_fast:
+                raise ValueError('Instruction {} failed with error {}'.format(self.instruction_index, message))
+            self.log('Transaction failed with error {}'.format(message))
+            if 'underpriced' in message.lower() and self.bump_gas_price(gas_price) <= self.max_gas_price:
+                gas_price = self.bump_gas_price(gas_price)
+                continue
+            if 'nonce' in message.lower():
+                sender = self.get_sender(_from)
+                pending_nonce = self.get_nonce(sender)
+                if pending_nonce != nonce:
+                    # nonce was used by another transaction of the sender, later reserved nonces follow the new one
+                    nonce = pending_nonce
+                    if sender in self.nonces:
+                        self.nonces[sender] = nonce + 1
+                    continue
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def get_absolute_contract_dir(self):
+        return self.contract_dir if self.contract_dir.startswith('/') else '{}/{}'.format(os.getcwd(),
+                                                                                         self.contract_dir)
+
+    def get_source_key(self, code, path):
+        # hash of all contract sources, so cached bytecode is only used if no imported file changed
+        if self.source_hash is None:
+            source_hash = hashlib.sha256()
+            for directory, _, file_names in sorted(os.walk(self.get_absolute_contract_dir())):
+                for file_name in sorted(file_names):
+                    if file_name.endswith('.sol'):
+                        with open(os.path.join(directory, file_name), 'r') as source_file:
+                            source_hash.update(source_file.read())
+            self.source_hash = source_hash.hexdigest()
+        return hashlib.sha256(json.dumps([self.source_hash, self.optimize, path, code])).hexdigest()
 
     def compile_code(self, code=None, path=None):
-        # create list of valid paths
-        absolute_path = self.contract_dir if self.contract_dir.startswith('/') else '{}/{}'.format(os.getcwd(),
-                                                                                                   self.contract_dir)
-        sub_dirs = [x[0] for x in os.walk(absolute_path)]
-        extra_args = ' '.join(['{}={}'.format(d.split('/')[-1], d) for d in sub_dirs])
-        # compile code
-        combined = self.solidity.combined(code, path=path, libraries=self.references, optimize=self.optimize, extra_args=extra_args)
-        bytecode = combined[-1][1]['bin_hex']
-        abi = combined[-1][1]['abi']
-        return bytecode, abi
+        with self.metrics.measure('compile'):
+            # contracts are compiled once without libraries and linked with referenced library addresses
+            key = self.get_source_key(code, path)
+            if key not in self.compiled:
+                # create list of valid paths
+                sub_dirs = [x[0] for x in os.walk(self.get_absolute_contract_dir())]
+                extra_args = ' '.join(['{}={}'.format(d.split('/')[-1], d) for d in sub_dirs])
+                # compile code
+                combined = self.solidity.combined(code, path=path, optimize=self.optimize, extra_args=extra_args)
+                self.compiled[key] = {'bytecode': combined[-1][1]['bin_hex'], 'abi': combined[-1][1]['abi']}
+                if self.build_cache_path:
+                    with open(self.build_cache_path, 'w') as build_cache_file:
+                        json.dump(self.compiled, build_cache_file)
+            bytecode = link_bytecode(self.compiled[key]['bytecode'], self.references)
+            return bytecode, self.compiled[key]['abi']
 
     def deploy(self, _from, file_path, bytecode, sourcecode, libraries, value, params, label, abi):
+        # references added by this deployment
+        references = {}
         # replace library placeholders
         if libraries:
             for library_name, library_address in libraries.iteritems():
-                self.references[library_name] = self.replace_references(self.strip_0x(library_address))
+                references[library_name] = self.replace_references(self.strip_0x(library_address))
+                self.references[library_name] = references[library_name]
         if file_path:
             if self.contract_dir:
                 file_path = '{}/{}'.format(self.contract_dir, file_path)
@@ -144,38 +521,78 @@ class EthDeploy:
         if sourcecode:
             # compile code
             bytecode, abi = self.compile_code(code=sourcecode)
+        abi_hash = self.store_abi(abi)
         if params:
-            translator = ContractTranslator(abi)
+            translator = self.get_translator(abi_hash)
             # replace constructor placeholders
             params = [self.replace_references(p) for p in params]
-            bytecode += translator.encode_constructor_arguments(params).encode('hex')
+            with self.metrics.measure('encode'):
+                bytecode += translator.encode_constructor_arguments(params).encode('hex')
         # deploy contract
         self.log('Deployment transaction for {} sent'.format(label if label else 'unknown'))
-        tx_response = None
-        if self.private_key:
-            raw_tx = self.get_raw_transaction(value=value, data=bytecode)
-            while tx_response is None or 'error' in tx_response:
-                if tx_response and 'error' in tx_response:
-                    self.log('Deploy failed with error {}'.format(tx_response['error']['message']))
-                    time.sleep(5)
-                tx_response = self.json_rpc.eth_sendRawTransaction(raw_tx)
+        if self.pipeline and not self.get_in_flight_transactions():
+            sender = self.get_sender(_from)
+            transaction_hash = self.send(_from, '', value, bytecode, self.reserve_nonce(sender))
+            # register predicted address, so following instructions can reference it before the receipt arrived
+            nonce = self.tracker.get(self.add_0x(transaction_hash))['nonce']
+            contract_address = self.predict_contract_address(sender, nonce)
+            self.register_contract(label, contract_address, abi_hash, references)
+            self.add_pending(transaction_hash, label=label, address=contract_address, references=references,
+                             sender=sender)
         else:
-            while tx_response is None or 'error' in tx_response:
-                if tx_response and 'error' in tx_response:
-                    self.log('Deploy failed with error {}'.format(tx_response['error']['message']))
-                    time.sleep(5)
-                tx_response = self.json_rpc.eth_sendTransaction(self.add_0x(_from if _from else self._from),
-                                                                value=value,
-                                                                data=self.add_0x(bytecode),
-                                                                gas=self.gas,
-                                                                gas_price=self.gas_price)
-        transaction_receipt = self.wait_for_transaction_receipt(self.add_0x(tx_response['result']))
-        contract_address = self.strip_0x(transaction_receipt['contractAddress'])
+            transaction_hash = self.send(_from, '', value, bytecode)
+            transaction_receipt = self.wait_for_transaction_receipt(self.add_0x(transaction_hash))
+            contract_address = self.strip_0x(transaction_receipt['contractAddress'])
+            self.register_contract(label, contract_address, abi_hash, references)
+            self.complete_deployment(transaction_hash, transaction_receipt, label, contract_address, references)
+
+    def register_contract(self, label, contract_address, abi_hash, references):
         self.references[label] = contract_address
-        self.abis[contract_address] = abi
+        references[label] = contract_address
+        self.abis[contract_address] = abi_hash
         self.log('Contract {} created at address {}'.format(label if label else 'unknown',
                                                             self.add_0x(contract_address)))
-        self.log_transaction_receipt(transaction_receipt)
+
+    def complete_deployment(self, transaction_hash, transaction_receipt, label, contract_address, references):
+        if self.strip_0x(transaction_receipt['contractAddress']) != contract_address:
+            raise ValueError('Contract {} was created at {} instead of predicted address {}'.format(
+                label, transaction_receipt['contractAddress'], self.add_0x(contract_address)))
+        self.log_transaction_receipt(transaction_receipt, label)
+        self.journal_instruction(DeployJournal.COMPLETED,
+                                 transaction_hash=transaction_hash,
+                                 receipt=transaction_receipt,
+                                 address=contract_address,
+                                 references=references,
+                                 abis={contract_address: self.abi_store[self.abis[contract_address]]})
+
+    def complete_transaction(self, transaction_hash, transaction_receipt, label):
+        self.log_transaction_receipt(transaction_receipt, label)
+        self.journal_instruction(DeployJournal.COMPLETED, transaction_hash=transaction_hash, receipt=transaction_receipt)
+
+    def add_pending(self, transaction_hash, **kwargs):
+        self.pending.append(dict(kwargs, index=self.instruction_index, instruction=self.instruction,
+                                 transaction_hash=transaction_hash))
+        if len(self.pending) >= self.pipeline_depth:
+            self.wait_for_pending()
+
+    def wait_for_pending(self):
+        """Waits for receipts of all pending transactions and verifies predicted contract addresses"""
+        index, instruction = self.instruction_index, self.instruction
+        for pending in self.pending:
+            # receipts are journaled and planned for the instruction which sent the transaction
+            self.instruction_index, self.instruction = pending['index'], pending['instruction']
+            transaction_receipt = self.wait_for_transaction_receipt(self.add_0x(pending['transaction_hash']))
+            if pending['sender'] in self.lane_stats:
+                self.lane_stats[pending['sender']]['gas'] += self.hex2int(transaction_receipt['gasUsed'])
+                self.lane_stats[pending['sender']]['finished'] = time.time()
+            if 'address' in pending:
+                self.complete_deployment(pending['transaction_hash'], transaction_receipt, pending['label'],
+                                         pending['address'], pending['references'])
+            else:
+                self.complete_transaction(pending['transaction_hash'], transaction_receipt, pending['label'])
+        self.pending = []
+        self.pending_labels = set()
+        self.instruction_index, self.instruction = index, instruction
 
     def send_transaction(self, _from, to, value, name, params, abi):
         reference = to
@@ -184,52 +601,41 @@ class EthDeploy:
         if name or abi:
             if not name:
                 name = abi['name']
-            abi = self.abis[to] if to in self.abis else [abi]
-            translator = ContractTranslator(abi)
-            data = translator.encode(name, self.replace_references(params)).encode("hex")
+            translator = self.get_translator(self.get_abi_hash(to, abi))
+            with self.metrics.measure('encode'):
+                data = translator.encode(name, self.replace_references(params)).encode("hex")
         self.log('Transaction to {}{} sent'.format(self.format_reference(reference),
                                                    ' calling {} function'.format(name) if name else ''))
-        tx_response = None
-        if self.private_key:
-            raw_tx = self.get_raw_transaction(to=to, value=value, data=data)
-            while tx_response is None or 'error' in tx_response:
-                if tx_response and 'error' in tx_response:
-                    self.log('Transaction failed with error {}'.format(tx_response['error']['message']))
-                    time.sleep(5)
-                tx_response = self.json_rpc.eth_sendRawTransaction(raw_tx)
+        if self.pipeline and not self.get_in_flight_transactions():
+            sender = self.get_sender(_from)
+            transaction_hash = self.send(_from, to, value, data, self.reserve_nonce(sender))
+            self.add_pending(transaction_hash, label=reference, sender=sender)
         else:
-            while tx_response is None or 'error' in tx_response:
-                if tx_response and 'error' in tx_response:
-                    self.log('Transaction failed with error {}'.format(tx_response['error']['message']))
-                    time.sleep(5)
-                tx_response = self.json_rpc.eth_sendTransaction(self.add_0x(_from if _from else self._from),
-                                                                to_address=self.add_0x(to),
-                                                                value=value,
-                                                                data=self.add_0x(data),
-                                                                gas=self.gas,
-                                                                gas_price=self.gas_price)
-        transaction_hash = tx_response['result']
-        transaction_receipt = self.wait_for_transaction_receipt(self.add_0x(transaction_hash))
-        self.log('Transaction to {}{} successful'.format(self.format_reference(reference),
-                                                         ' calling {} function'.format(name) if name else ''))
-        self.log_transaction_receipt(transaction_receipt)
+            transaction_hash = self.send(_from, to, value, data)
+            transaction_receipt = self.wait_for_transaction_receipt(self.add_0x(transaction_hash))
+            self.log('Transaction to {}{} successful'.format(self.format_reference(reference),
+                                                             ' calling {} function'.format(name) if name else ''))
+            self.complete_transaction(transaction_hash, transaction_receipt, reference)
 
     def call(self, _from, to, value, name, params, label, assertion, abi):
+        # calls read state changed by pending transactions
+        self.wait_for_pending()
         reference = to
         to = self.replace_references(to)
         if not name:
             name = abi['name']
-        abi = self.abis[to] if to in self.abis else [abi]
-        translator = ContractTranslator(abi)
-        data = translator.encode(name, self.replace_references(params)).encode('hex')
-        response = self.json_rpc.eth_call(
-            self.add_0x(to),
-            from_address=self.add_0x(_from if _from else self._from),
-            value=value,
-            data=self.add_0x(data),
-            gas=self.gas,
-            gas_price=self.gas_price
-        )
+        translator = self.get_translator(self.get_abi_hash(to, abi))
+        with self.metrics.measure('encode'):
+            data = translator.encode(name, self.replace_references(params)).encode('hex')
+        with self.metrics.measure('call'):
+            response = self.json_rpc.eth_call(
+                self.add_0x(to),
+                from_address=self.add_0x(_from if _from else self._from),
+                value=value,
+                data=self.add_0x(data),
+                gas=self.gas,
+                gas_price=self.gas_price
+            )
         result = translator.decode(name, self.strip_0x(response['result']).decode('hex'))
         result = result if len(result) > 1 else result[0]
         if label:
@@ -243,15 +649,24 @@ class EthDeploy:
             self.log('Assertion of {} at {} successful'.format(name, self.format_reference(reference)))
         else:
             self.log('Call to {} calling function {} successful'.format(self.format_reference(reference), name))
+        self.journal_instruction(DeployJournal.COMPLETED, result=result, references={label: result} if label else {})
 
     def process(self, f):
-        # read instructions file
-        with open(f, 'r') as instructions_file:
-            instructions = json.load(instructions_file)
-        for i in instructions:
+        # instructions are read one by one from a JSON array or JSON Lines file
+        for index, i in enumerate(read_instructions(f)):
+            self.instruction_index = index
+            self.instruction = i
+            if self.journal and self.journal.is_completed(index, i):
+                self.restore_instruction(self.journal.get(index, i))
+                continue
+            self.metrics.start_instruction(i['type'])
             if i['type'] == 'abi':
+                abi_hash = self.store_abi(i['abi'])
                 for address in i['addresses']:
-                    self.abis[self.strip_0x(address)] = i['abi']
+                    self.abis[self.strip_0x(address)] = abi_hash
+            if self.lanes and 'from' not in i and i['type'] in ('deployment', 'transaction'):
+                # spread instructions without explicit sender across the key pool
+                i = dict(i, **{'from': self.choose_lane(i)})
             if i['type'] == 'deployment':
                 self.deploy(
                     i['from'] if 'from' in i else None,
@@ -284,13 +699,49 @@ class EthDeploy:
                     i['assertion'] if 'assertion' in i else None,
                     i['abi'] if 'abi' in i else None,
                 )
+        self.wait_for_pending()
         self.log('-'*96)
         self.log('Summary: {} gas used, {} Ether / {} Wei spent on gas'.format(self.total_gas,
                                                                                self.total_gas*self.gas_price/10.0**18,
                                                                                self.total_gas*self.gas_price))
-        for reference, value in self.references.iteritems():
-            self.log('{} references {}'.format(reference, self.add_0x(value) if isinstance(value, unicode) else value))
+        if len(self.references) > self.SUMMARY_REFERENCE_LIMIT:
+            self.log('{} references, {} distinct abis'.format(len(self.references), len(self.abi_store)))
+        else:
+            for reference, value in self.references.iteritems():
+                self.log('{} references {}'.format(reference,
+                                                   self.add_0x(value) if isinstance(value, unicode) else value))
+        self.log_lane_stats()
+        self.log_inclusion_stats()
+        self.log_metrics()
         self.log('-' * 96)
+        if self.dry_run and self.gas_plan_path:
+            self.save_gas_plan()
+        if self.journal:
+            self.journal.close()
+
+    def log_metrics(self):
+        self.metrics.gas_used = self.total_gas
+        for phase, stats in sorted(self.metrics.get_phase_totals().items()):
+            self.log('Phase {}: {} times, {:.3f}s total, {:.3f}s max'.format(phase, stats['count'], stats['seconds'],
+                                                                            stats['max']))
+        self.log('{} JSON-RPC requests'.format(sum(stats['count'] for stats in self.metrics.rpc.values())))
+        if self.metrics_json_path:
+            self.metrics.write_json(self.metrics_json_path)
+            self.log('Metrics written to {}'.format(self.metrics_json_path))
+        if self.metrics_prometheus_path:
+            self.metrics.write_prometheus(self.metrics_prometheus_path)
+            self.log('Metrics written to {}'.format(self.metrics_prometheus_path))
+
+    def save_gas_plan(self):
+        with open(self.gas_plan_path, 'w') as gas_plan_file:
+            json.dump({
+                'instructions': self.planned_instructions,
+                'total_gas': self.total_gas,
+                'gas_price': self.gas_price,
+                'total_cost': self.total_gas * self.gas_price
+            }, gas_plan_file, indent=2)
+        self.log('Gas plan for {} transactions written to {}'.format(len(self.planned_instructions),
+                                                                    self.gas_plan_path))
 
 
 @click.command()
@@ -304,8 +755,29 @@ class EthDeploy:
 @click.option('--optimize', is_flag=True, help='Use solidity optimizer to compile code')
 @click.option('--account', help='Default account used as from parameter')
 @click.option('--private-key-path', help='Path to private key')
-def setup(f, protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path):
-    deploy = EthDeploy(protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path)
+@click.option('--dry-run', is_flag=True, help='Execute instructions on a local tester chain')
+@click.option('--gas-plan', help='File the gas plan of a dry run is written to or read from')
+@click.option('--gas-margin', default=1.2, help='Gas limit of planned transactions relative to dry run estimates')
+@click.option('--nonce', default=0, help='Nonce of the sending account in a dry run')
+@click.option('--journal', help='Journal file used to resume interrupted deployments')
+@click.option('--build-cache', help='File unlinked bytecode is cached in across deployments')
+@click.option('--pipeline', is_flag=True, help='Predict contract addresses and send transactions without waiting')
+@click.option('--pipeline-depth', default=100, help='Maximum number of transactions waiting for receipts')
+@click.option('--key-pool-path', help='Path to file with one private key per line used as sending lanes')
+@click.option('--stuck-blocks', default=20, help='Blocks after which a pending transaction is replaced, 0 to disable')
+@click.option('--gas-price-bump', default=1.125, help='Factor the gas price of a replaced transaction is raised by')
+@click.option('--max-gas-price', default=0, help='Maximum gas price of replacements, defaults to 10 times gas price')
+@click.option('--endpoints', help='Comma separated list of node URLs used instead of protocol, host and port')
+@click.option('--metrics-json', help='File timing and JSON-RPC metrics are written to as JSON')
+@click.option('--metrics-prometheus', help='File timing and JSON-RPC metrics are written to in Prometheus text format')
+def setup(f, protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path, dry_run, gas_plan,
+          gas_margin, nonce, journal, build_cache, pipeline, pipeline_depth, key_pool_path, stuck_blocks,
+          gas_price_bump, max_gas_price, endpoints, metrics_json, metrics_prometheus):
+    deploy = EthDeploy(protocol, host, port, gas, gas_price, contract_dir, optimize, account, private_key_path,
+                       dry_run, gas_plan, gas_margin, nonce, journal, build_cache, pipeline, pipeline_depth,
+                       key_pool_path, stuck_blocks, gas_price_bump, max_gas_price,
+                       [url for url in endpoints.split(',') if url] if endpoints else None, metrics_json,
+                       metrics_prometheus)
     deploy.process(f)
 
 if __name__ == '__main__':
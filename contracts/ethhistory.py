@@ -0,0 +1,322 @@
+from ethdecoder import EthDecoder, NodeReader
+from ethmath import calc_marginal_prices
+import click
+import json
+import logging
+import numpy as np
+import os
+
+
+# create logger
+logger = logging.getLogger('HISTORY')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+ONE = 2**64
+# token amounts exceed 64 bits and are stored as signed 128 bit integers split into two words
+INT128 = np.dtype([('hi', '<i8'), ('lo', '<u8')])
+COLUMNS = (
+    ('block', np.dtype('<u8')),
+    ('outcome', np.dtype('<i2')),
+    ('token_count', INT128),
+    ('cost', INT128),
+    ('fee', INT128)
+)
+# marginal prices are below ONE for markets with at least two outcomes and fit into 64 bits
+PRICE_TYPE = np.dtype('<u8')
+
+
+def to_int128(values):
+    array = np.empty(len(values), INT128)
+    for i, value in enumerate(values):
+        if not -2**127 <= value < 2**127:
+            raise OverflowError('{} exceeds 128 bits'.format(value))
+        array[i] = (value >> 64, value & (2**64 - 1))
+    return array
+
+
+def from_int128(array):
+    """Returns exact values of a 128 bit column as Python integers"""
+    return [(int(hi) << 64) + int(lo) for hi, lo in zip(array['hi'], array['lo'])]
+
+
+def int128_to_float(array):
+    return array['hi'].astype(np.float64) * 2.0**64 + array['lo'].astype(np.float64)
+
+
+class MarketHistory:
+    """
+    Trades of one market stored as one file per column in a directory. Columns are appended to and read as memory
+    mapped arrays, so range queries only touch the rows they return. Rows beyond length are left over from an
+    interrupted append and are truncated.
+    """
+
+    def __init__(self, directory, outcome_count, length=0):
+        self.directory = directory
+        self.outcome_count = outcome_count
+        self.length = length
+        self._columns = None
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for name, dtype in self.get_column_types():
+            path = self.get_path(name)
+            size = length * dtype.itemsize
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            if os.path.getsize(path) < size:
+                raise ValueError('Column {} of {} has less than {} rows'.format(name, directory, length))
+            if os.path.getsize(path) > size:
+                with open(path, 'r+b') as column_file:
+                    column_file.truncate(size)
+
+    def get_column_types(self):
+        # prices of all outcomes are stored in one column with one row per trade
+        return COLUMNS + (('prices', np.dtype((PRICE_TYPE, (self.outcome_count,)))),)
+
+    def get_path(self, name):
+        return os.path.join(self.directory, '{}.bin'.format(name))
+
+    def append(self, rows):
+        """Appends rows of block, outcome, token count, cost, fee and marginal prices"""
+        if not rows:
+            return
+        arrays = {
+            'block': np.array([row[0] for row in rows], '<u8'),
+            'outcome': np.array([row[1] for row in rows], '<i2'),
+            'token_count': to_int128([row[2] for row in rows]),
+            'cost': to_int128([row[3] for row in rows]),
+            'fee': to_int128([row[4] for row in rows]),
+            'prices': np.array([row[5] for row in rows], PRICE_TYPE).reshape(len(rows), self.outcome_count)
+        }
+        for name, _ in self.get_column_types():
+            with open(self.get_path(name), 'ab') as column_file:
+                arrays[name].tofile(column_file)
+        self.length += len(rows)
+        self._columns = None
+
+    @property
+    def columns(self):
+        # columns are mapped again after appends
+        if self._columns is None:
+            self._columns = {}
+            for name, dtype in self.get_column_types():
+                if self.length:
+                    self._columns[name] = np.memmap(self.get_path(name), dtype.base, 'r', shape=(self.length,) +
+                                                    dtype.shape)
+                else:
+                    self._columns[name] = np.empty((0,) + dtype.shape, dtype.base)
+        return self._columns
+
+    def query(self, from_block=None, to_block=None):
+        """Returns dict mapping column names to rows of trades in blocks from from_block to to_block"""
+        columns = self.columns
+        blocks = columns['block']
+        start = np.searchsorted(blocks, from_block, 'left') if from_block is not None else 0
+        end = np.searchsorted(blocks, to_block, 'right') if to_block is not None else self.length
+        return dict((name, column[start:end]) for name, column in columns.items())
+
+
+class EthHistory:
+    """
+    Builds price and volume histories of markets from decoded logs. Outcome token distributions are tracked from
+    issuances, revocations and transfers of outcome tokens of the market, prices are calculated from them with the
+    LMSR port in ethmath. Every transaction changing a market adds one row:
+
+    - outcome and token count of the trade, positive for buys and negative for sells. Short sells of markets with more
+      than two outcomes are stored as sells of the short sold outcome. Outcome is -1 for funding and closing.
+    - cost, the collateral converted into outcome tokens by the market, negative for sells
+    - fee, the change of collateral held by the market
+    - marginal prices after the transaction in fixed point with ONE being 1
+
+    State is written after columns, so an interrupted update is repeated from the last completed block.
+    """
+
+    STATE_FILE = 'state.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        state_path = os.path.join(directory, self.STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, 'r') as state_file:
+                state = json.load(state_file)
+        else:
+            state = {'last_block': -1, 'events': {}, 'markets': {}}
+        self.last_block = state['last_block']
+        # events dict maps event addresses to collateral tokens and outcome counts
+        self.events = state['events']
+        # markets dict maps market addresses to events, fundings, outcome token distributions and row counts
+        self.markets = state['markets']
+        for market in self.markets.values():
+            market['distribution'] = [int(count) for count in market['distribution']]
+            market['funding'] = int(market['funding']) if market['funding'] is not None else None
+        self.histories = {}
+
+    def get_history(self, market):
+        if market not in self.histories:
+            self.histories[market] = MarketHistory(os.path.join(self.directory, market),
+                                                   len(self.markets[market]['distribution']),
+                                                   self.markets[market]['length'])
+        return self.histories[market]
+
+    def query(self, market, from_block=None, to_block=None):
+        return self.get_history(market).query(from_block, to_block)
+
+    def add_creation(self, record):
+        name = type(record).__name__
+        if name == 'CategoricalEventCreation':
+            self.events[record.categoricalEvent] = {'collateral_token': record.collateralToken,
+                                                    'outcome_count': record.outcomeCount}
+        elif name == 'ScalarEventCreation':
+            self.events[record.scalarEvent] = {'collateral_token': record.collateralToken, 'outcome_count': 2}
+        elif name == 'MarketCreation':
+            event = self.events.get(record.eventContract)
+            if event is None:
+                logger.warning('Event of market {} is unknown'.format(record.market))
+                return
+            self.markets[record.market] = {
+                'event': record.eventContract,
+                'collateral_token': event['collateral_token'],
+                'market_maker': record.marketMaker,
+                'funding': None,
+                'distribution': [0] * event['outcome_count'],
+                'length': 0
+            }
+
+    def get_flows(self, records):
+        """Returns dict mapping markets to collateral, issued, revoked and transferred outcome tokens"""
+        flows = {}
+
+        def get_flow(market):
+            if market not in flows:
+                flows[market] = {'collateral': 0, 'issuance': 0, 'revocation': 0,
+                                 'outcome_tokens': [0] * len(self.markets[market]['distribution'])}
+            return flows[market]
+
+        for record in records:
+            name = type(record).__name__
+            if name in ('Transfer', 'OutcomeTokenTransfer'):
+                if record.from_ == record.to:
+                    continue
+                for party, sign in ((record.from_, -1), (record.to, 1)):
+                    market = self.markets.get(party)
+                    if name == 'Transfer' and market and market['collateral_token'] == record.address:
+                        get_flow(party)['collateral'] += sign * record.value
+                    elif name == 'OutcomeTokenTransfer' and market and market['event'] == record.address:
+                        get_flow(party)['outcome_tokens'][record.outcomeTokenIndex] += sign * record.value
+            elif name in ('OutcomeTokenSetIssuance', 'OutcomeTokenSetRevocation'):
+                market = self.markets.get(record.owner)
+                if market and market['event'] == record.address:
+                    key = 'issuance' if name == 'OutcomeTokenSetIssuance' else 'revocation'
+                    get_flow(record.owner)[key] += record.amount
+        return flows
+
+    @staticmethod
+    def get_trade(outcome_tokens):
+        """Returns outcome and number of outcome tokens bought by traders, negative if sold"""
+        traded = [-count for count in outcome_tokens]
+        outcomes = [i for i, count in enumerate(traded) if count]
+        if len(outcomes) == 1:
+            return outcomes[0], traded[outcomes[0]]
+        if len(outcomes) == len(traded) - 1 and len(set(traded[i] for i in outcomes)) == 1:
+            # all other outcomes are bought when short selling
+            return [i for i, count in enumerate(traded) if not count][0], -traded[outcomes[0]]
+        return -1, 0
+
+    def add_transaction(self, records):
+        for record in records:
+            self.add_creation(record)
+        rows = []
+        for market_address, flow in self.get_flows(records).items():
+            market = self.markets[market_address]
+            issued = flow['issuance'] - flow['revocation']
+            market['distribution'] = [count + issued + change for count, change in zip(market['distribution'],
+                                                                                         flow['outcome_tokens'])]
+            if flow['issuance'] and not any(flow['outcome_tokens']):
+                # markets can be funded repeatedly and each funding issues outcome token sets without transfers
+                market['funding'] = (market['funding'] or 0) + flow['issuance']
+            outcome, token_count = self.get_trade(flow['outcome_tokens'])
+            prices = [0] * len(market['distribution'])
+            if market['funding'] is not None and market['funding'] >= 10000:
+                try:
+                    prices = calc_marginal_prices(market['distribution'], market['funding'])
+                except ValueError:
+                    # market maker can't price distributions whose exponents overflow
+                    pass
+            rows.append((market_address, (records[0].block_number, outcome, token_count, issued, flow['collateral'],
+                                          prices)))
+        return rows
+
+    def update(self, records, to_block):
+        """
+        Adds decoded logs of all blocks after the last block up to to_block, ordered by block and log index. Logs of
+        earlier blocks are skipped.
+        """
+        rows = {}
+        transaction = []
+        for record in records:
+            if record.block_number <= self.last_block:
+                continue
+            if transaction and record.transaction_hash != transaction[0].transaction_hash:
+                for market, row in self.add_transaction(transaction):
+                    rows.setdefault(market, []).append(row)
+                transaction = []
+            transaction.append(record)
+        if transaction:
+            for market, row in self.add_transaction(transaction):
+                rows.setdefault(market, []).append(row)
+        for market, market_rows in rows.items():
+            history = self.get_history(market)
+            history.append(market_rows)
+            self.markets[market]['length'] = history.length
+        self.last_block = max(self.last_block, to_block)
+        self.save()
+        return sum(len(market_rows) for market_rows in rows.values())
+
+    def save(self):
+        markets = {}
+        for address, market in self.markets.items():
+            markets[address] = dict(market, distribution=[str(count) for count in market['distribution']],
+                                    funding=str(market['funding']) if market['funding'] is not None else None)
+        state_path = os.path.join(self.directory, self.STATE_FILE)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        # state is replaced at once, so it never refers to partially written columns
+        with open(state_path + '.tmp', 'w') as state_file:
+            json.dump({'last_block': self.last_block, 'events': self.events, 'markets': markets}, state_file)
+        os.rename(state_path + '.tmp', state_path)
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--directory', default='history', help='Directory histories are stored in')
+@click.option('--to-block', type=int, help='Last block to add, defaults to the latest block')
+@click.option('--block-step', default=1000, help='Number of blocks per eth_getLogs request')
+@click.option('--market', help='Market address whose history is logged after the update')
+def setup(protocol, host, port, directory, to_block, block_step, market):
+    history = EthHistory(directory)
+    reader = NodeReader(protocol, host, port)
+    if to_block is None:
+        to_block = int(reader.request({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []})['result'],
+                       16)
+    decoder = EthDecoder()
+    from_block = history.last_block + 1
+    for start in range(from_block, to_block + 1, block_step):
+        end = min(start + block_step - 1, to_block)
+        row_count = history.update(decoder.decode_logs(reader.get_logs(start, end, block_step)), end)
+        logger.info('Added {} rows for blocks {} to {}'.format(row_count, start, end))
+    if market:
+        columns = history.query(market)
+        for i in range(len(columns['block'])):
+            logger.info('Block {}: outcome {} count {} cost {} fee {} prices {}'.format(
+                columns['block'][i], columns['outcome'][i], from_int128(columns['token_count'][i:i + 1])[0],
+                from_int128(columns['cost'][i:i + 1])[0], from_int128(columns['fee'][i:i + 1])[0],
+                ', '.join('{:.4f}'.format(float(price) / ONE) for price in columns['prices'][i])))
+
+if __name__ == '__main__':
+    setup()
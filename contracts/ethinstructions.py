@@ -0,0 +1,59 @@
+import json
+
+
+WHITESPACE = ' \t\n\r'
+CHUNK_SIZE = 64 * 1024
+
+
+def read_array(instructions_file, chunk_size=CHUNK_SIZE):
+    """Yields instructions of a JSON array one by one, reading the file in chunks"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    index = 0
+    eof = False
+    while True:
+        # skip whitespace and separators between instructions
+        while index < len(buffer) and buffer[index] in WHITESPACE + ',':
+            index += 1
+        if index < len(buffer) and buffer[index] == ']':
+            return
+        try:
+            instruction, index = decoder.raw_decode(buffer, index)
+        except ValueError:
+            if eof:
+                raise ValueError('Instructions file ends within an instruction')
+            chunk = instructions_file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[index:] + chunk
+            index = 0
+            continue
+        yield instruction
+
+
+def read_lines(instructions_file):
+    """Yields instructions of a JSON Lines file one by one"""
+    for line_number, line in enumerate(instructions_file, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            raise ValueError('Instruction in line {} is no valid JSON'.format(line_number))
+
+
+def read_instructions(path):
+    """
+    Yields instructions of a file containing either a JSON array or JSON Lines, so only one instruction is held in
+    memory at a time.
+    """
+    with open(path, 'r') as instructions_file:
+        character = instructions_file.read(1)
+        while character and character in WHITESPACE:
+            character = instructions_file.read(1)
+        if character == '[':
+            for instruction in read_array(instructions_file):
+                yield instruction
+        else:
+            instructions_file.seek(0)
+            for instruction in read_lines(instructions_file):
+                yield instruction
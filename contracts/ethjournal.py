@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+
+class DeployJournal:
+    """
+    Append-only journal of processed deployment instructions. Every line is a JSON entry keyed by instruction index
+    and instruction hash. A transaction is journaled as sent when its hash is known and as completed once its receipt
+    arrived, so an interrupted deployment can skip completed instructions and only wait for in-flight transactions.
+    """
+
+    SENT = 'sent'
+    COMPLETED = 'completed'
+
+    def __init__(self, path):
+        self.path = path
+        # entries dict maps instruction indexes to their latest entry
+        self.entries = {}
+        terminated = True
+        if os.path.exists(path):
+            with open(path, 'r') as journal_file:
+                for line in journal_file:
+                    terminated = line.endswith('\n')
+                    try:
+                        entry = self.decode(json.loads(line))
+                    except ValueError:
+                        # last line was not written completely
+                        continue
+                    self.add(entry)
+        self.journal_file = open(path, 'a')
+        if not terminated:
+            # entries are appended after the incomplete line
+            self.journal_file.write('\n')
+
+    @classmethod
+    def encode(cls, value):
+        # binary strings like bytes32 call results are no valid JSON strings
+        if isinstance(value, str):
+            try:
+                value.decode('utf-8')
+            except UnicodeDecodeError:
+                return {'hex': value.encode('hex')}
+        elif isinstance(value, list) or isinstance(value, tuple):
+            return [cls.encode(v) for v in value]
+        elif isinstance(value, dict):
+            return dict((k, cls.encode(v)) for k, v in value.iteritems())
+        return value
+
+    @classmethod
+    def decode(cls, value):
+        if isinstance(value, list):
+            return [cls.decode(v) for v in value]
+        elif isinstance(value, dict):
+            if value.keys() == ['hex']:
+                return str(value['hex']).decode('hex')
+            return dict((k, cls.decode(v)) for k, v in value.iteritems())
+        return value
+
+    @staticmethod
+    def compact(entry):
+        # receipts are not needed to resume and would grow memory with the journal length, only their gas is kept
+        receipt = entry.pop('receipt', None)
+        if receipt:
+            entry['gas_used'] = int(receipt['gasUsed'], 16)
+        return entry
+
+    def add(self, entry):
+        previous = self.entries.get(entry['index'])
+        if entry['status'] == self.SENT:
+            # transactions replacing a stuck transaction are sent with the same nonce, so any of them can be mined
+            sent = previous and previous['status'] == self.SENT and previous['hash'] == entry['hash']
+            entry['transaction_hashes'] = (previous['transaction_hashes'] if sent else []) + [entry['transaction_hash']]
+        self.entries[entry['index']] = self.compact(entry)
+
+    @staticmethod
+    def instruction_hash(instruction):
+        return hashlib.sha256(json.dumps(instruction, sort_keys=True)).hexdigest()
+
+    def get(self, index, instruction):
+        entry = self.entries.get(index)
+        if entry and entry['hash'] != self.instruction_hash(instruction):
+            raise ValueError('Instruction {} changed since it was journaled'.format(index))
+        return entry
+
+    def is_completed(self, index, instruction):
+        entry = self.get(index, instruction)
+        return entry is not None and entry['status'] == self.COMPLETED
+
+    def get_in_flight_transactions(self, index, instruction):
+        """Returns hashes of all transactions sent for an instruction without receipt, first sent transaction first"""
+        entry = self.get(index, instruction)
+        if entry and entry['status'] == self.SENT:
+            return entry['transaction_hashes']
+        return []
+
+    def append(self, index, instruction, status, **kwargs):
+        entry = dict(kwargs, index=index, hash=self.instruction_hash(instruction), status=status)
+        self.journal_file.write(json.dumps(self.encode(entry), sort_keys=True) + '\n')
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+        self.add(entry)
+
+    def close(self):
+        self.journal_file.close()
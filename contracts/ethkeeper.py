@@ -0,0 +1,429 @@
+from ethbatch import BatchClient, is_mined, is_successful
+from ethdecoder import EthDecoder, NodeReader
+import click
+import heapq
+import json
+import logging
+import os
+import time
+
+
+# create logger
+logger = logging.getLogger('KEEPER')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+ABI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abi')
+# stages of Campaign
+AUCTION_STARTED, AUCTION_SUCCESSFUL, AUCTION_FAILED, MARKET_CREATED, MARKET_CLOSED = range(5)
+
+
+class EthKeeper:
+    """
+    Sends state transitions of contracts waiting for a deadline or an oracle:
+
+    - campaign: Campaign.createMarket once funded and Campaign.withdrawFeesFromMarket once its event is resolved
+    - futarchy_oracle: FutarchyOracle.setOutcome after its deadline
+    - ultimate_oracle: UltimateOracle.setOutcome once its oracle is resolved
+    - event: Event.setWinningOutcome once its oracle is resolved
+
+    Tracked contracts are jobs in a priority queue ordered by the time they are due. Every step reads the state of all
+    due jobs and the dependencies of their transitions in JSON-RPC batch requests. Jobs waiting for a tracked
+    dependency are not read again until the dependency's transition is mined, only untracked dependencies are polled.
+    Transitions are sent with consecutive nonces without waiting for receipts. Oracles and events resolve their
+    dependents in the same transaction, so dependents waiting for them are sent right after them in the same step.
+    Transactions without receipt after the pending timeout whose nonce is no longer pending at the node were dropped,
+    so their jobs are read again and their transitions are resent.
+    """
+
+    # kinds map to ABIs and fields read to choose the next transition
+    KINDS = {
+        'campaign': ('Campaign', ('stage', 'deadline', 'eventContract')),
+        'futarchy_oracle': ('FutarchyOracle', ('isSet', 'deadline')),
+        'ultimate_oracle': ('UltimateOracle', ('oracle', 'outcomeSetTimestamp', 'challengePeriod',
+                                               'frontRunnerSetTimestamp', 'frontRunnerPeriod')),
+        'event': ('AbstractEvent', ('oracle', 'isWinningOutcomeSet'))
+    }
+    # creation events of factories map to kinds and fields of created contracts
+    CREATIONS = {
+        'CampaignCreation': ('campaign', 'campaign'),
+        'FutarchyOracleCreation': ('futarchy_oracle', 'futarchyOracle'),
+        'UltimateOracleCreation': ('ultimate_oracle', 'ultimateOracle'),
+        'CategoricalEventCreation': ('event', 'categoricalEvent'),
+        'ScalarEventCreation': ('event', 'scalarEvent')
+    }
+    # transitions of these kinds resolve the dependencies of their dependents
+    RESOLVING_KINDS = ('futarchy_oracle', 'event')
+
+    def __init__(self, request, sender, private_key=None, gas=4000000, gas_price=20000000000, poll_interval=60,
+                 batch_size=100, pipeline_depth=100, pending_timeout=600, clock=time.time):
+        self.client = BatchClient(request, batch_size)
+        self.sender = sender.lower()
+        self.private_key = private_key
+        self.gas = gas
+        self.gas_price = gas_price
+        self.poll_interval = poll_interval
+        self.pipeline_depth = pipeline_depth
+        self.pending_timeout = pending_timeout
+        self.clock = clock
+        # jobs dict maps contract addresses to kinds, states and chosen transitions
+        self.jobs = {}
+        # queue is a heap of (due, sequence, address, version) tuples, entries of older job versions are skipped
+        self.queue = []
+        self.sequence = 0
+        # waiting dict maps dependency addresses to addresses of jobs waiting for them
+        self.waiting = {}
+        # pending dict maps hashes of sent transactions to job addresses, nonces and send times
+        self.pending = {}
+        self.nonce = None
+        self.translators = {}
+        self.stats = {'reads': 0, 'batches': 0, 'sent': 0, 'mined': 0, 'failed': 0, 'dropped': 0}
+
+    def get_translator(self, name):
+        if name not in self.translators:
+            from ethereum.abi import ContractTranslator
+            with open(os.path.join(ABI_DIR, '{}.json'.format(name)), 'r') as abi_file:
+                self.translators[name] = ContractTranslator(json.load(abi_file))
+        return self.translators[name]
+
+    def track(self, address, kind, due=None):
+        address = address.lower()
+        if address in self.jobs:
+            return
+        self.jobs[address] = {'address': address, 'kind': kind, 'state': None, 'version': 0, 'transition': None,
+                              'dependency': None, 'settles': None}
+        self.schedule(self.jobs[address], due if due is not None else self.clock())
+
+    def track_records(self, records):
+        """Tracks contracts created by factories from decoded creation logs"""
+        for record in records:
+            name = type(record).__name__
+            if name in self.CREATIONS:
+                kind, field = self.CREATIONS[name]
+                # futarchy oracles can't be resolved before their deadline
+                self.track(getattr(record, field), kind, record.deadline if kind == 'futarchy_oracle' else None)
+
+    def schedule(self, job, due):
+        job['version'] += 1
+        if job['state'] != 'waiting':
+            job['state'] = None
+        self.sequence += 1
+        heapq.heappush(self.queue, (due, self.sequence, job['address'], job['version']))
+
+    def pop_due(self, now):
+        jobs = []
+        while self.queue and self.queue[0][0] <= now:
+            _, _, address, version = heapq.heappop(self.queue)
+            job = self.jobs[address]
+            if job['version'] == version and job['state'] not in ('pending', 'done'):
+                jobs.append(job)
+        return jobs
+
+    def get_next_due(self):
+        return self.queue[0][0] if self.queue else None
+
+    def batch(self, method, params_list):
+        """Returns results of one request per parameter list sent in batches, error objects for failed requests"""
+        batches = self.client.batches
+        results = self.client.results(method, params_list)
+        self.stats['batches'] += self.client.batches - batches
+        return results
+
+    def read(self, calls):
+        """Returns decoded results of (address, ABI name, function) calls, None for failed calls"""
+        params_list = [[{'to': address, 'data': '0x' + self.get_translator(name).encode(function, []).encode('hex')},
+                        'latest'] for address, name, function in calls]
+        self.stats['reads'] += len(calls)
+        results = []
+        for (_, name, function), result in zip(calls, self.batch('eth_call', params_list)):
+            if not isinstance(result, basestring) or result == '0x':
+                results.append(None)
+                continue
+            value = self.get_translator(name).decode(function, result[2:].decode('hex'))[0]
+            # addresses are decoded as hex strings
+            results.append('0x' + value if isinstance(value, basestring) else value)
+        return results
+
+    def finish(self, job, now, settles=None):
+        """Marks job as done, dependents are checked again once the job's contract resolves them"""
+        job['state'] = 'done'
+        job['transition'] = None
+        job['settles'] = settles
+        if settles is not None:
+            self.wake(job['address'], max(now, settles))
+
+    def wake(self, address, due):
+        for dependent_address in self.waiting.pop(address, ()):
+            dependent = self.jobs[dependent_address]
+            if dependent['state'] == 'waiting' and dependent['dependency'] == address:
+                dependent['state'] = None
+                self.schedule(dependent, due)
+
+    def evaluate(self, job, values, now):
+        """Sets transition and dependency of job or schedules its next check"""
+        job['transition'] = None
+        job['dependency'] = None
+        kind = job['kind']
+        if any(value is None for value in values):
+            logger.warning('State of {} {} could not be read'.format(kind, job['address']))
+            self.schedule(job, now + self.poll_interval)
+        elif kind == 'campaign':
+            stage, deadline, event = values
+            if stage == AUCTION_STARTED and deadline >= now:
+                # campaigns are funded at any time until the deadline
+                self.schedule(job, min(now + self.poll_interval, deadline + 1))
+            elif stage == AUCTION_SUCCESSFUL:
+                job['transition'] = 'createMarket'
+            elif stage == MARKET_CREATED:
+                job['transition'] = 'withdrawFeesFromMarket'
+                job['dependency'] = event
+            else:
+                self.finish(job, now)
+        elif kind == 'futarchy_oracle':
+            is_set, deadline = values
+            if is_set:
+                self.finish(job, now, now)
+            elif deadline > now:
+                self.schedule(job, deadline)
+            else:
+                job['transition'] = 'setOutcome'
+        elif kind == 'ultimate_oracle':
+            oracle, outcome_set_timestamp, challenge_period, front_runner_set_timestamp, front_runner_period = values
+            if front_runner_set_timestamp:
+                # outcome is set once the front runner period is over
+                self.finish(job, now, front_runner_set_timestamp + front_runner_period + 1)
+            elif outcome_set_timestamp:
+                self.finish(job, now, outcome_set_timestamp + challenge_period + 1)
+            else:
+                job['transition'] = 'setOutcome'
+                job['dependency'] = oracle
+        elif kind == 'event':
+            oracle, is_winning_outcome_set = values
+            if is_winning_outcome_set:
+                self.finish(job, now, now)
+            else:
+                job['transition'] = 'setWinningOutcome'
+                job['dependency'] = oracle
+
+    def park(self, job, now):
+        """Lets job wait for its dependency"""
+        job['state'] = 'waiting'
+        job['version'] += 1
+        self.waiting.setdefault(job['dependency'], set()).add(job['address'])
+        dependency = self.jobs.get(job['dependency'])
+        if dependency is None:
+            # untracked dependencies are polled
+            self.schedule(job, now + self.poll_interval)
+        elif dependency['state'] == 'done':
+            if dependency['settles'] is not None and dependency['settles'] > now:
+                self.schedule(job, dependency['settles'])
+            else:
+                # dependency changed since it was read last, e.g. a challenged ultimate oracle
+                self.schedule(dependency, now)
+                self.schedule(job, now + self.poll_interval)
+
+    def get_ready(self, jobs, now):
+        """Returns jobs whose transitions can be sent, each one after the job resolving its dependency"""
+        dependent_jobs = [job for job in jobs if job['transition'] and job['dependency']]
+        conditions = [(job['dependency'], 'AbstractEvent' if job['kind'] == 'campaign' else 'AbstractOracle',
+                       'isWinningOutcomeSet' if job['kind'] == 'campaign' else 'isOutcomeSet')
+                      for job in dependent_jobs]
+        is_resolved = dict((job['address'], resolved) for job, resolved in zip(dependent_jobs, self.read(conditions)))
+        ready = []
+        for job in jobs:
+            if not job['transition']:
+                continue
+            if job['dependency'] and not is_resolved[job['address']]:
+                self.park(job, now)
+            else:
+                ready.append(job)
+        addresses = set(job['address'] for job in ready)
+        for job in ready:
+            if job['kind'] not in self.RESOLVING_KINDS:
+                continue
+            for dependent_address in sorted(self.waiting.get(job['address'], ())):
+                dependent = self.jobs[dependent_address]
+                if dependent['state'] == 'waiting' and dependent['dependency'] == job['address'] and \
+                        dependent_address not in addresses:
+                    ready.append(dependent)
+                    addresses.add(dependent_address)
+        return ready
+
+    def get_nonce(self):
+        return int(self.batch('eth_getTransactionCount', [[self.sender, 'pending']])[0], 16)
+
+    def get_transaction(self, job, nonce):
+        name = self.KINDS[job['kind']][0]
+        data = self.get_translator(name).encode(job['transition'], [])
+        if self.private_key:
+            from ethereum.transactions import Transaction
+            import rlp
+            tx = Transaction(nonce, self.gas_price, self.gas, job['address'][2:].decode('hex'), 0, data)
+            tx.sign(self.private_key.decode('hex'))
+            return 'eth_sendRawTransaction', ['0x' + rlp.encode(tx).encode('hex')]
+        return 'eth_sendTransaction', [{'from': self.sender, 'to': job['address'], 'data': '0x' + data.encode('hex'),
+                                        'gas': hex(self.gas).rstrip('L'), 'gasPrice': hex(self.gas_price).rstrip('L'),
+                                        'nonce': hex(nonce).rstrip('L')}]
+
+    def send(self, jobs, now):
+        if not jobs:
+            return 0
+        if self.nonce is None:
+            self.nonce = self.get_nonce()
+        nonces = range(self.nonce, self.nonce + len(jobs))
+        self.nonce += len(jobs)
+        transactions = [self.get_transaction(job, nonce) for job, nonce in zip(jobs, nonces)]
+        method = transactions[0][0]
+        sent = 0
+        for job, nonce, result in zip(jobs, nonces, self.batch(method, [params for _, params in transactions])):
+            if not isinstance(result, basestring):
+                logger.warning('{} of {} failed: {}'.format(job['transition'], job['address'], result))
+                self.stats['failed'] += 1
+                # nonce is read again, as later transactions wait for the rejected nonce
+                self.nonce = None
+                job['state'] = None
+                self.schedule(job, now + self.poll_interval)
+                continue
+            logger.info('Sent {} of {}: {}'.format(job['transition'], job['address'], result))
+            self.pending[result] = (job['address'], nonce, now)
+            job['state'] = 'pending'
+            job['version'] += 1
+            sent += 1
+        self.stats['sent'] += sent
+        return sent
+
+    def check_pending(self, now):
+        """Checks receipts of sent transactions and schedules jobs and dependents of mined transitions"""
+        transaction_hashes = list(self.pending)
+        receipts = self.batch('eth_getTransactionReceipt', [[transaction_hash] for transaction_hash in
+                                                            transaction_hashes])
+        overdue = []
+        for transaction_hash, receipt in zip(transaction_hashes, receipts):
+            if not is_mined(receipt):
+                if now - self.pending[transaction_hash][2] >= self.pending_timeout:
+                    overdue.append(transaction_hash)
+                continue
+            job = self.jobs[self.pending.pop(transaction_hash)[0]]
+            job['state'] = None
+            if is_successful(receipt, self.gas):
+                self.stats['mined'] += 1
+                self.schedule(job, now)
+                if job['kind'] in self.RESOLVING_KINDS:
+                    self.wake(job['address'], now)
+            else:
+                logger.warning('{} of {} failed in transaction {}'.format(job['transition'], job['address'],
+                                                                          transaction_hash))
+                self.stats['failed'] += 1
+                self.schedule(job, now + self.poll_interval)
+        if overdue:
+            self.resend_dropped(overdue, now)
+
+    def resend_dropped(self, transaction_hashes, now):
+        """Reads jobs of overdue transactions again if their nonces are not pending at the node anymore"""
+        pending_nonce = self.get_nonce()
+        for transaction_hash in transaction_hashes:
+            address, nonce, _ = self.pending[transaction_hash]
+            if nonce < pending_nonce:
+                # transaction is still known to the node
+                continue
+            del self.pending[transaction_hash]
+            job = self.jobs[address]
+            logger.warning('{} of {} was dropped in transaction {}, resending it'.format(job['transition'], address,
+                                                                                      transaction_hash))
+            self.stats['dropped'] += 1
+            # transition is chosen again, so it is not resent if the contract has moved on in the meantime
+            self.nonce = None
+            job['state'] = None
+            self.schedule(job, now)
+
+    def step(self):
+        """Checks pending transactions and due jobs and sends ready transitions. Returns number of sent transactions"""
+        now = self.clock()
+        if self.pending:
+            self.check_pending(now)
+        jobs = self.pop_due(now)
+        calls = [(job['address'], self.KINDS[job['kind']][0], field) for job in jobs
+                 for field in self.KINDS[job['kind']][1]]
+        values = self.read(calls)
+        start = 0
+        for job in jobs:
+            end = start + len(self.KINDS[job['kind']][1])
+            self.evaluate(job, values[start:end], now)
+            start = end
+        ready = self.get_ready(jobs, now)
+        capacity = max(self.pipeline_depth - len(self.pending), 0)
+        for job in ready[capacity:]:
+            # pipeline is full, so remaining transitions are checked again in the next step
+            job['state'] = None
+            self.schedule(job, now)
+        return self.send(ready[:capacity], now)
+
+    def run(self, on_step=None):
+        while True:
+            self.step()
+            if on_step:
+                on_step()
+            next_due = self.get_next_due()
+            delay = self.poll_interval if next_due is None else min(next_due - self.clock(), self.poll_interval)
+            # receipts of pending transactions are checked every second
+            time.sleep(1 if self.pending else max(delay, 1))
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--account', help='Default account used as from parameter')
+@click.option('--private-key-path', help='Path to private key')
+@click.option('--contracts', help='JSON file with a list of contracts given by address and kind')
+@click.option('--from-block', type=int, help='Track contracts created by factories from this block on')
+@click.option('--block-step', default=1000, help='Number of blocks per eth_getLogs request')
+@click.option('--gas', default=4000000, help='Transaction gas')
+@click.option('--gas-price', default=20000000000, help='Transaction gas price')
+@click.option('--poll-interval', default=60, help='Seconds between checks of contracts waiting for untracked oracles')
+@click.option('--batch-size', default=100, help='Number of requests per batch request')
+@click.option('--pipeline-depth', default=100, help='Maximum number of sent transactions without receipt')
+@click.option('--pending-timeout', default=600,
+              help='Seconds without receipt after which dropped transactions are resent')
+def setup(protocol, host, port, account, private_key_path, contracts, from_block, block_step, gas, gas_price,
+          poll_interval, batch_size, pipeline_depth, pending_timeout):
+    reader = NodeReader(protocol, host, port)
+    private_key = None
+    if private_key_path:
+        from ethereum.utils import privtoaddr
+        with open(private_key_path, 'r') as private_key_file:
+            private_key = private_key_file.read().strip()
+        account = privtoaddr(private_key.decode('hex')).encode('hex')
+    elif not account:
+        account = reader.request({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_accounts', 'params': []})['result'][0]
+    account = account if account.startswith('0x') else '0x' + account
+    keeper = EthKeeper(reader.request, account, private_key, gas, gas_price, poll_interval, batch_size,
+                       pipeline_depth, pending_timeout)
+    if contracts:
+        with open(contracts, 'r') as contracts_file:
+            for contract in json.load(contracts_file):
+                keeper.track(contract['address'], contract['kind'])
+    decoder = EthDecoder() if from_block is not None else None
+    state = {'next_block': from_block}
+
+    def on_step():
+        if decoder is not None:
+            latest_block = int(reader.request({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber',
+                                               'params': []})['result'], 16)
+            if latest_block >= state['next_block']:
+                keeper.track_records(decoder.decode_logs(reader.get_logs(state['next_block'], latest_block,
+                                                                         block_step)))
+                state['next_block'] = latest_block + 1
+        logger.info('{} contracts tracked, {} pending transactions, stats {}'.format(
+            len(keeper.jobs), len(keeper.pending), json.dumps(keeper.stats, sort_keys=True)))
+
+    logger.info('Transitions are sent from address: {}'.format(account))
+    on_step()
+    keeper.run(on_step)
+
+if __name__ == '__main__':
+    setup()
@@ -0,0 +1,37 @@
+PLACEHOLDER_LENGTH = 40
+
+
+def get_library_name(placeholder):
+    """Returns library name of a placeholder like __Math____ or __Utils/Math.sol:Math__"""
+    return placeholder.strip('_').split(':')[-1]
+
+
+def get_library_names(bytecode):
+    """Returns names of all libraries unlinked bytecode depends on"""
+    names = set()
+    position = bytecode.find('_')
+    while position != -1:
+        names.add(get_library_name(bytecode[position:position + PLACEHOLDER_LENGTH]))
+        position = bytecode.find('_', position + PLACEHOLDER_LENGTH)
+    return names
+
+
+def link_bytecode(bytecode, libraries):
+    """
+    Replaces library placeholders in hex encoded bytecode compiled without libraries. Libraries dict maps library
+    names to hex encoded addresses without 0x prefix.
+    """
+    linked = []
+    start = 0
+    position = bytecode.find('_')
+    while position != -1:
+        name = get_library_name(bytecode[position:position + PLACEHOLDER_LENGTH])
+        address = libraries.get(name)
+        if not isinstance(address, basestring) or len(address) != PLACEHOLDER_LENGTH:
+            raise ValueError('No address for library {}'.format(name))
+        linked.append(bytecode[start:position])
+        linked.append(address)
+        start = position + PLACEHOLDER_LENGTH
+        position = bytecode.find('_', start)
+    linked.append(bytecode[start:])
+    return ''.join(linked)
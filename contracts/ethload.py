@@ -0,0 +1,327 @@
+from ethbatch import is_successful
+from ethdeploy import EthDeploy
+from ethtransactions import percentile
+import click
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+
+# create logger
+logger = logging.getLogger('LOAD')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+
+class Trader(threading.Thread):
+    """
+    Trades on a market with its own key, signing transactions locally with a locally tracked nonce. Prerequisite
+    transactions of a trade are sent back to back and receipts are only awaited afterwards.
+    """
+
+    def __init__(self, load_test, private_key, trades, seed):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        from ethjsonrpc import EthJsonRpc
+        from ethereum.utils import privtoaddr
+        self.load_test = load_test
+        self.json_rpc = EthJsonRpc(protocol=load_test.protocol, host=load_test.host, port=load_test.port)
+        self.private_key = private_key
+        self.address = privtoaddr(private_key).encode('hex')
+        self.trades = trades
+        self.random = random.Random(seed)
+        self.nonce = None
+        # holdings dict maps outcome indexes to owned outcome tokens
+        self.holdings = {}
+
+    def get_nonce(self):
+        transaction_count = self.json_rpc.eth_getTransactionCount('0x' + self.address, default_block='pending')
+        return int(transaction_count['result'], 16)
+
+    def call(self, address, translator, name, params):
+        data = translator.encode(name, params)
+        response = self.json_rpc.eth_call('0x' + address, from_address='0x' + self.address, data='0x' + data.encode('hex'))
+        return translator.decode(name, response['result'][2:].decode('hex'))[0]
+
+    def send(self, address, translator, name, params, value=0):
+        """Returns hash and submission time of a signed transaction or None if it was rejected"""
+        from ethereum.transactions import Transaction
+        import rlp
+        if self.nonce is None:
+            self.nonce = self.get_nonce()
+        tx = Transaction(self.nonce, self.load_test.gas_price, self.load_test.gas, address.decode('hex'), value,
+                         translator.encode(name, params))
+        tx.sign(self.private_key)
+        sent = time.time()
+        response = self.json_rpc.eth_sendRawTransaction('0x' + rlp.encode(tx).encode('hex'))
+        if 'error' in response:
+            # nonce is read again, as a rejected transaction may or may not have been applied
+            self.nonce = self.get_nonce()
+            return None
+        self.nonce += 1
+        return response['result'], sent
+
+    def wait(self, transaction):
+        """Returns receipt and seconds from submission to receipt"""
+        transaction_hash, sent = transaction
+        receipt = self.json_rpc.eth_getTransactionReceipt(transaction_hash)['result']
+        while receipt is None:
+            time.sleep(self.load_test.poll_interval)
+            receipt = self.json_rpc.eth_getTransactionReceipt(transaction_hash)['result']
+        return receipt, time.time() - sent
+
+    def execute(self, transactions):
+        """Sends transactions given as (type, address, translator, name, params, value), then waits for receipts"""
+        sent = [(transaction[0], self.send(*transaction[1:])) for transaction in transactions]
+        success = True
+        for transaction_type, transaction in sent:
+            if transaction is None:
+                self.load_test.record(transaction_type, None, None, False)
+                success = False
+                continue
+            receipt, latency = self.wait(transaction)
+            gas_used = int(receipt['gasUsed'], 16)
+            transaction_success = is_successful(receipt, self.load_test.gas)
+            self.load_test.record(transaction_type, latency, gas_used, transaction_success)
+            success = success and transaction_success
+        return success
+
+    def buy(self, outcome, count):
+        load_test = self.load_test
+        costs = self.call(load_test.lmsr, load_test.lmsr_translator, 'calcCosts', [load_test.market, outcome, count])
+        costs += self.call(load_test.market, load_test.market_translator, 'calcMarketFee', [costs])
+        max_costs = int(costs * (1 + load_test.slippage))
+        if self.execute([
+            ('deposit', load_test.ether_token, load_test.token_translator, 'deposit', [], max_costs),
+            ('approve', load_test.ether_token, load_test.token_translator, 'approve', [load_test.market, max_costs], 0),
+            ('buy', load_test.market, load_test.market_translator, 'buy', [outcome, count, max_costs], 0)
+        ]):
+            self.holdings[outcome] = self.holdings.get(outcome, 0) + count
+
+    def sell(self, outcome, count):
+        load_test = self.load_test
+        profits = self.call(load_test.lmsr, load_test.lmsr_translator, 'calcProfits', [load_test.market, outcome, count])
+        profits -= self.call(load_test.market, load_test.market_translator, 'calcMarketFee', [profits])
+        min_profits = max(int(profits * (1 - load_test.slippage)), 1)
+        if self.execute([
+            ('approveOutcomeTokens', load_test.event, load_test.event_translator, 'approveOutcomeTokens',
+             [outcome, load_test.market, count], 0),
+            ('sell', load_test.market, load_test.market_translator, 'sell', [outcome, count, min_profits], 0)
+        ]):
+            self.holdings[outcome] -= count
+
+    def short_sell(self, outcome, count):
+        load_test = self.load_test
+        if self.execute([
+            ('deposit', load_test.ether_token, load_test.token_translator, 'deposit', [], count),
+            ('approve', load_test.ether_token, load_test.token_translator, 'approve', [load_test.market, count], 0),
+            ('shortSell', load_test.market, load_test.market_translator, 'shortSell', [outcome, count, 1], 0)
+        ]):
+            for i in range(load_test.outcome_count):
+                if i != outcome:
+                    self.holdings[i] = self.holdings.get(i, 0) + count
+
+    def run(self):
+        load_test = self.load_test
+        for _ in range(self.trades):
+            outcome = self.random.randrange(load_test.outcome_count)
+            count = self.random.randint(load_test.trade_size // 2, load_test.trade_size)
+            owned = [i for i, c in self.holdings.items() if c > 0]
+            trade = self.random.choice(['buy', 'short_sell', 'sell'] if owned else ['buy', 'short_sell'])
+            try:
+                if trade == 'sell':
+                    outcome = self.random.choice(owned)
+                    self.sell(outcome, min(count, self.holdings[outcome]))
+                else:
+                    getattr(self, trade)(outcome, count)
+            except Exception as e:
+                logger.error('Trader {} failed with error {}'.format(self.address, e))
+
+
+class LoadTest:
+    """
+    Deploys the basic framework and a funded market over JSON-RPC, then lets concurrent traders buy, sell and short
+    sell outcome tokens and records latency and gas per transaction type.
+    """
+
+    FEE = 50000  # 5%
+
+    def __init__(self, protocol, host, port, gas, gas_price, trader_count, trades, outcome_count, trade_size, funding,
+                 trader_balance, slippage, seed, poll_interval=0.05):
+        self.protocol = protocol
+        self.host = host
+        self.port = port
+        self.gas = gas
+        self.gas_price = gas_price
+        self.trader_count = trader_count
+        self.trades = trades
+        self.outcome_count = outcome_count
+        self.trade_size = trade_size
+        self.funding = funding
+        self.trader_balance = trader_balance
+        self.slippage = slippage
+        self.seed = seed
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        # stats dict maps transaction types to latencies, gas used and failures
+        self.stats = {}
+        self.deploy = None
+
+    def record(self, transaction_type, latency, gas_used, success):
+        with self.lock:
+            stats = self.stats.setdefault(transaction_type, {'latencies': [], 'gas': [], 'failed': 0})
+            if success:
+                stats['latencies'].append(latency)
+                stats['gas'].append(gas_used)
+            else:
+                stats['failed'] += 1
+
+    def get_translator(self, address):
+        return self.deploy.get_translator(self.deploy.abis[address])
+
+    def create(self, factory, name, params, label, path):
+        """Creates contract with a factory, reading its address from a call executed before the transaction"""
+        self.deploy.call(None, factory, 0, name, params, label, None, None)
+        self.deploy.send_transaction(None, factory, 0, name, params, None)
+        address = self.deploy.references[label]
+        self.deploy.abis[address] = self.deploy.store_abi(self.deploy.compile_code(path='solidity/' + path)[1])
+        return address
+
+    def setup(self):
+        self.deploy = EthDeploy(self.protocol, self.host, self.port, self.gas * 4, self.gas_price, 'solidity', True,
+                                None, None)
+        self.deploy.process('deploy/basicFramework.json')
+        references = self.deploy.references
+        description_hash = os.urandom(32)
+        self.create('CentralizedOracleFactory', 'createCentralizedOracle', [description_hash], 'LoadOracle',
+                    'Oracles/CentralizedOracle.sol')
+        self.event = self.create('EventFactory', 'createCategoricalEvent',
+                                 ['EtherToken', 'LoadOracle', self.outcome_count], 'LoadEvent',
+                                 'Events/CategoricalEvent.sol')
+        self.market = self.create('DefaultMarketFactory', 'createMarket', ['LoadEvent', 'LMSRMarketMaker', self.FEE],
+                                  'LoadMarket', 'Markets/DefaultMarket.sol')
+        self.ether_token = references['EtherToken']
+        self.lmsr = references['LMSRMarketMaker']
+        self.token_translator = self.get_translator(self.ether_token)
+        self.lmsr_translator = self.get_translator(self.lmsr)
+        self.event_translator = self.get_translator(self.event)
+        self.market_translator = self.get_translator(self.market)
+        # fund market
+        self.deploy.send_transaction(None, 'EtherToken', self.funding, 'deposit', [], None)
+        self.deploy.send_transaction(None, 'EtherToken', 0, 'approve', ['LoadMarket', self.funding], None)
+        self.deploy.send_transaction(None, 'LoadMarket', 0, 'fund', [self.funding], None)
+        logger.info('Market {} with {} outcomes funded with {} Wei'.format(self.market, self.outcome_count,
+                                                                           self.funding))
+
+    def create_traders(self):
+        from ethereum.utils import privtoaddr, sha3
+        traders = []
+        for i in range(self.trader_count):
+            private_key = sha3('load test trader {} {}'.format(self.seed, i))
+            self.deploy.send_transaction(None, privtoaddr(private_key).encode('hex'), self.trader_balance, None, (),
+                                         None)
+            traders.append(Trader(self, private_key, self.trades, self.seed * self.trader_count + i))
+        return traders
+
+    def run(self):
+        self.setup()
+        traders = self.create_traders()
+        logger.info('Starting {} traders with {} trades each'.format(len(traders), self.trades))
+        start = time.time()
+        for trader in traders:
+            trader.start()
+        for trader in traders:
+            trader.join()
+        return self.get_report(time.time() - start)
+
+    def get_report(self, duration):
+        transaction_types = {}
+        for transaction_type, stats in sorted(self.stats.items()):
+            latencies = stats['latencies']
+            gas = stats['gas']
+            transaction_types[transaction_type] = {
+                'transactions': len(latencies),
+                'failed': stats['failed'],
+                'latency_p50': percentile(latencies, 50),
+                'latency_p95': percentile(latencies, 95),
+                'latency_p99': percentile(latencies, 99),
+                'latency_max': max(latencies) if latencies else None,
+                'gas_mean': sum(gas) / len(gas) if gas else None,
+                'gas_min': min(gas) if gas else None,
+                'gas_max': max(gas) if gas else None
+            }
+        transactions = sum(len(stats['latencies']) for stats in self.stats.values())
+        trades = sum(len(self.stats[t]['latencies']) for t in ('buy', 'sell', 'shortSell') if t in self.stats)
+        return {
+            'traders': self.trader_count,
+            'duration': duration,
+            'transactions': transactions,
+            'failed': sum(stats['failed'] for stats in self.stats.values()),
+            'tps': transactions / duration,
+            'trades_per_second': trades / duration,
+            'transaction_types': transaction_types
+        }
+
+
+def log_report(report):
+    logger.info('-' * 96)
+    logger.info('{} traders: {} transactions ({} failed) in {:.2f}s, {:.2f} transactions/s, {:.2f} trades/s'.format(
+        report['traders'], report['transactions'], report['failed'], report['duration'], report['tps'],
+        report['trades_per_second']))
+    for transaction_type, stats in sorted(report['transaction_types'].items()):
+        if stats['transactions']:
+            logger.info('{}: {} transactions ({} failed), latency p50 {:.3f}s p95 {:.3f}s p99 {:.3f}s, '
+                        'gas mean {} min {} max {}'.format(transaction_type, stats['transactions'], stats['failed'],
+                                                          stats['latency_p50'], stats['latency_p95'],
+                                                          stats['latency_p99'], stats['gas_mean'], stats['gas_min'],
+                                                          stats['gas_max']))
+        else:
+            logger.info('{}: all {} transactions failed'.format(transaction_type, stats['failed']))
+    logger.info('-' * 96)
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--local', is_flag=True, help='Run against an in-process node backed by the tester chain')
+@click.option('--block-time', default=0.0, help='Seconds between blocks of the in-process node')
+@click.option('--latency', default=0.0, help='Seconds every request to the in-process node is delayed')
+@click.option('--gas', default=1000000, help='Gas of trader transactions')
+@click.option('--gas-price', default=20000000000, help='Transaction gas price')
+@click.option('--traders', default=10, help='Number of concurrent traders')
+@click.option('--trades', default=10, help='Number of trades per trader')
+@click.option('--outcome-count', default=2, help='Number of market outcomes')
+@click.option('--trade-size', default=10**15, help='Maximum outcome tokens per trade')
+@click.option('--funding', default=10**18, help='Market funding')
+@click.option('--trader-balance', default=10**19, help='Ether sent to every trader')
+@click.option('--slippage', default=0.1, help='Tolerated price change between price calculation and trade')
+@click.option('--seed', default=0, help='Seed of trader keys and trade choices')
+@click.option('--output', help='File the report is written to as JSON')
+def setup(protocol, host, port, local, block_time, latency, gas, gas_price, traders, trades, outcome_count, trade_size,
+          funding, trader_balance, slippage, seed, output):
+    server = None
+    if local:
+        from ethnode import start_node
+        server = start_node(port=0, block_time=block_time, latency=latency, seed=seed)
+        host, port = server.server_address
+    load_test = LoadTest(protocol, host, port, gas, gas_price, traders, trades, outcome_count, trade_size, funding,
+                         trader_balance, slippage, seed)
+    report = load_test.run()
+    log_report(report)
+    if output:
+        with open(output, 'w') as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+    if server:
+        from ethnode import stop_node
+        stop_node(server)
+
+if __name__ == '__main__':
+    setup()
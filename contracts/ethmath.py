@@ -0,0 +1,109 @@
+# Ports of Math and LMSRMarketMaker returning exactly the values the contracts return. All arithmetic wraps around
+# at 2**256 like uint arithmetic in Solidity, division by zero and inputs Math rejects raise like a failing call.
+
+ONE = 0x10000000000000000
+LN2 = 0xb17217f7d1cf79ac
+MODULUS = 2**256
+# fee factors of calcCosts and calcProfits in units of 1/100000
+COSTS_FACTOR = 100000 + 2
+PROFITS_FACTOR = 100000 - 2
+
+
+def reduce(x):
+    """Returns floor(log2(x / ONE)) and x divided by its power of two like Math.reduce"""
+    ilog2 = 0
+    z = x
+    for bits in (128, 64, 32, 16, 8, 4, 2, 1):
+        if z >= ONE * 2**bits:
+            z //= 2**bits
+            ilog2 += bits
+    return ilog2, z
+
+
+def exp(x):
+    """Returns Math.exp(x)"""
+    k = x // LN2
+    if k > 191:
+        raise ValueError('Result of exp({}) overflows'.format(x))
+    r = x - k * LN2
+    result = ONE
+    for i in range(14, 0, -1):
+        result = ONE + result * r // (i * ONE)
+    return result * 2**k % MODULUS
+
+
+def ln(x):
+    """Returns Math.ln(x)"""
+    if x < ONE:
+        raise ValueError('Result of ln({}) is negative'.format(x))
+    ilog2, z = reduce(x)
+    t = (z - ONE) % MODULUS * ONE % MODULUS // (z + ONE)
+    t2 = t * t % MODULUS // ONE
+    power = t
+    result = t
+    for i in range(3, 29, 2):
+        power = power * t2 % MODULUS // ONE
+        result += power // i
+    return (ilog2 * LN2 + 2 * result) % MODULUS
+
+
+def floor_log2(x):
+    """Returns Math.floorLog2(x)"""
+    return reduce(x)[0]
+
+
+def get_outcome_token_range(outcome_token_distribution):
+    """Returns lowest and highest number of outcome tokens owned by market"""
+    return [min(outcome_token_distribution), max(outcome_token_distribution)]
+
+
+def get_inv_b(outcome_count):
+    return ln(outcome_count * ONE % MODULUS) // 10000
+
+
+def calc_current_costs(inv_b, outcome_token_range, outcome_token_distribution, funding):
+    """Returns LMSRMarketMaker.calcCurrentCosts"""
+    inner_sum = 0
+    funding_divisor = funding // 10000
+    lowest, highest = outcome_token_range
+    for count in outcome_token_distribution:
+        exponent = ((highest - lowest) % MODULUS - (count - lowest) % MODULUS) % MODULUS // funding_divisor
+        inner_sum = (inner_sum + exp(exponent * inv_b % MODULUS)) % MODULUS
+    return ln(inner_sum) * ONE % MODULUS // inv_b
+
+
+def calc_costs(outcome_token_distribution, funding, outcome_token_index, outcome_token_count):
+    """Returns LMSRMarketMaker.calcCosts for a market owning the outcome token distribution"""
+    distribution = list(outcome_token_distribution)
+    outcome_token_range = get_outcome_token_range(distribution)
+    inv_b = get_inv_b(len(distribution))
+    costs_before = calc_current_costs(inv_b, outcome_token_range, distribution, funding)
+    distribution[outcome_token_index] = (distribution[outcome_token_index] - outcome_token_count) % MODULUS
+    costs_after = calc_current_costs(inv_b, outcome_token_range, distribution, funding)
+    costs = (costs_after - costs_before) % MODULUS * (funding // 10000) % MODULUS * COSTS_FACTOR % MODULUS \
+        // 100000 // ONE
+    # costs are not bigger than 1 per share
+    return min(costs, outcome_token_count)
+
+
+def calc_profits(outcome_token_distribution, funding, outcome_token_index, outcome_token_count):
+    """Returns LMSRMarketMaker.calcProfits for a market owning the outcome token distribution"""
+    distribution = list(outcome_token_distribution)
+    outcome_token_range = get_outcome_token_range(distribution)
+    inv_b = get_inv_b(len(distribution))
+    outcome_token_range[1] = (outcome_token_range[1] + outcome_token_count) % MODULUS
+    costs_before = calc_current_costs(inv_b, outcome_token_range, distribution, funding)
+    distribution[outcome_token_index] = (distribution[outcome_token_index] + outcome_token_count) % MODULUS
+    costs_after = calc_current_costs(inv_b, outcome_token_range, distribution, funding)
+    return (costs_before - costs_after) % MODULUS * (funding // 10000) % MODULUS * PROFITS_FACTOR % MODULUS \
+        // 100000 // ONE
+
+
+def calc_marginal_prices(outcome_token_distribution, funding):
+    """Returns marginal prices of LMSRMarketMaker.calcMarginalPrices in fixed point with ONE being 1"""
+    highest = get_outcome_token_range(outcome_token_distribution)[1]
+    inv_b = get_inv_b(len(outcome_token_distribution))
+    funding_divisor = funding // 10000
+    summands = [exp((highest - count) // funding_divisor * inv_b % MODULUS) for count in outcome_token_distribution]
+    inner_sum = sum(summands) % MODULUS
+    return [summand * ONE % MODULUS // inner_sum for summand in summands]
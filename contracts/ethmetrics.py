@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+import json
+import time
+
+
+class DeployMetrics:
+    """
+    Aggregates time spent per deployment phase and instruction type and counts JSON-RPC requests per method.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        # phases dict maps (instruction type, phase) to count, seconds and max seconds
+        self.phases = {}
+        # rpc dict maps methods to count, seconds and errors
+        self.rpc = {}
+        # instructions dict maps instruction types to processed instructions
+        self.instructions = {}
+        # phases before the first instruction are counted as setup
+        self.instruction_type = 'setup'
+        self.gas_used = 0
+
+    def start_instruction(self, instruction_type):
+        self.instruction_type = instruction_type
+        self.instructions[instruction_type] = self.instructions.get(instruction_type, 0) + 1
+
+    @contextmanager
+    def measure(self, phase):
+        start = time.time()
+        try:
+            yield
+        finally:
+            duration = time.time() - start
+            stats = self.phases.setdefault((self.instruction_type, phase), {'count': 0, 'seconds': 0, 'max': 0})
+            stats['count'] += 1
+            stats['seconds'] += duration
+            stats['max'] = max(stats['max'], duration)
+
+    def record_rpc(self, method, duration, error=False):
+        stats = self.rpc.setdefault(method, {'count': 0, 'seconds': 0, 'errors': 0})
+        stats['count'] += 1
+        stats['seconds'] += duration
+        if error:
+            stats['errors'] += 1
+
+    def get_phase_totals(self):
+        totals = {}
+        for (_, phase), stats in self.phases.items():
+            total = totals.setdefault(phase, {'count': 0, 'seconds': 0, 'max': 0})
+            total['count'] += stats['count']
+            total['seconds'] += stats['seconds']
+            total['max'] = max(total['max'], stats['max'])
+        return totals
+
+    def get_report(self):
+        return {
+            'duration': time.time() - self.started,
+            'gas_used': self.gas_used,
+            'instructions': self.instructions,
+            'phases': self.get_phase_totals(),
+            'phases_by_instruction_type': [dict(stats, type=instruction_type, phase=phase)
+                                           for (instruction_type, phase), stats in sorted(self.phases.items())],
+            'rpc': self.rpc
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as report_file:
+            json.dump(self.get_report(), report_file, indent=2, sort_keys=True)
+
+    def write_prometheus(self, path):
+        lines = [
+            '# HELP ethdeploy_duration_seconds Duration of the deployment',
+            '# TYPE ethdeploy_duration_seconds gauge',
+            'ethdeploy_duration_seconds {}'.format(time.time() - self.started),
+            '# HELP ethdeploy_gas_used_total Gas used by all transactions',
+            '# TYPE ethdeploy_gas_used_total counter',
+            'ethdeploy_gas_used_total {}'.format(self.gas_used),
+            '# HELP ethdeploy_instructions_total Processed instructions',
+            '# TYPE ethdeploy_instructions_total counter'
+        ]
+        for instruction_type, count in sorted(self.instructions.items()):
+            lines.append('ethdeploy_instructions_total{{type="{}"}} {}'.format(instruction_type, count))
+        lines += [
+            '# HELP ethdeploy_phase_seconds_total Time spent per phase and instruction type',
+            '# TYPE ethdeploy_phase_seconds_total counter'
+        ]
+        for (instruction_type, phase), stats in sorted(self.phases.items()):
+            lines.append('ethdeploy_phase_seconds_total{{type="{}",phase="{}"}} {}'.format(
+                instruction_type, phase, stats['seconds']))
+        lines += [
+            '# HELP ethdeploy_phase_count_total Timed executions per phase and instruction type',
+            '# TYPE ethdeploy_phase_count_total counter'
+        ]
+        for (instruction_type, phase), stats in sorted(self.phases.items()):
+            lines.append('ethdeploy_phase_count_total{{type="{}",phase="{}"}} {}'.format(
+                instruction_type, phase, stats['count']))
+        lines += [
+            '# HELP ethdeploy_rpc_requests_total JSON-RPC requests per method',
+            '# TYPE ethdeploy_rpc_requests_total counter'
+        ]
+        for method, stats in sorted(self.rpc.items()):
+            lines.append('ethdeploy_rpc_requests_total{{method="{}"}} {}'.format(method, stats['count']))
+        lines += [
+            '# HELP ethdeploy_rpc_errors_total Failed JSON-RPC requests per method',
+            '# TYPE ethdeploy_rpc_errors_total counter'
+        ]
+        for method, stats in sorted(self.rpc.items()):
+            lines.append('ethdeploy_rpc_errors_total{{method="{}"}} {}'.format(method, stats['errors']))
+        lines += [
+            '# HELP ethdeploy_rpc_seconds_total Time spent in JSON-RPC requests per method',
+            '# TYPE ethdeploy_rpc_seconds_total counter'
+        ]
+        for method, stats in sorted(self.rpc.items()):
+            lines.append('ethdeploy_rpc_seconds_total{{method="{}"}} {}'.format(method, stats['seconds']))
+        with open(path, 'w') as report_file:
+            report_file.write('\n'.join(lines) + '\n')
+
+
+class InstrumentedJsonRpc:
+    """
+    Wraps a JSON-RPC client and records count, duration and errors of every request.
+    """
+
+    def __init__(self, json_rpc, metrics):
+        self.json_rpc = json_rpc
+        self.metrics = metrics
+
+    def __getattr__(self, method):
+        function = getattr(self.json_rpc, method)
+        if not method.startswith('eth_'):
+            return function
+
+        def request(*args, **kwargs):
+            start = time.time()
+            try:
+                response = function(*args, **kwargs)
+            except Exception:
+                self.metrics.record_rpc(method, time.time() - start, error=True)
+                raise
+            self.metrics.record_rpc(method, time.time() - start,
+                                    error=isinstance(response, dict) and 'error' in response)
+            return response
+        return request
@@ -0,0 +1,176 @@
+from ethjsonrpc import EthJsonRpc
+import logging
+import random
+import threading
+import time
+
+
+logger = logging.getLogger('DEPLOY')
+
+
+class Endpoint:
+
+    def __init__(self, url):
+        self.url = url
+        protocol, address = url.split('://', 1) if '://' in url else ('http', url)
+        host, port = address.rsplit(':', 1) if ':' in address else (address, '8545')
+        self.json_rpc = EthJsonRpc(protocol=protocol, host=host, port=port)
+        # exponentially weighted average of request durations in seconds
+        self.latency = None
+        self.failed_at = None
+        self.block_number = 0
+
+
+class MultiEthJsonRpc:
+    """
+    Serves the JSON-RPC methods used by EthDeploy from several nodes. Reads are spread across healthy endpoints weighted
+    by their measured latency and fail over to the next endpoint on failed requests and error responses. Pending nonces
+    are read from the node transactions are sent to, as other nodes may not have seen the latest transactions yet. Raw
+    transactions are broadcast to all healthy endpoints. An endpoint is unhealthy for a while after a failed request or
+    an error response another endpoint answered without error, and while its block number lags behind the other
+    endpoints.
+    """
+
+    LATENCY_WEIGHT = 0.2
+    # seconds a failed endpoint is excluded
+    RETRY_AFTER = 30
+
+    def __init__(self, urls, max_block_lag=2, refresh_interval=15):
+        self.endpoints = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError('No endpoint given')
+        self.max_block_lag = max_block_lag
+        self.refresh_interval = refresh_interval
+        self.last_refresh = 0
+
+    def request(self, endpoint, method, *args, **kwargs):
+        start = time.time()
+        try:
+            response = getattr(endpoint.json_rpc, method)(*args, **kwargs)
+        except Exception as e:
+            # connection errors and invalid responses exclude the endpoint
+            endpoint.failed_at = time.time()
+            logger.info('Endpoint {} failed with error {}'.format(endpoint.url, e))
+            raise
+        latency = time.time() - start
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency = (1 - self.LATENCY_WEIGHT) * endpoint.latency + self.LATENCY_WEIGHT * latency
+        endpoint.failed_at = None
+        return response
+
+    def refresh(self):
+        """Updates block numbers of all endpoints"""
+        self.last_refresh = time.time()
+        for endpoint in self.endpoints:
+            try:
+                endpoint.block_number = int(self.request(endpoint, 'eth_blockNumber')['result'], 16)
+            except Exception:
+                pass
+
+    def get_healthy_endpoints(self):
+        if time.time() - self.last_refresh > self.refresh_interval:
+            self.refresh()
+        now = time.time()
+        max_block_number = max(endpoint.block_number for endpoint in self.endpoints)
+        healthy = [endpoint for endpoint in self.endpoints
+                   if (endpoint.failed_at is None or now - endpoint.failed_at > self.RETRY_AFTER) and
+                   max_block_number - endpoint.block_number <= self.max_block_lag]
+        # all endpoints are tried when none is healthy
+        return healthy if healthy else list(self.endpoints)
+
+    @staticmethod
+    def order_by_latency(endpoints):
+        """Returns endpoints in random order weighted by inverse latency, unmeasured endpoints first"""
+        ordered = [endpoint for endpoint in endpoints if endpoint.latency is None]
+        endpoints = [endpoint for endpoint in endpoints if endpoint.latency is not None]
+        while endpoints:
+            weights = [1.0 / max(endpoint.latency, 0.001) for endpoint in endpoints]
+            position = random.random() * sum(weights)
+            for index, weight in enumerate(weights):
+                position -= weight
+                if position <= 0 or index == len(weights) - 1:
+                    ordered.append(endpoints.pop(index))
+                    break
+        return ordered
+
+    def failover(self, endpoints, method, *args, **kwargs):
+        """Returns the first response without error, the first error response if all endpoints answered with errors"""
+        error = None
+        error_endpoints = []
+        error_response = None
+        for endpoint in endpoints:
+            try:
+                response = self.request(endpoint, method, *args, **kwargs)
+            except Exception as e:
+                error = e
+                continue
+            if 'error' not in response:
+                # errors of requests another endpoint answers are caused by the endpoint
+                for error_endpoint in error_endpoints:
+                    error_endpoint.failed_at = time.time()
+                    logger.info('Endpoint {} failed with error {}'.format(error_endpoint.url, error_response['error']))
+                return response
+            error_endpoints.append(endpoint)
+            error_response = error_response or response
+        if error_response is not None:
+            return error_response
+        raise error
+
+    def read(self, method, *args, **kwargs):
+        return self.failover(self.order_by_latency(self.get_healthy_endpoints()), method, *args, **kwargs)
+
+    def primary(self, method, *args, **kwargs):
+        """Sends request to endpoints in configured order, e.g. to reach the node with unlocked accounts"""
+        return self.failover(self.get_healthy_endpoints(), method, *args, **kwargs)
+
+    def broadcast(self, method, *args, **kwargs):
+        """Sends request to all healthy endpoints in parallel and returns the first successful response"""
+        responses = []
+
+        def send(endpoint):
+            try:
+                responses.append(self.request(endpoint, method, *args, **kwargs))
+            except Exception:
+                pass
+        threads = [threading.Thread(target=send, args=(endpoint,)) for endpoint in self.get_healthy_endpoints()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for response in responses:
+            if 'error' not in response:
+                return response
+        if responses:
+            return responses[0]
+        raise ValueError('Request {} failed on all endpoints'.format(method))
+
+    def eth_accounts(self):
+        return self.primary('eth_accounts')
+
+    def eth_blockNumber(self):
+        return self.read('eth_blockNumber')
+
+    def eth_getBalance(self, address, default_block='latest'):
+        return self.read('eth_getBalance', address, default_block=default_block)
+
+    def eth_getTransactionCount(self, address, default_block='latest'):
+        if default_block == 'pending':
+            return self.primary('eth_getTransactionCount', address, default_block=default_block)
+        return self.read('eth_getTransactionCount', address, default_block=default_block)
+
+    def eth_sendTransaction(self, *args, **kwargs):
+        return self.primary('eth_sendTransaction', *args, **kwargs)
+
+    def eth_sendRawTransaction(self, data):
+        return self.broadcast('eth_sendRawTransaction', data)
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        return self.read('eth_getTransactionReceipt', tx_hash)
+
+    def eth_call(self, *args, **kwargs):
+        return self.read('eth_call', *args, **kwargs)
+
+    def eth_estimateGas(self, *args, **kwargs):
+        return self.read('eth_estimateGas', *args, **kwargs)
@@ -0,0 +1,200 @@
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from ethtester import EthTesterRpc
+import click
+import json
+import logging
+import random
+import threading
+import time
+
+
+# create logger
+logger = logging.getLogger('NODE')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+
+class EthNode:
+    """
+    Translates JSON-RPC requests with standard parameters into calls of an EthTesterRpc chain. Requests are executed
+    one at a time. Every HTTP request is delayed by the configured latency plus a random jitter drawn from a seeded
+    generator, so throughput measurements are reproducible.
+    """
+
+    METHODS = ('eth_accounts', 'eth_blockNumber', 'eth_getBalance', 'eth_getTransactionCount', 'eth_sendTransaction',
+               'eth_sendRawTransaction', 'eth_getTransactionReceipt', 'eth_call', 'eth_estimateGas', 'eth_getLogs',
+               'net_version')
+
+    def __init__(self, block_time=0, latency=0, jitter=0, seed=0, private_keys=None):
+        self.rpc = EthTesterRpc(private_keys=private_keys, block_time=block_time)
+        self.block_time = block_time
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.running = False
+
+    @staticmethod
+    def quantity(value):
+        return int(value, 16) if isinstance(value, basestring) else value
+
+    def transaction_arguments(self, transaction):
+        return {
+            'from_address': transaction.get('from'),
+            'to_address': transaction.get('to'),
+            'gas': self.quantity(transaction.get('gas')),
+            'gas_price': self.quantity(transaction.get('gasPrice')),
+            'value': self.quantity(transaction.get('value')),
+            'data': transaction.get('data')
+        }
+
+    def eth_accounts(self):
+        return self.rpc.eth_accounts()
+
+    def eth_blockNumber(self):
+        return self.rpc.eth_blockNumber()
+
+    def eth_getBalance(self, address, default_block='latest'):
+        return self.rpc.eth_getBalance(address, default_block)
+
+    def eth_getTransactionCount(self, address, default_block='latest'):
+        return self.rpc.eth_getTransactionCount(address, default_block)
+
+    def eth_sendTransaction(self, transaction):
+        return self.rpc.eth_sendTransaction(nonce=self.quantity(transaction.get('nonce')),
+                                            **self.transaction_arguments(transaction))
+
+    def eth_sendRawTransaction(self, data):
+        return self.rpc.eth_sendRawTransaction(data)
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        return self.rpc.eth_getTransactionReceipt(tx_hash)
+
+    def eth_call(self, transaction, default_block='latest'):
+        return self.rpc.eth_call(default_block=default_block, **self.transaction_arguments(transaction))
+
+    def eth_estimateGas(self, transaction, default_block='latest'):
+        return self.rpc.eth_estimateGas(default_block=default_block, **self.transaction_arguments(transaction))
+
+    def eth_getLogs(self, filter_object):
+        return self.rpc.eth_getLogs(filter_object)
+
+    def net_version(self):
+        return self.rpc.result('1')
+
+    def handle(self, request):
+        """Returns response to a single JSON-RPC request"""
+        if not isinstance(request, dict) or request.get('method') not in self.METHODS:
+            response = {'jsonrpc': '2.0', 'error': {'code': -32601, 'message': 'Method not found'}}
+        else:
+            try:
+                with self.lock:
+                    response = getattr(self, request['method'])(*request.get('params', []))
+            except TypeError as e:
+                response = {'jsonrpc': '2.0', 'error': {'code': -32602, 'message': str(e)}}
+            except Exception as e:
+                response = self.rpc.error(str(e))
+        response['id'] = request.get('id') if isinstance(request, dict) else None
+        return response
+
+    def delay(self):
+        if self.latency or self.jitter:
+            with self.lock:
+                delay = self.latency + self.random.uniform(0, self.jitter)
+            time.sleep(delay)
+
+    def mine_blocks(self):
+        while self.running:
+            time.sleep(self.block_time)
+            with self.lock:
+                self.rpc.mine()
+
+    def start_mining(self):
+        if self.block_time:
+            self.running = True
+            thread = threading.Thread(target=self.mine_blocks)
+            thread.daemon = True
+            thread.start()
+
+    def stop_mining(self):
+        self.running = False
+
+
+class JsonRpcHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.getheader('content-length'))))
+        except ValueError:
+            request = None
+        self.server.node.delay()
+        if request is None:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}}
+        elif isinstance(request, list):
+            # batch request
+            response = [self.server.node.handle(r) for r in request]
+        else:
+            response = self.server.node.handle(request)
+        body = json.dumps(response)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class JsonRpcServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, node):
+        HTTPServer.__init__(self, address, JsonRpcHandler)
+        self.node = node
+
+
+def start_node(host='localhost', port=8545, block_time=0, latency=0, jitter=0, seed=0, private_keys=None):
+    """Serves a node in a background thread and returns the server, e.g. to run deployments against it in-process"""
+    node = EthNode(block_time, latency, jitter, seed, private_keys)
+    server = JsonRpcServer((host, port), node)
+    node.start_mining()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def stop_node(server):
+    server.node.stop_mining()
+    server.shutdown()
+    server.server_close()
+
+
+@click.command()
+@click.option('--host', default='localhost', help='Host the node listens on')
+@click.option('--port', default=8545, help='Port the node listens on')
+@click.option('--block-time', default=0.0, help='Seconds between mined blocks, 0 mines every transaction immediately')
+@click.option('--latency', default=0.0, help='Seconds every request is delayed')
+@click.option('--jitter', default=0.0, help='Maximum random seconds added to the latency')
+@click.option('--seed', default=0, help='Seed of the random jitter')
+@click.option('--key-pool-path', help='Path to file with one private key per line of additionally funded accounts')
+def setup(host, port, block_time, latency, jitter, seed, key_pool_path):
+    private_keys = []
+    if key_pool_path:
+        with open(key_pool_path, 'r') as key_pool_file:
+            private_keys = [line.strip().decode('hex') for line in key_pool_file if line.strip()]
+    node = EthNode(block_time, latency, jitter, seed, private_keys)
+    server = JsonRpcServer((host, port), node)
+    node.start_mining()
+    logger.info('Serving JSON-RPC on {}:{}'.format(host, port))
+    server.serve_forever()
+
+if __name__ == '__main__':
+    setup()
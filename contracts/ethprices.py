@@ -0,0 +1,89 @@
+from ethbatch import BatchClient, http_request
+import click
+import json
+import logging
+import os
+
+
+# create logger
+logger = logging.getLogger('PRICES')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+ONE = 2**64
+
+
+class MarketPriceReader:
+    """
+    Reads marginal prices, outcome token distributions and funding of many markets from a market maker, sending one
+    eth_call per market in JSON-RPC batch requests.
+    """
+
+    def __init__(self, protocol, host, port, market_maker, batch_size=100, abi_path=None):
+        self.client = BatchClient(http_request('{}://{}:{}'.format(protocol, host, port)), batch_size)
+        self.market_maker = '0x' + (market_maker[2:] if market_maker.startswith('0x') else market_maker)
+        self.abi_path = abi_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abi/LMSRMarketMaker.json')
+        self._translator = None
+
+    @property
+    def translator(self):
+        # ABI translator is created on first use
+        if self._translator is None:
+            from ethereum.abi import ContractTranslator
+            with open(self.abi_path, 'r') as abi_file:
+                self._translator = ContractTranslator(json.load(abi_file))
+        return self._translator
+
+    def get_calls(self, markets, default_block):
+        return [[{
+            'to': self.market_maker,
+            'data': '0x' + self.translator.encode('calcMarginalPrices', [market]).encode('hex')
+        }, default_block] for market in markets]
+
+    def decode(self, response):
+        if 'error' in response or response.get('result') in (None, '0x'):
+            # markets without funding or event can't be priced
+            return None
+        marginal_prices, outcome_token_distribution, funding = self.translator.decode(
+            'calcMarginalPrices', response['result'][2:].decode('hex'))
+        return {
+            'marginal_prices': marginal_prices,
+            'outcome_token_distribution': outcome_token_distribution,
+            'funding': funding
+        }
+
+    def get_prices(self, markets, default_block='latest'):
+        """Returns dict mapping market addresses to prices, distribution and funding or None if the call failed"""
+        markets = [market[2:] if market.startswith('0x') else market for market in markets]
+        responses = self.client.responses('eth_call', self.get_calls(markets, default_block))
+        return dict((market, self.decode(response)) for market, response in zip(markets, responses))
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--market-maker', required=True, help='Market maker address')
+@click.option('--markets', required=True, help='Comma separated list of market addresses')
+@click.option('--batch-size', default=100, help='Number of markets per batch request')
+@click.option('--block', default='latest', help='Block to read prices at')
+@click.option('--output', help='File prices are written to as JSON')
+def setup(protocol, host, port, market_maker, markets, batch_size, block, output):
+    reader = MarketPriceReader(protocol, host, port, market_maker, batch_size)
+    prices = reader.get_prices([market for market in markets.split(',') if market], block)
+    for market, market_prices in sorted(prices.items()):
+        if market_prices is None:
+            logger.info('{}: no prices'.format(market))
+        else:
+            logger.info('{}: {}'.format(market, ', '.join('{:.4f}'.format(float(price) / ONE)
+                                                          for price in market_prices['marginal_prices'])))
+    if output:
+        with open(output, 'w') as prices_file:
+            json.dump(prices, prices_file, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    setup()
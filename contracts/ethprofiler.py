@@ -0,0 +1,296 @@
+import logging
+
+
+# pyethereum's trace level, VM operations are only logged at this level
+TRACE = 5
+CALL_OPS = ('CALL', 'CALLCODE', 'DELEGATECALL')
+CREATE_OPS = ('CREATE',)
+HALT_OPS = ('STOP', 'RETURN', 'SUICIDE', 'INVALID')
+
+
+def to_int(value):
+    # stack items are logged as decimal strings
+    if isinstance(value, (int, long)):
+        return value
+    return int(value, 16) if value.startswith('0x') else int(value)
+
+
+def to_hex_address(address):
+    if len(address) == 20:
+        return address.encode('hex')
+    return address[2:] if address.startswith('0x') else address
+
+
+def get_push4_values(code):
+    """Returns all values pushed by PUSH4 in bytecode, which include the selectors of the dispatcher"""
+    values = set()
+    position = 0
+    while position < len(code):
+        op = ord(code[position])
+        if 0x60 <= op <= 0x7f:
+            size = op - 0x5f
+            if size == 4:
+                values.add(int(code[position + 1:position + 5].encode('hex') or '0', 16))
+            position += size
+        position += 1
+    return values
+
+
+class TraceHandler(logging.Handler):
+    """Passes VM trace records to a function as dicts of their fields, like pyethereum's log listeners"""
+
+    def __init__(self, function):
+        logging.Handler.__init__(self, TRACE)
+        self.function = function
+
+    def emit(self, record):
+        self.function(dict(getattr(record, 'kwargs', {}), event=getattr(record, 'original_msg', '')))
+
+
+class Frame:
+    """Execution of one message: a transaction, a call into another contract or a contract creation"""
+
+    def __init__(self, parent, depth, address=None, kind='call'):
+        self.parent = parent
+        self.depth = depth
+        self.address = address
+        self.kind = kind
+        self.selector = None
+        # steps and program counter of the last operation
+        self.steps = None
+        self.pc = None
+        # gas used by this frame including nested frames
+        self.gas = 0
+        # gas used by nested frames since the last operation of this frame
+        self.nested_gas = 0
+        # last operation and gas available before it, its costs are known once the next operation is logged
+        self.pending = None
+        self.pending_stack = []
+
+
+class EthProfiler:
+    """
+    Traces the operations pyethereum's VM executes for a call and aggregates gas and counts by opcode, by callee
+    contract and by function, including nested calls and library calls. Contracts dict maps contract names to ABIs,
+    names dict maps hex encoded addresses to contract names. Addresses not contained in names are identified by
+    comparing the selectors in their code with the ABIs.
+
+    Gas of an operation is the difference of the gas available before it and before the next operation of the same
+    frame, minus gas used by nested frames. The last operation of a frame is counted with its base fee and intrinsic
+    transaction gas is not traced.
+    """
+
+    def __init__(self, state, contracts, names=None):
+        self.state = state
+        # selectors dict maps contract names to dicts mapping selectors to function names
+        self.selectors = {}
+        for name, abi in contracts.items():
+            self.selectors[name] = self.get_selectors(abi)
+        self.known_selectors = set()
+        for selectors in self.selectors.values():
+            self.known_selectors.update(selectors)
+        self.names = dict(names or {})
+        self._fees = None
+        self.reset()
+
+    @staticmethod
+    def get_selectors(abi):
+        from ethereum.abi import method_id
+        selectors = {}
+        for description in abi:
+            if description.get('type', 'function') == 'function':
+                types = [argument['type'] for argument in description['inputs']]
+                selectors[method_id(description['name'], types)] = description['name']
+        return selectors
+
+    @property
+    def fees(self):
+        # base fees of opcodes are loaded on first use
+        if self._fees is None:
+            from ethereum import opcodes
+            self._fees = dict((name, fee) for name, _, _, fee in opcodes.opcodes.values())
+        return self._fees
+
+    def reset(self):
+        # operations dict maps (frames, op) tuples to [count, gas]
+        self.operations = {}
+        self.frames = []
+        self.frame = None
+        self.root_address = None
+        self.root_kind = 'call'
+
+    def record(self, frame, op, gas):
+        frames = []
+        while frame:
+            frames.append(frame)
+            frame = frame.parent
+        key = (tuple(reversed(frames)), op)
+        operation = self.operations.setdefault(key, [0, 0])
+        operation[0] += 1
+        operation[1] += gas
+
+    def finish_operation(self, frame, gas_after=None):
+        if frame.pending is None:
+            return
+        op, gas_before = frame.pending
+        if gas_after is None:
+            gas = self.fees.get(op, 0)
+        else:
+            gas = max(gas_before - gas_after - frame.nested_gas, 0)
+        frame.gas += gas + frame.nested_gas
+        frame.nested_gas = 0
+        frame.pending = None
+        self.record(frame, op, gas)
+
+    def exit_frame(self, stack=None):
+        frame = self.frame
+        self.finish_operation(frame)
+        self.frame = frame.parent
+        self.frame.nested_gas += frame.gas
+        # created contracts are only known after creation, their address is pushed onto the stack of the creator
+        if frame.address is None and frame.kind == 'create' and stack:
+            frame.address = '{:040x}'.format(to_int(stack[-1]))
+
+    @staticmethod
+    def continues(frame, record):
+        """
+        Returns whether a record is the next operation of a frame. Records of a frame have consecutive steps, follow
+        the program counter and don't gain gas, as a frame failing with an exception doesn't log further operations.
+        """
+        if frame.pending is None or frame.pending[0] in HALT_OPS or to_int(record['steps']) != frame.steps + 1:
+            return False
+        op, gas = frame.pending
+        if to_int(record['gas']) > gas:
+            return False
+        if op in ('JUMP', 'JUMPI'):
+            pcs = [to_int(frame.pending_stack[-1])] if frame.pending_stack else []
+            if op == 'JUMPI':
+                pcs.append(frame.pc + 1)
+        else:
+            pcs = [frame.pc + 1 + (int(op[4:]) if op.startswith('PUSH') else 0)]
+        return to_int(record['pc']) in pcs
+
+    def handle(self, record):
+        if record.get('event') != 'vm' or 'op' not in record:
+            return
+        gas = to_int(record['gas'])
+        stack = record.get('stack') or []
+        # depth and address are only logged with the first operation of a frame
+        if record.get('steps') == 0:
+            depth = record['depth']
+            if self.frame is not None and depth == 0:
+                # function sent another transaction
+                self.finish()
+            if self.frame is None:
+                self.frame = Frame(None, depth, self.root_address, self.root_kind)
+            else:
+                while self.frame.depth >= depth:
+                    self.exit_frame()
+                # operation entering the frame is still pending in the parent
+                op = self.frame.pending[0] if self.frame.pending else None
+                address = None
+                if op in CALL_OPS and len(self.frame.pending_stack) >= 2:
+                    address = '{:040x}'.format(to_int(self.frame.pending_stack[-2]) % 2**160)
+                self.frame = Frame(self.frame, depth, address, 'create' if op in CREATE_OPS else 'call')
+            self.frames.append(self.frame)
+        elif self.frame is not None:
+            # nested frames without further operations returned or failed
+            while self.frame.parent and not self.continues(self.frame, record):
+                self.exit_frame(stack if self.continues(self.frame.parent, record) else None)
+            self.finish_operation(self.frame, gas)
+        else:
+            return
+        frame = self.frame
+        if 'address' in record and frame.address is None:
+            frame.address = to_hex_address(record['address'])
+        # first successful comparison with a known selector is the dispatcher choosing the function
+        if record['op'] == 'EQ' and frame.selector is None and len(stack) >= 2 and stack[-1] == stack[-2]:
+            value = to_int(stack[-1])
+            if value in self.known_selectors:
+                frame.selector = value
+        frame.pending = (record['op'], gas)
+        frame.pending_stack = stack
+        frame.steps = to_int(record['steps'])
+        frame.pc = to_int(record['pc'])
+
+    def finish(self):
+        if self.frame is None:
+            return
+        while self.frame.parent:
+            self.exit_frame()
+        self.finish_operation(self.frame)
+        self.frame = None
+
+    def get_contract_name(self, address):
+        if address is None:
+            return 'unknown'
+        if address not in self.names:
+            code = self.state.block.get_code(address.decode('hex'))
+            values = get_push4_values(code)
+            candidates = [name for name, selectors in self.selectors.items()
+                          if selectors and set(selectors).issubset(values)]
+            # most specific contract wins, abstract contracts have the same selectors as their implementations
+            candidates.sort(key=lambda name: (-len(self.selectors[name]), name.startswith('Abstract'), name))
+            self.names[address] = candidates[0] if candidates else address
+        return self.names[address]
+
+    def get_label(self, frame):
+        contract = self.get_contract_name(frame.address)
+        if frame.kind == 'create':
+            function = 'constructor'
+        elif frame.selector is None:
+            function = 'fallback'
+        else:
+            function = self.selectors.get(contract, {}).get(frame.selector)
+            if function is None:
+                function = next((selectors[frame.selector] for selectors in self.selectors.values()
+                                 if frame.selector in selectors), '{:08x}'.format(frame.selector))
+        return contract, '{}.{}'.format(contract, function)
+
+    def profile(self, function, *args, **kwargs):
+        """
+        Calls function with arguments and returns its result and the profile of all operations executed by it.
+        Keyword argument address is the hex encoded address of the called contract, create marks function as a
+        contract creation.
+        """
+        from ethereum import slogging
+        self.reset()
+        self.root_address = kwargs.pop('address', None)
+        self.root_kind = 'create' if kwargs.pop('create', False) else 'call'
+        vm_logger = slogging.get_logger('eth.vm.op')
+        level, propagate = vm_logger.level, vm_logger.propagate
+        trace_handler = TraceHandler(self.handle)
+        # trace records are passed to the profiler only, log listeners are only called by the root logger
+        vm_logger.setLevel(TRACE)
+        vm_logger.propagate = False
+        vm_logger.addHandler(trace_handler)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            vm_logger.removeHandler(trace_handler)
+            vm_logger.setLevel(level)
+            vm_logger.propagate = propagate
+            self.finish()
+        return result, self.get_profile()
+
+    def get_profile(self):
+        """Returns gas and counts by opcode, contract and function and stacks in flamegraph's folded format"""
+        labels = dict((frame, self.get_label(frame)) for frame in self.frames)
+        profile = {'gas': 0, 'count': 0, 'opcodes': {}, 'contracts': {}, 'functions': {}, 'stacks': {}}
+        for (frames, op), (count, gas) in self.operations.items():
+            contract, function = labels[frames[-1]]
+            stack = ';'.join([labels[frame][1] for frame in frames] + [op])
+            profile['gas'] += gas
+            profile['count'] += count
+            for group, key in (('opcodes', op), ('contracts', contract), ('functions', function),
+                               ('stacks', stack)):
+                entry = profile[group].setdefault(key, {'count': 0, 'gas': 0})
+                entry['count'] += count
+                entry['gas'] += gas
+        return profile
+
+    @staticmethod
+    def get_folded_stacks(profile):
+        """Returns lines for flamegraph.pl weighted by gas"""
+        return ['{} {}'.format(stack, entry['gas']) for stack, entry in sorted(profile['stacks'].items())
+                if entry['gas']]
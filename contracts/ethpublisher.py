@@ -0,0 +1,295 @@
+from ethbatch import BatchClient, is_mined, is_successful
+from multiprocessing import Pool
+import click
+import json
+import logging
+import os
+import time
+
+
+# create logger
+logger = logging.getLogger('PUBLISHER')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abi/SignedMessageOracle.json')
+
+
+def i2b(_integer, zfill=64):
+    return format(_integer % 2**256, 'x').zfill(zfill).decode('hex')
+
+
+def sign_outcome(arguments):
+    """
+    Returns v, r and s of the signature of an outcome for SignedMessageOracle.setOutcome and the address recovered from
+    the signature. Runs in worker processes.
+    """
+    from bitcoin import ecdsa_raw_sign, ecdsa_raw_recover, encode_pubkey
+    from ethereum.utils import sha3
+    description_hash, outcome, private_key = arguments
+    result_hash = sha3(description_hash + i2b(outcome))
+    v, r, s = ecdsa_raw_sign(result_hash, private_key)
+    public_key = ecdsa_raw_recover(result_hash, (v, r, s))
+    recovered = sha3(encode_pubkey(public_key, 'bin')[1:])[12:].encode('hex') if public_key else None
+    return v, i2b(r), i2b(s), recovered
+
+
+def sign_transaction(arguments):
+    """Returns raw transaction signed with private key. Runs in worker processes."""
+    from ethereum.transactions import Transaction
+    import rlp
+    nonce, gas_price, gas, to, data, private_key = arguments
+    tx = Transaction(nonce, gas_price, gas, to, 0, data)
+    tx.sign(private_key)
+    return '0x' + rlp.encode(tx).encode('hex')
+
+
+def read_outcomes(path):
+    """Returns (oracle, outcome) pairs of a file with one comma separated pair per line"""
+    outcomes = []
+    with open(path, 'r') as outcomes_file:
+        for line in outcomes_file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                oracle, outcome = line.split(',')
+                oracle = oracle.strip().lower()
+                outcomes.append((oracle if oracle.startswith('0x') else '0x' + oracle, int(outcome)))
+    return outcomes
+
+
+class EthPublisher:
+    """
+    Sets outcomes of many SignedMessageOracles. Signer, description hash and state of all oracles are read in JSON-RPC
+    batch requests. Outcomes are signed across a process pool and every signature is recovered and compared to the
+    oracle's signer before it is sent, so setOutcome transactions are only sent if they can succeed. Transactions are
+    signed in the pool too, sent in batches with consecutive nonces and their receipts are only awaited when the
+    pipeline is full. Transactions queued behind a rejected nonce and transactions without receipt after the pending
+    timeout are counted as failed instead of being awaited.
+    """
+
+    def __init__(self, request, signer_key, sender, private_key=None, processes=None, batch_size=100,
+                 pipeline_depth=500, gas=100000, gas_price=20000000000, poll_interval=1, pending_timeout=600):
+        self.client = BatchClient(request, batch_size)
+        self.signer_key = signer_key
+        self.sender = sender.lower()
+        self.private_key = private_key
+        self.processes = processes
+        self.batch_size = batch_size
+        self.pipeline_depth = pipeline_depth
+        self.gas = gas
+        self.gas_price = gas_price
+        self.poll_interval = poll_interval
+        self.pending_timeout = pending_timeout
+        self._translator = None
+        self.stats = {'published': 0, 'already_set': 0, 'unknown': 0, 'wrong_signer': 0, 'failed': 0}
+
+    @property
+    def translator(self):
+        # ABI translator is created on first use
+        if self._translator is None:
+            from ethereum.abi import ContractTranslator
+            with open(ABI_PATH, 'r') as abi_file:
+                self._translator = ContractTranslator(json.load(abi_file))
+        return self._translator
+
+    def read_oracles(self, oracles):
+        """Returns dict mapping oracle addresses to signer, description hash and isSet, None if they can't be read"""
+        functions = ('signer', 'descriptionHash', 'isSet')
+        params_list = [[{'to': oracle, 'data': '0x' + self.translator.encode(function, []).encode('hex')}, 'latest']
+                       for oracle in oracles for function in functions]
+        results = self.client.results('eth_call', params_list)
+        states = {}
+        for i, oracle in enumerate(oracles):
+            values = results[i * len(functions):(i + 1) * len(functions)]
+            if any(not isinstance(value, basestring) or value == '0x' for value in values):
+                states[oracle] = None
+                continue
+            states[oracle] = dict((function, self.translator.decode(function, value[2:].decode('hex'))[0])
+                                  for function, value in zip(functions, values))
+        return states
+
+    def map(self, function, arguments):
+        if self.processes == 1:
+            return map(function, arguments)
+        pool = Pool(self.processes)
+        try:
+            return pool.map(function, arguments, max(len(arguments) // (4 * (self.processes or 4)), 1))
+        finally:
+            pool.close()
+            pool.join()
+
+    def get_signer_address(self):
+        from ethereum.utils import privtoaddr
+        return privtoaddr(self.signer_key).encode('hex')
+
+    def sign(self, outcomes):
+        """Returns signatures of (oracle, outcome) pairs whose oracles are not set yet and have the configured signer"""
+        states = self.read_oracles(sorted(set(oracle for oracle, _ in outcomes)))
+        signer = self.get_signer_address()
+        signable = []
+        for oracle, outcome in outcomes:
+            state = states[oracle]
+            if state is None:
+                logger.warning('Oracle {} could not be read'.format(oracle))
+                self.stats['unknown'] += 1
+            elif state['isSet']:
+                self.stats['already_set'] += 1
+            elif state['signer'] != signer:
+                logger.warning('Oracle {} is signed by {}, not by {}'.format(oracle, state['signer'], signer))
+                self.stats['wrong_signer'] += 1
+            else:
+                signable.append((oracle, outcome, state['descriptionHash']))
+        signatures = self.map(sign_outcome, [(description_hash, outcome, self.signer_key)
+                                             for _, outcome, description_hash in signable])
+        signed = []
+        for (oracle, outcome, _), (v, r, s, recovered) in zip(signable, signatures):
+            # setOutcome fails if the recovered signer differs from the oracle's signer
+            if recovered != states[oracle]['signer']:
+                logger.warning('Signature for oracle {} recovers {}'.format(oracle, recovered))
+                self.stats['wrong_signer'] += 1
+                continue
+            signed.append((oracle, outcome, v, r, s))
+        return signed
+
+    def get_nonce(self):
+        return int(self.client.results('eth_getTransactionCount', [[self.sender, 'pending']])[0], 16)
+
+    def get_transactions(self, signed):
+        """Returns method, parameters and first nonce of setOutcome transactions with consecutive nonces"""
+        nonce = self.get_nonce()
+        data = [self.translator.encode('setOutcome', [outcome, v, r, s]) for _, outcome, v, r, s in signed]
+        if self.private_key:
+            raw_transactions = self.map(sign_transaction, [
+                (nonce + i, self.gas_price, self.gas, oracle[2:].decode('hex'), data[i], self.private_key)
+                for i, (oracle, _, _, _, _) in enumerate(signed)])
+            return 'eth_sendRawTransaction', [[raw_transaction] for raw_transaction in raw_transactions], nonce
+        return 'eth_sendTransaction', [[{'from': self.sender, 'to': oracle, 'data': '0x' + data[i].encode('hex'),
+                                         'gas': hex(self.gas).rstrip('L'), 'gasPrice': hex(self.gas_price).rstrip('L'),
+                                         'nonce': hex(nonce + i).rstrip('L')}]
+                                       for i, (oracle, _, _, _, _) in enumerate(signed)], nonce
+
+    def check_receipts(self, pending):
+        """Counts published outcomes of mined (oracle, transaction hash, nonce) tuples and returns the others"""
+        receipts = self.client.results('eth_getTransactionReceipt',
+                                       [[transaction_hash] for _, transaction_hash, _ in pending])
+        waiting = []
+        for (oracle, transaction_hash, nonce), receipt in zip(pending, receipts):
+            if not is_mined(receipt):
+                waiting.append((oracle, transaction_hash, nonce))
+            elif is_successful(receipt, self.gas):
+                self.stats['published'] += 1
+            else:
+                logger.warning('Setting outcome of oracle {} failed in transaction {}'.format(oracle, transaction_hash))
+                self.stats['failed'] += 1
+        return waiting
+
+    def drop_queued(self, pending):
+        """Counts transactions whose nonces are not pending at the node as failed and returns the others"""
+        pending_nonce = self.get_nonce()
+        waiting = []
+        for oracle, transaction_hash, nonce in pending:
+            if nonce < pending_nonce:
+                waiting.append((oracle, transaction_hash, nonce))
+                continue
+            logger.warning('Setting outcome of oracle {} waits for a missing nonce in transaction {}'.format(
+                oracle, transaction_hash))
+            self.stats['failed'] += 1
+        return waiting
+
+    def wait_for_receipts(self, pending):
+        """Waits for receipts of (oracle, transaction hash, nonce) tuples and counts published outcomes"""
+        timeout = time.time() + self.pending_timeout
+        pending = self.check_receipts(pending)
+        while pending and time.time() < timeout:
+            time.sleep(self.poll_interval)
+            pending = self.check_receipts(pending)
+        if pending:
+            pending = self.drop_queued(pending)
+        for oracle, transaction_hash, _ in pending:
+            logger.warning('Setting outcome of oracle {} was not mined within {}s in transaction {}'.format(
+                oracle, self.pending_timeout, transaction_hash))
+            self.stats['failed'] += 1
+
+    def send(self, signed):
+        """Sends setOutcome transactions of signed outcomes in batches"""
+        method, params_list, nonce = self.get_transactions(signed)
+        pending = []
+        for start in range(0, len(params_list), self.batch_size):
+            batch = signed[start:start + self.batch_size]
+            results = self.client.results(method, params_list[start:start + self.batch_size])
+            failed = False
+            for i, ((oracle, _, _, _, _), result) in enumerate(zip(batch, results)):
+                if isinstance(result, basestring):
+                    pending.append((oracle, result, nonce + start + i))
+                else:
+                    logger.warning('Setting outcome of oracle {} failed: {}'.format(oracle, result))
+                    self.stats['failed'] += 1
+                    failed = True
+            if failed:
+                # later nonces can't be mined before a rejected nonce, so remaining transactions are not sent and
+                # accepted transactions queued behind the rejected nonce are not awaited
+                self.stats['failed'] += len(signed) - start - len(batch)
+                pending = self.check_receipts(pending)
+                if pending:
+                    pending = self.drop_queued(pending)
+                break
+            if len(pending) >= self.pipeline_depth:
+                self.wait_for_receipts(pending)
+                pending = []
+        self.wait_for_receipts(pending)
+
+    def publish(self, outcomes):
+        """Signs and sends outcomes of (oracle, outcome) pairs and returns counts of published and skipped outcomes"""
+        start = time.time()
+        signed = self.sign(outcomes)
+        logger.info('Signed {} of {} outcomes in {:.3f}s'.format(len(signed), len(outcomes), time.time() - start))
+        if signed:
+            self.send(signed)
+        logger.info('Published {} outcomes in {:.3f}s'.format(self.stats['published'], time.time() - start))
+        return self.stats
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--outcomes', required=True, help='File with one comma separated oracle address and outcome per line')
+@click.option('--signer-key-path', required=True, help='Path to private key of the oracles\' signer')
+@click.option('--account', help='Default account used as from parameter')
+@click.option('--private-key-path', help='Path to private key transactions are signed with')
+@click.option('--processes', type=int, help='Number of signing processes, defaults to the number of CPUs')
+@click.option('--batch-size', default=100, help='Number of requests per batch request')
+@click.option('--pipeline-depth', default=500, help='Maximum number of sent transactions without receipt')
+@click.option('--gas', default=100000, help='Transaction gas')
+@click.option('--gas-price', default=20000000000, help='Transaction gas price')
+@click.option('--pending-timeout', default=600, help='Seconds receipts of sent transactions are awaited')
+@click.option('--output', help='File counts of published and skipped outcomes are written to as JSON')
+def setup(protocol, host, port, outcomes, signer_key_path, account, private_key_path, processes, batch_size,
+          pipeline_depth, gas, gas_price, pending_timeout, output):
+    from ethdecoder import NodeReader
+    reader = NodeReader(protocol, host, port)
+    with open(signer_key_path, 'r') as signer_key_file:
+        signer_key = signer_key_file.read().strip().decode('hex')
+    private_key = None
+    if private_key_path:
+        from ethereum.utils import privtoaddr
+        with open(private_key_path, 'r') as private_key_file:
+            private_key = private_key_file.read().strip().decode('hex')
+        account = privtoaddr(private_key).encode('hex')
+    elif not account:
+        account = reader.request({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_accounts', 'params': []})['result'][0]
+    account = account if account.startswith('0x') else '0x' + account
+    publisher = EthPublisher(reader.request, signer_key, account, private_key, processes, batch_size, pipeline_depth,
+                             gas, gas_price, pending_timeout=pending_timeout)
+    stats = publisher.publish(read_outcomes(outcomes))
+    logger.info(json.dumps(stats, sort_keys=True))
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump(stats, output_file, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    setup()
@@ -0,0 +1,254 @@
+from ethereum import tester as t
+from ethereum import processblock as pb
+from ethereum.transactions import Transaction
+from ethereum.utils import mk_contract_address, privtoaddr
+import rlp
+
+
+class EthTesterRpc:
+    """
+    Serves the JSON-RPC methods used by EthDeploy from an in-process pyethereum tester chain.
+    Responses have the same format as ethjsonrpc responses. Without block time every transaction is mined in its own
+    block, otherwise transactions are collected in the current block until mine is called.
+    """
+
+    GAS_LIMIT = 4712388 * 10
+    BALANCE = 10**30
+
+    def __init__(self, private_keys=None, nonce=0, block_time=0):
+        self.state = t.state()
+        self.state.block.gas_limit = self.GAS_LIMIT
+        # keys dict maps addresses of unlocked accounts to private keys
+        self.keys = {}
+        for key in list(t.keys) + list(private_keys or []):
+            address = privtoaddr(key)
+            self.keys[address] = key
+            self.state.block.set_balance(address, self.BALANCE)
+            if key not in t.keys:
+                self.state.block.set_nonce(address, nonce)
+        self.block_time = block_time
+        # receipts dict maps transaction hashes to transaction receipts
+        self.receipts = {}
+        # receipts of transactions in the current block, stored when the block is mined
+        self.pending_receipts = []
+        # logs list contains logs of all mined transactions
+        self.logs = []
+
+    @staticmethod
+    def result(result):
+        return {'jsonrpc': '2.0', 'id': 1, 'result': result}
+
+    @staticmethod
+    def error(message):
+        return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': message}}
+
+    @staticmethod
+    def int2hex(i):
+        return hex(i).rstrip('L')
+
+    @staticmethod
+    def hex2bin(_hex):
+        if _hex is None:
+            return ''
+        _hex = _hex[2:] if _hex.startswith('0x') else _hex
+        return _hex.decode('hex')
+
+    @staticmethod
+    def bin2hex(_bin):
+        return '0x' + _bin.encode('hex')
+
+    def get_key(self, address):
+        address = self.hex2bin(address)
+        if address not in self.keys:
+            raise ValueError('Account {} is not unlocked'.format(self.bin2hex(address)))
+        return self.keys[address]
+
+    def make_transaction(self, from_address, to_address, gas, gas_price, value, data, nonce=None):
+        key = self.get_key(from_address) if from_address else t.k0
+        if nonce is None:
+            nonce = self.state.block.get_nonce(privtoaddr(key))
+        tx = Transaction(nonce, gas_price or 0, gas or self.GAS_LIMIT, self.hex2bin(to_address), value or 0,
+                         self.hex2bin(data))
+        tx.sign(key)
+        return tx
+
+    def apply(self, tx):
+        block = self.state.block
+        gas_used_before = block.gas_used
+        success, output = pb.apply_transaction(block, tx)
+        return success, output, block.gas_used - gas_used_before
+
+    def format_log(self, log, receipt, log_index):
+        return {
+            'address': self.bin2hex(log.address),
+            'topics': ['0x{:064x}'.format(topic) for topic in log.topics],
+            'data': self.bin2hex(log.data),
+            'blockNumber': receipt['blockNumber'],
+            'transactionHash': receipt['transactionHash'],
+            'transactionIndex': receipt['transactionIndex'],
+            'logIndex': self.int2hex(log_index)
+        }
+
+    def execute(self, tx):
+        """
+        Applies transaction to the current block and stores its receipt. Failed transactions are included with all gas
+        used and status 0x0, only transactions which can't be included are rejected with an error.
+        """
+        block = self.state.block
+        if self.block_time and block.gas_used + tx.startgas > block.gas_limit:
+            self.mine()
+            block = self.state.block
+        try:
+            success, output, gas_used = self.apply(tx)
+        except Exception as e:
+            return self.error(str(e))
+        transaction_index = block.transaction_count - 1
+        receipt = {
+            'transactionHash': self.bin2hex(tx.hash),
+            'transactionIndex': self.int2hex(transaction_index),
+            'blockNumber': self.int2hex(block.number),
+            'gasUsed': self.int2hex(gas_used),
+            'cumulativeGasUsed': self.int2hex(block.gas_used),
+            'contractAddress': self.bin2hex(mk_contract_address(tx.sender, tx.nonce)) if not tx.to else None,
+            'status': self.int2hex(1 if success else 0),
+            'logs': []
+        }
+        for log in block.get_receipt(transaction_index).logs:
+            receipt['logs'].append(self.format_log(log, receipt, len(receipt['logs'])))
+        self.pending_receipts.append(receipt)
+        if not self.block_time:
+            self.mine()
+        return self.result(receipt['transactionHash'])
+
+    def mine(self):
+        """Mines the current block, so receipts of its transactions become available"""
+        for receipt in self.pending_receipts:
+            self.receipts[receipt['transactionHash']] = receipt
+            self.logs += receipt['logs']
+        self.pending_receipts = []
+        self.state.mine()
+        self.state.block.gas_limit = self.GAS_LIMIT
+
+    def simulate(self, tx):
+        """Applies transaction and reverts state afterwards"""
+        block = self.state.block
+        # applied transactions commit their state changes, so the snapshot starts from committed state and the
+        # journal of reverted cache changes is not replayed
+        block.commit_state()
+        snapshot = dict(block.snapshot(), journal=[], journal_size=0)
+        transactions_root, receipts_root, bloom = block.transactions.root_hash, block.receipts.root_hash, block.bloom
+        gas_limit = block.gas_limit
+        # simulated transactions are not limited by gas used by other transactions of the current block
+        block.gas_limit = max(gas_limit, block.gas_used + tx.startgas)
+        try:
+            return self.apply(tx)
+        finally:
+            block.gas_limit = gas_limit
+            block.revert(snapshot)
+            block.transactions.root_hash = transactions_root
+            block.receipts.root_hash = receipts_root
+            block.bloom = bloom
+
+    def eth_accounts(self):
+        return self.result([self.bin2hex(a) for a in t.accounts])
+
+    def get_latest_block_number(self):
+        # current block is not mined yet
+        return self.state.block.number - 1
+
+    def get_block_number(self, block, default):
+        if block is None:
+            return default
+        if block in ('latest', 'pending'):
+            return self.get_latest_block_number()
+        if block == 'earliest':
+            return 0
+        return int(block, 16) if isinstance(block, basestring) else block
+
+    def eth_blockNumber(self):
+        return self.result(self.int2hex(self.get_latest_block_number()))
+
+    def eth_getBalance(self, address, default_block='latest'):
+        return self.result(self.int2hex(self.state.block.get_balance(self.hex2bin(address))))
+
+    def eth_getTransactionCount(self, address, default_block='latest'):
+        return self.result(self.int2hex(self.state.block.get_nonce(self.hex2bin(address))))
+
+    def eth_sendTransaction(self, from_address, to_address=None, gas=None, gas_price=None, value=None, data=None,
+                            nonce=None):
+        try:
+            tx = self.make_transaction(from_address, to_address, gas, gas_price, value, data, nonce)
+        except ValueError as e:
+            return self.error(str(e))
+        return self.execute(tx)
+
+    def eth_sendRawTransaction(self, data):
+        try:
+            tx = rlp.decode(self.hex2bin(data), Transaction)
+        except Exception as e:
+            return self.error(str(e))
+        return self.execute(tx)
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        return self.result(self.receipts.get(tx_hash))
+
+    def eth_getLogs(self, filter_object):
+        from_block = self.get_block_number(filter_object.get('fromBlock'), self.get_latest_block_number())
+        to_block = self.get_block_number(filter_object.get('toBlock'), self.get_latest_block_number())
+        addresses = filter_object.get('address')
+        if isinstance(addresses, basestring):
+            addresses = [addresses]
+        addresses = [address.lower() for address in addresses] if addresses else None
+        topics = filter_object.get('topics') or []
+        logs = []
+        for log in self.logs:
+            if not from_block <= int(log['blockNumber'], 16) <= to_block:
+                continue
+            if addresses and log['address'] not in addresses:
+                continue
+            matches = True
+            for position, topic in enumerate(topics):
+                # null matches any topic and lists match any of their topics
+                if topic is None:
+                    continue
+                alternatives = [t.lower() for t in (topic if isinstance(topic, list) else [topic])]
+                if position >= len(log['topics']) or log['topics'][position] not in alternatives:
+                    matches = False
+                    break
+            if matches:
+                logs.append(log)
+        return self.result(logs)
+
+    def eth_call(self, to_address, from_address=None, gas=None, gas_price=None, value=None, data=None,
+                 default_block='latest'):
+        if from_address and self.hex2bin(from_address) not in self.keys:
+            from_address = None
+        tx = self.make_transaction(from_address, to_address, gas, gas_price, value, data)
+        success, output, _ = self.simulate(tx)
+        if not success:
+            return self.error('Call failed')
+        return self.result(self.bin2hex(output))
+
+    def eth_estimateGas(self, to_address=None, from_address=None, gas=None, gas_price=None, value=None, data=None,
+                        default_block='latest'):
+        """
+        Returns the lowest gas the transaction succeeds with like a node does. Refunds are only paid after execution,
+        so it can be up to twice the gas used.
+        """
+        def succeeds(gas):
+            tx = self.make_transaction(from_address, to_address, gas, gas_price, value, data)
+            return self.simulate(tx)
+        success, _, gas_used = succeeds(self.GAS_LIMIT)
+        if not success:
+            return self.error('Gas estimation failed')
+        # gas used after refunds is never enough gas
+        lowest, highest = gas_used - 1, self.GAS_LIMIT
+        if succeeds(2 * gas_used)[0]:
+            highest = 2 * gas_used
+        while highest - lowest > 1:
+            middle = (lowest + highest) // 2
+            if succeeds(middle)[0]:
+                highest = middle
+            else:
+                lowest = middle
+        return self.result(self.int2hex(highest))
@@ -0,0 +1,113 @@
+import random
+import time
+
+
+def percentile(values, p):
+    """Returns nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(p / 100.0 * len(values))) - 1))]
+
+
+class TransactionTracker:
+    """
+    Keeps sent transactions until their inclusion. A transaction not mined within a number of blocks is stuck and can be
+    replaced by a transaction with the same nonce, so all hashes sent for one nonce are tracked under the hash of the
+    first transaction. Latencies from first submission to inclusion are counted for all included transactions, but
+    percentiles are taken from a uniform sample of at most LATENCY_SAMPLES transactions, so memory stays bounded for
+    any number of transactions. Blocks are only counted from the first check of a transaction, so no block number is
+    read when transactions are sent.
+    """
+
+    LATENCY_SAMPLES = 10000
+
+    def __init__(self, stuck_blocks):
+        self.stuck_blocks = stuck_blocks
+        # transactions dict maps hashes of first submissions to transaction parameters and replacement hashes
+        self.transactions = {}
+        # latencies list contains (seconds, blocks) tuples of a reservoir sample of included transactions
+        self.latencies = []
+        self.included = 0
+        self.replaced = 0
+        self.replacements = 0
+        self.max_seconds = None
+        self.max_blocks = None
+        # resumed dict maps hashes of first submissions of a previous run to all hashes sent for their nonce
+        self.resumed = {}
+
+    def track(self, transaction_hash, **params):
+        self.transactions[transaction_hash] = dict(params,
+                                                   hashes=[transaction_hash],
+                                                   sent_block=None,
+                                                   checked_block=None,
+                                                   sent_time=time.time())
+
+    def resume(self, hashes):
+        # parameters of transactions sent in a previous run are unknown, so they are not replaced
+        self.resumed[hashes[0]] = hashes
+
+    def get(self, transaction_hash):
+        return self.transactions.get(transaction_hash)
+
+    def get_hashes(self, transaction_hash):
+        if transaction_hash in self.transactions:
+            return self.transactions[transaction_hash]['hashes']
+        return self.resumed.get(transaction_hash, [transaction_hash])
+
+    def is_stuck(self, transaction_hash, block_number):
+        transaction = self.transactions.get(transaction_hash)
+        if transaction and transaction['checked_block'] is None:
+            # blocks are counted from the first check without receipt
+            transaction['sent_block'] = transaction['checked_block'] = block_number
+            return False
+        return bool(transaction and self.stuck_blocks and
+                    block_number - transaction['checked_block'] >= self.stuck_blocks)
+
+    def replace(self, transaction_hash, replacement_hash, gas_price, block_number):
+        transaction = self.transactions[transaction_hash]
+        transaction['hashes'].append(replacement_hash)
+        transaction['gas_price'] = gas_price
+        transaction['checked_block'] = block_number
+
+    def postpone(self, transaction_hash, block_number):
+        self.transactions[transaction_hash]['checked_block'] = block_number
+
+    def include(self, transaction_hash, transaction_receipt):
+        self.resumed.pop(transaction_hash, None)
+        transaction = self.transactions.pop(transaction_hash, None)
+        if transaction:
+            # transactions mined before their first check have no block latency
+            blocks = None
+            if transaction['sent_block'] is not None:
+                blocks = int(transaction_receipt['blockNumber'], 16) - transaction['sent_block']
+            seconds = time.time() - transaction['sent_time']
+            replacements = len(transaction['hashes']) - 1
+            self.included += 1
+            self.replaced += 1 if replacements else 0
+            self.replacements += replacements
+            self.max_seconds = seconds if self.max_seconds is None else max(self.max_seconds, seconds)
+            if blocks is not None:
+                self.max_blocks = blocks if self.max_blocks is None else max(self.max_blocks, blocks)
+            if len(self.latencies) < self.LATENCY_SAMPLES:
+                self.latencies.append((seconds, blocks))
+            else:
+                # every included transaction is in the sample with the same probability
+                position = random.randrange(self.included)
+                if position < self.LATENCY_SAMPLES:
+                    self.latencies[position] = (seconds, blocks)
+
+    def get_stats(self):
+        seconds = [l[0] for l in self.latencies]
+        blocks = [l[1] for l in self.latencies if l[1] is not None]
+        return {
+            'transactions': self.included,
+            'replaced': self.replaced,
+            'replacements': self.replacements,
+            'median_seconds': percentile(seconds, 50),
+            'p95_seconds': percentile(seconds, 95),
+            'max_seconds': self.max_seconds,
+            'median_blocks': percentile(blocks, 50),
+            'p95_blocks': percentile(blocks, 95),
+            'max_blocks': self.max_blocks
+        }
@@ -0,0 +1,260 @@
+from ethmath import ONE, LN2, MODULUS, PROFITS_FACTOR, get_inv_b
+from ethprices import MarketPriceReader
+import click
+import json
+import logging
+import numpy as np
+
+
+# create logger
+logger = logging.getLogger('VALUATION')
+logger.setLevel(logging.INFO)
+ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(message)s')
+ch.setFormatter(formatter)
+logger.addHandler(ch)
+
+# constants of ScalarEvent and DefaultMarket
+SHORT = 0
+LONG = 1
+OUTCOME_RANGE = 10000
+FEE_RANGE = 1000000
+
+
+def to_int256(value):
+    """Returns value wrapped around like int arithmetic in Solidity"""
+    value %= MODULUS
+    return value - MODULUS if value >= 2**255 else value
+
+
+def sdiv(a, b):
+    # signed division in Solidity rounds towards zero
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def calc_scalar_factors(winning_outcome, lower_bound, upper_bound):
+    """Returns factors of short and long outcome tokens of ScalarEvent.redeemWinnings in units of OUTCOME_RANGE"""
+    if winning_outcome < lower_bound:
+        converted_winning_outcome = 0
+    elif winning_outcome > upper_bound:
+        converted_winning_outcome = OUTCOME_RANGE
+    else:
+        converted_winning_outcome = sdiv(to_int256(OUTCOME_RANGE * to_int256(winning_outcome - lower_bound)),
+                                         to_int256(upper_bound - lower_bound)) & 0xffff
+    # difference of uint16 values wraps around before it is converted to uint
+    factor_short = (OUTCOME_RANGE - converted_winning_outcome) % 2**16
+    factor_long = (OUTCOME_RANGE - factor_short) % MODULUS
+    return factor_short, factor_long
+
+
+def reduce(x):
+    """Returns floor(log2(x / ONE)) and x divided by its power of two for every element like Math.reduce"""
+    ilog2 = np.zeros(x.shape, object)
+    z = x
+    for bits in (128, 64, 32, 16, 8, 4, 2, 1):
+        is_larger = z >= ONE * 2**bits
+        z = np.where(is_larger, z // 2**bits, z)
+        ilog2 = np.where(is_larger, ilog2 + bits, ilog2)
+    return ilog2, z
+
+
+def exp(x):
+    """Returns Math.exp(x) for every element"""
+    k = x // LN2
+    if np.any(k > 191):
+        raise ValueError('Result of exp overflows')
+    r = x - k * LN2
+    result = ONE
+    for i in range(14, 0, -1):
+        result = ONE + result * r // (i * ONE)
+    return result * 2**k % MODULUS
+
+
+def ln(x):
+    """Returns Math.ln(x) for every element"""
+    if np.any(x < ONE):
+        raise ValueError('Result of ln is negative')
+    ilog2, z = reduce(x)
+    t = (z - ONE) % MODULUS * ONE % MODULUS // (z + ONE)
+    t2 = t * t % MODULUS // ONE
+    power = t
+    result = t
+    for i in range(3, 29, 2):
+        power = power * t2 % MODULUS // ONE
+        result = result + power // i
+    return (ilog2 * LN2 + 2 * result) % MODULUS
+
+
+class EthValuation:
+    """
+    Values positions in outcome tokens of many events at once. Events are given as dicts with:
+
+    - outcome_count
+    - lower_bound and upper_bound for scalar events
+    - winning_outcome if set, None otherwise
+    - distribution, funding and fee of the market trading the event's outcome tokens if there is one
+
+    Positions are given as event indexes and a matrix of outcome token balances with one column per outcome. All
+    values are calculated with numpy arrays of Python integers, so results equal the contracts' results exactly.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.outcome_count = max(event['outcome_count'] for event in events) if events else 2
+        # payouts of a settled event are the balances multiplied by factors and divided by denominator
+        self.factors = np.zeros((len(events), self.outcome_count), object)
+        self.denominators = np.array([1] * len(events), object)
+        self.is_settled = np.zeros(len(events), bool)
+        self.is_outcome = np.zeros((len(events), self.outcome_count), bool)
+        # markets are stored in rows of events, padded to the highest outcome count
+        self.distributions = np.zeros((len(events), self.outcome_count), object)
+        self.fundings = np.array([0] * len(events), object)
+        self.fees = np.array([0] * len(events), object)
+        self.inv_bs = np.array([1] * len(events), object)
+        self.has_market = np.zeros(len(events), bool)
+        for i, event in enumerate(events):
+            outcome_count = event['outcome_count']
+            self.is_outcome[i, :outcome_count] = True
+            self.set_winning_outcome(i, event.get('winning_outcome'))
+            if event.get('distribution') is not None:
+                self.set_market(i, event['distribution'], event['funding'], event.get('fee', 0))
+
+    def set_winning_outcome(self, index, winning_outcome):
+        event = self.events[index]
+        event['winning_outcome'] = winning_outcome
+        self.factors[index] = 0
+        self.denominators[index] = 1
+        self.is_settled[index] = False
+        if winning_outcome is None:
+            return
+        if event.get('lower_bound') is not None:
+            factor_short, factor_long = calc_scalar_factors(winning_outcome, event['lower_bound'],
+                                                            event['upper_bound'])
+            self.factors[index, SHORT] = factor_short
+            self.factors[index, LONG] = factor_long
+            self.denominators[index] = OUTCOME_RANGE
+            self.is_settled[index] = True
+        elif winning_outcome % MODULUS < event['outcome_count']:
+            self.factors[index, winning_outcome] = 1
+            self.is_settled[index] = True
+        else:
+            # redeeming winnings fails for invalid outcomes
+            logger.warning('Winning outcome {} of event {} is invalid'.format(winning_outcome, index))
+
+    def set_market(self, index, distribution, funding, fee):
+        event = self.events[index]
+        event.update(distribution=distribution, funding=funding, fee=fee)
+        self.distributions[index] = 0
+        self.distributions[index, :len(distribution)] = [int(count) for count in distribution]
+        self.fundings[index] = int(funding)
+        self.fees[index] = int(fee)
+        self.inv_bs[index] = get_inv_b(len(distribution))
+        # market makers can't price markets funded with less than 10000 tokens
+        self.has_market[index] = int(funding) >= 10000
+
+    def get_balances(self, balances):
+        array = np.zeros((len(balances), self.outcome_count), object)
+        for i, row in enumerate(balances):
+            array[i, :len(row)] = [int(balance) for balance in row]
+        return array
+
+    def calc_winnings(self, event_indexes, balances):
+        """Returns winnings of every position like redeemWinnings, 0 for positions in unsettled events"""
+        event_indexes = np.asarray(event_indexes, int)
+        balances = self.get_balances(balances)
+        winnings = (balances * self.factors[event_indexes] % MODULUS).sum(axis=1) % MODULUS // \
+            self.denominators[event_indexes]
+        return np.where(self.is_settled[event_indexes], winnings, 0)
+
+    def calc_current_costs(self, market_indexes, outcome_token_ranges, distributions):
+        """Returns LMSRMarketMaker.calcCurrentCosts for every row of distributions"""
+        lowest, highest = outcome_token_ranges
+        funding_divisors = (self.fundings[market_indexes] // 10000)[:, None]
+        inv_bs = self.inv_bs[market_indexes]
+        exponents = ((highest - lowest) % MODULUS)[:, None] - (distributions - lowest[:, None]) % MODULUS
+        summands = exp(exponents % MODULUS // funding_divisors * inv_bs[:, None] % MODULUS)
+        inner_sums = np.where(self.is_outcome[market_indexes], summands, 0).sum(axis=1) % MODULUS
+        return ln(inner_sums) * ONE % MODULUS // inv_bs
+
+    def calc_profits(self, market_indexes, outcome_token_indexes, outcome_token_counts):
+        """Returns LMSRMarketMaker.calcProfits for every market, outcome and number of outcome tokens sold"""
+        rows = np.arange(len(market_indexes))
+        distributions = self.distributions[market_indexes]
+        is_outcome = self.is_outcome[market_indexes]
+        lowest = np.where(is_outcome, distributions, MODULUS).min(axis=1)
+        highest = (np.where(is_outcome, distributions, 0).max(axis=1) + outcome_token_counts) % MODULUS
+        costs_before = self.calc_current_costs(market_indexes, (lowest, highest), distributions)
+        distributions = distributions.copy()
+        distributions[rows, outcome_token_indexes] = (distributions[rows, outcome_token_indexes] +
+                                                      outcome_token_counts) % MODULUS
+        costs_after = self.calc_current_costs(market_indexes, (lowest, highest), distributions)
+        funding_divisors = self.fundings[market_indexes] // 10000
+        return (costs_before - costs_after) % MODULUS * funding_divisors % MODULUS * PROFITS_FACTOR % MODULUS // \
+            100000 // ONE
+
+    def calc_liquidation_values(self, event_indexes, balances):
+        """
+        Returns collateral received by selling all outcome tokens of every position to the event's market after fees,
+        every balance sold on its own at the current market state. Positions in events without market are worth 0.
+        """
+        event_indexes = np.asarray(event_indexes, int)
+        balances = self.get_balances(balances)
+        values = np.zeros(balances.shape, object)
+        # every outcome token balance held in an event with market is sold once
+        rows, outcomes = np.nonzero((balances != 0) & self.has_market[event_indexes][:, None])
+        if len(rows):
+            counts = balances[rows, outcomes]
+            profits = self.calc_profits(event_indexes[rows], outcomes, counts)
+            fees = profits * self.fees[event_indexes[rows]] % MODULUS // FEE_RANGE
+            values[rows, outcomes] = profits - fees
+        return values.sum(axis=1)
+
+    def calc_values(self, event_indexes, balances):
+        """Returns winnings of positions in settled events and liquidation values of all other positions"""
+        event_indexes = np.asarray(event_indexes, int)
+        winnings = self.calc_winnings(event_indexes, balances)
+        liquidation_values = self.calc_liquidation_values(event_indexes, balances)
+        return np.where(self.is_settled[event_indexes], winnings, liquidation_values)
+
+
+@click.command()
+@click.option('--protocol', default="http", help='Ethereum node protocol')
+@click.option('--host', default="localhost", help='Ethereum node host')
+@click.option('--port', default=8545, help='Ethereum node port')
+@click.option('--portfolio', required=True, help='JSON file with events and positions')
+@click.option('--market-maker', help='Market maker address to read current distributions and fundings from')
+@click.option('--output', help='File values of positions are written to as JSON')
+def setup(protocol, host, port, portfolio, market_maker, output):
+    """
+    Portfolio files contain a list of events, described like in EthValuation with the address of their market, and a
+    list of positions with owner, event address and balances of all outcomes.
+    """
+    with open(portfolio, 'r') as portfolio_file:
+        portfolio = json.load(portfolio_file)
+    events = portfolio['events']
+    if market_maker:
+        reader = MarketPriceReader(protocol, host, port, market_maker)
+        markets = reader.get_prices([event['market'] for event in events if event.get('market')])
+        for event in events:
+            prices = markets.get(event['market'][2:]) if event.get('market') else None
+            if prices is not None:
+                event.update(distribution=prices['outcome_token_distribution'], funding=prices['funding'])
+    valuation = EthValuation(events)
+    event_indexes = dict((event['address'], i) for i, event in enumerate(events))
+    positions = portfolio['positions']
+    values = valuation.calc_values([event_indexes[position['event']] for position in positions],
+                                   [position['balances'] for position in positions])
+    totals = {}
+    for position, value in zip(positions, values):
+        totals[position['owner']] = totals.get(position['owner'], 0) + value
+    for owner, total in sorted(totals.items()):
+        logger.info('{}: {}'.format(owner, total))
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump([dict(position, value=str(value)) for position, value in zip(positions, values)], output_file,
+                      indent=2)
+
+if __name__ == '__main__':
+    setup()
@@ -6,7 +6,17 @@ import "Oracles/AbstractOracle.sol";
 
 /// @title Event contract - Provide basic functionality required by different event types
 /// @author Stefan George - <stefan@gnosis.pm>
-contract Event {
+contract Event is OutcomeTokenLedger {
+
+    /*
+     *  Events
+     */
+    event OutcomeTokenCreation(uint8 indexed outcomeTokenIndex, OutcomeToken outcomeToken);
+    event OutcomeTokenTransfer(uint8 indexed outcomeTokenIndex, address indexed from, address indexed to, uint value);
+    event OutcomeTokenApproval(uint8 indexed outcomeTokenIndex, address indexed owner, address indexed spender, uint value);
+    event OutcomeTokenSetIssuance(address indexed owner, uint amount);
+    event OutcomeTokenSetRevocation(address indexed owner, uint amount);
+    event OutcomeTokenRevocation(uint8 indexed outcomeTokenIndex, address indexed owner, uint amount);
 
     /*
      *  Storage
@@ -15,7 +25,33 @@ contract Event {
     Oracle public oracle;
     bool public isWinningOutcomeSet;
     int public winningOutcome;
-    OutcomeToken[] public outcomeTokens;
+    uint outcomeCount;
+    // Outcome token ledger: the balance of an outcome is the owner's base balance shared by all outcomes
+    // plus the owner's offset for this outcome. Buying or selling all outcomes only touches the base balance.
+    mapping (address => int) baseBalances;
+    mapping (uint8 => mapping (address => int)) balanceOffsets;
+    mapping (uint8 => mapping (address => mapping (address => uint))) allowances;
+    int baseSupply;
+    mapping (uint8 => int) supplyOffsets;
+    // ERC 20 views on the ledger, created on demand
+    mapping (uint8 => OutcomeToken) public outcomeTokens;
+
+    /*
+     *  Modifiers
+     */
+    modifier isValidOutcomeTokenIndex(uint8 outcomeTokenIndex) {
+        if (outcomeTokenIndex >= outcomeCount)
+            // Outcome does not exist
+            revert();
+        _;
+    }
+
+    modifier isOutcomeToken(uint8 outcomeTokenIndex) {
+        if (msg.sender != address(outcomeTokens[outcomeTokenIndex]))
+            // Only outcome token view is allowed to proceed
+            revert();
+        _;
+    }
 
     /*
      *  Public functions
@@ -23,18 +59,16 @@ contract Event {
     /// @dev Contract constructor validates and sets basic event properties
     /// @param _collateralToken Tokens used as collateral in exchange for outcome tokens
     /// @param _oracle Oracle contract used to resolve the event
-    /// @param outcomeCount Number of event outcomes
-    function Event(Token _collateralToken, Oracle _oracle, uint outcomeCount)
+    /// @param _outcomeCount Number of event outcomes
+    function Event(Token _collateralToken, Oracle _oracle, uint _outcomeCount)
         public
     {
-        if (address(_collateralToken) == 0 || address(_oracle) == 0 || outcomeCount < 2 || outcomeCount > 256)
-            // Values are null or outcome count is too low
+        if (address(_collateralToken) == 0 || address(_oracle) == 0 || _outcomeCount < 2 || _outcomeCount > 255)
+            // Values are null or outcome count is too low or can't be returned as uint8 by getOutcomeCount
             revert();
         collateralToken = _collateralToken;
         oracle = _oracle;
-        // Create outcome tokens for each outcome
-        for (uint8 i=0; i<outcomeCount; i++)
-            outcomeTokens.push(new OutcomeToken());
+        outcomeCount = _outcomeCount;
     }
 
     /// @dev Buys equal number of tokens of all outcomes, exchanging collateral tokens and all outcome tokens 1:1
@@ -42,13 +76,17 @@ contract Event {
     function buyAllOutcomes(uint collateralTokenCount)
         public
     {
+        if (int(collateralTokenCount) < 0)
+            // Count exceeds ledger range
+            revert();
         // Transfer tokens to events contract
         if (!collateralToken.transferFrom(msg.sender, this, collateralTokenCount))
             // Transfer failed
             revert();
         // Issue new event tokens to owner
-        for (uint8 i=0; i<outcomeTokens.length; i++)
-            outcomeTokens[i].issue(msg.sender, collateralTokenCount);
+        baseBalances[msg.sender] += int(collateralTokenCount);
+        baseSupply += int(collateralTokenCount);
+        OutcomeTokenSetIssuance(msg.sender, collateralTokenCount);
     }
 
     /// @dev Sells equal number of tokens of all outcomes, exchanging collateral tokens and all outcome tokens 1:1
@@ -56,9 +94,15 @@ contract Event {
     function sellAllOutcomes(uint outcomeTokenCount)
         public
     {
+        // Check balances of all outcomes
+        for (uint i=0; i<outcomeCount; i++)
+            if (outcomeTokenBalanceOf(uint8(i), msg.sender) < outcomeTokenCount)
+                // Balance too low
+                revert();
         // Revoke tokens of all outcomes
-        for (uint8 i=0; i<outcomeTokens.length; i++)
-            outcomeTokens[i].revoke(msg.sender, outcomeTokenCount);
+        baseBalances[msg.sender] -= int(outcomeTokenCount);
+        baseSupply -= int(outcomeTokenCount);
+        OutcomeTokenSetRevocation(msg.sender, outcomeTokenCount);
         // Transfer redeemed tokens
         if (!collateralToken.transfer(msg.sender, outcomeTokenCount))
             // Transfer failed
@@ -77,6 +121,148 @@ contract Event {
         isWinningOutcomeSet = true;
     }
 
+    /// @dev Transfers sender's outcome tokens to a given address. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param to Address of token receiver
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transferOutcomeTokens(uint8 outcomeTokenIndex, address to, uint value)
+        public
+        returns (bool)
+    {
+        moveOutcomeTokens(outcomeTokenIndex, msg.sender, to, value);
+        return true;
+    }
+
+    /// @dev Allows allowed third party to transfer outcome tokens from one address to another. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param from Address from where tokens are withdrawn
+    /// @param to Address to where tokens are sent
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transferOutcomeTokensFrom(uint8 outcomeTokenIndex, address from, address to, uint value)
+        public
+        returns (bool)
+    {
+        spendAllowance(outcomeTokenIndex, from, msg.sender, value);
+        moveOutcomeTokens(outcomeTokenIndex, from, to, value);
+        return true;
+    }
+
+    /// @dev Sets approved amount of outcome tokens for spender. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param spender Address of allowed account
+    /// @param value Number of approved tokens
+    /// @return Returns success of function call
+    function approveOutcomeTokens(uint8 outcomeTokenIndex, address spender, uint value)
+        public
+        returns (bool)
+    {
+        setAllowance(outcomeTokenIndex, msg.sender, spender, value);
+        return true;
+    }
+
+    /// @dev Outcome token view transfers tokens on behalf of its caller. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param sender Address of the view's caller
+    /// @param to Address of token receiver
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transferByOutcomeToken(uint8 outcomeTokenIndex, address sender, address to, uint value)
+        public
+        isOutcomeToken(outcomeTokenIndex)
+        returns (bool)
+    {
+        moveOutcomeTokens(outcomeTokenIndex, sender, to, value);
+        return true;
+    }
+
+    /// @dev Outcome token view transfers tokens on behalf of an allowed third party. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param sender Address of the view's caller
+    /// @param from Address from where tokens are withdrawn
+    /// @param to Address to where tokens are sent
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transferFromByOutcomeToken(uint8 outcomeTokenIndex, address sender, address from, address to, uint value)
+        public
+        isOutcomeToken(outcomeTokenIndex)
+        returns (bool)
+    {
+        spendAllowance(outcomeTokenIndex, from, sender, value);
+        moveOutcomeTokens(outcomeTokenIndex, from, to, value);
+        return true;
+    }
+
+    /// @dev Outcome token view sets an allowance on behalf of its caller. Returns success
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param sender Address of the view's caller
+    /// @param spender Address of allowed account
+    /// @param value Number of approved tokens
+    /// @return Returns success of function call
+    function approveByOutcomeToken(uint8 outcomeTokenIndex, address sender, address spender, uint value)
+        public
+        isOutcomeToken(outcomeTokenIndex)
+        returns (bool)
+    {
+        setAllowance(outcomeTokenIndex, sender, spender, value);
+        return true;
+    }
+
+    /// @dev Creates the ERC 20 view for an outcome if it does not exist yet
+    /// @param outcomeTokenIndex Index of outcome
+    /// @return Returns outcome token view
+    function createOutcomeToken(uint8 outcomeTokenIndex)
+        public
+        isValidOutcomeTokenIndex(outcomeTokenIndex)
+        returns (OutcomeToken outcomeToken)
+    {
+        outcomeToken = outcomeTokens[outcomeTokenIndex];
+        if (address(outcomeToken) == 0) {
+            outcomeToken = new OutcomeToken(outcomeTokenIndex);
+            outcomeTokens[outcomeTokenIndex] = outcomeToken;
+            OutcomeTokenCreation(outcomeTokenIndex, outcomeToken);
+        }
+    }
+
+    /// @dev Returns number of outcome tokens owned by given address
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param owner Address of token owner
+    /// @return Returns balance of owner
+    function outcomeTokenBalanceOf(uint8 outcomeTokenIndex, address owner)
+        public
+        constant
+        isValidOutcomeTokenIndex(outcomeTokenIndex)
+        returns (uint)
+    {
+        return uint(baseBalances[owner] + balanceOffsets[outcomeTokenIndex][owner]);
+    }
+
+    /// @dev Returns number of allowed outcome tokens for given address
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param owner Address of token owner
+    /// @param spender Address of token spender
+    /// @return Returns remaining allowance for spender
+    function outcomeTokenAllowance(uint8 outcomeTokenIndex, address owner, address spender)
+        public
+        constant
+        returns (uint)
+    {
+        return allowances[outcomeTokenIndex][owner][spender];
+    }
+
+    /// @dev Returns total number of issued outcome tokens
+    /// @param outcomeTokenIndex Index of outcome
+    /// @return Returns total supply
+    function outcomeTokenTotalSupply(uint8 outcomeTokenIndex)
+        public
+        constant
+        isValidOutcomeTokenIndex(outcomeTokenIndex)
+        returns (uint)
+    {
+        return uint(baseSupply + supplyOffsets[outcomeTokenIndex]);
+    }
+
     /// @dev Returns outcome count
     /// @return Outcome count
     function getOutcomeCount()
@@ -84,17 +270,20 @@ contract Event {
         constant
         returns (uint8)
     {
-        return uint8(outcomeTokens.length);
+        // Outcome count is at most 255
+        return uint8(outcomeCount);
     }
 
-    /// @dev Returns outcome tokens array
+    /// @dev Returns outcome token views, views which were not created yet are returned as null addresses
     /// @return Outcome tokens
     function getOutcomeTokens()
         public
         constant
-        returns (OutcomeToken[])
+        returns (OutcomeToken[] _outcomeTokens)
     {
-        return outcomeTokens;
+        _outcomeTokens = new OutcomeToken[](outcomeCount);
+        for (uint i=0; i<outcomeCount; i++)
+            _outcomeTokens[i] = outcomeTokens[uint8(i)];
     }
 
     /// @dev Returns the amount of outcome tokens held by owner
@@ -104,9 +293,9 @@ contract Event {
         constant
         returns (uint[] outcomeTokenDistribution)
     {
-        outcomeTokenDistribution = new uint[](outcomeTokens.length);
-        for (uint8 i=0; i<outcomeTokenDistribution.length; i++)
-            outcomeTokenDistribution[i] = outcomeTokens[i].balanceOf(owner);
+        outcomeTokenDistribution = new uint[](outcomeCount);
+        for (uint i=0; i<outcomeCount; i++)
+            outcomeTokenDistribution[i] = outcomeTokenBalanceOf(uint8(i), owner);
     }
 
     /// @dev Calculates and returns event hash
@@ -116,4 +305,64 @@ contract Event {
     /// @dev Exchanges user's winning outcome tokens for collateral tokens
     /// @return Returns user's winnings
     function redeemWinnings() public returns (uint);
+
+    /*
+     *  Internal functions
+     */
+    /// @dev Moves outcome tokens between two addresses
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param from Address from where tokens are withdrawn
+    /// @param to Address to where tokens are sent
+    /// @param value Number of tokens to transfer
+    function moveOutcomeTokens(uint8 outcomeTokenIndex, address from, address to, uint value)
+        internal
+    {
+        if (outcomeTokenBalanceOf(outcomeTokenIndex, from) < value)
+            // Balance too low
+            revert();
+        balanceOffsets[outcomeTokenIndex][from] -= int(value);
+        balanceOffsets[outcomeTokenIndex][to] += int(value);
+        OutcomeTokenTransfer(outcomeTokenIndex, from, to, value);
+    }
+
+    /// @dev Revokes outcome tokens of a single outcome from an owner
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param owner Address of token owner
+    /// @param value Number of tokens to revoke
+    function revokeOutcomeTokens(uint8 outcomeTokenIndex, address owner, uint value)
+        internal
+    {
+        if (outcomeTokenBalanceOf(outcomeTokenIndex, owner) < value)
+            // Balance too low
+            revert();
+        balanceOffsets[outcomeTokenIndex][owner] -= int(value);
+        supplyOffsets[outcomeTokenIndex] -= int(value);
+        OutcomeTokenRevocation(outcomeTokenIndex, owner, value);
+    }
+
+    /// @dev Reduces allowance of spender
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param owner Address of token owner
+    /// @param spender Address of token spender
+    /// @param value Number of tokens spent
+    function spendAllowance(uint8 outcomeTokenIndex, address owner, address spender, uint value)
+        internal
+    {
+        if (allowances[outcomeTokenIndex][owner][spender] < value)
+            // Allowance too low
+            revert();
+        allowances[outcomeTokenIndex][owner][spender] -= value;
+    }
+
+    /// @dev Sets allowance of spender
+    /// @param outcomeTokenIndex Index of outcome
+    /// @param owner Address of token owner
+    /// @param spender Address of token spender
+    /// @param value Number of approved tokens
+    function setAllowance(uint8 outcomeTokenIndex, address owner, address spender, uint value)
+        internal
+    {
+        allowances[outcomeTokenIndex][owner][spender] = value;
+        OutcomeTokenApproval(outcomeTokenIndex, owner, spender, value);
+    }
 }
@@ -30,13 +30,13 @@ contract CategoricalEvent is Event {
         public
         returns (uint winnings)
     {
-        if (!isWinningOutcomeSet)
-            // Winning outcome is not set yet
+        if (!isWinningOutcomeSet || uint(winningOutcome) >= outcomeCount)
+            // Winning outcome is not set yet or is not a valid outcome
             revert();
         // Calculate winnings
-        winnings = outcomeTokens[uint(winningOutcome)].balanceOf(msg.sender);
+        winnings = outcomeTokenBalanceOf(uint8(winningOutcome), msg.sender);
         // Revoke tokens from winning outcome
-        outcomeTokens[uint(winningOutcome)].revoke(msg.sender, winnings);
+        revokeOutcomeTokens(uint8(winningOutcome), msg.sender, winnings);
         // Payout winnings
         if (!collateralToken.transfer(msg.sender, winnings))
             // Transfer failed
@@ -50,6 +50,6 @@ contract CategoricalEvent is Event {
         constant
         returns (bytes32)
     {
-        return keccak256(collateralToken, oracle, outcomeTokens.length);
+        return keccak256(collateralToken, oracle, outcomeCount);
     }
 }
@@ -65,12 +65,12 @@ contract ScalarEvent is Event {
             convertedWinningOutcome = uint16(OUTCOME_RANGE * (winningOutcome - lowerBound) / (upperBound - lowerBound));
         uint factorShort = OUTCOME_RANGE - convertedWinningOutcome;
         uint factorLong = OUTCOME_RANGE - factorShort;
-        uint shortOutcomeTokenCount = outcomeTokens[SHORT].balanceOf(msg.sender);
-        uint longOutcomeTokenCount = outcomeTokens[LONG].balanceOf(msg.sender);
+        uint shortOutcomeTokenCount = outcomeTokenBalanceOf(SHORT, msg.sender);
+        uint longOutcomeTokenCount = outcomeTokenBalanceOf(LONG, msg.sender);
         winnings = (shortOutcomeTokenCount * factorShort + longOutcomeTokenCount * factorLong) / OUTCOME_RANGE;
         // Revoke all tokens of all outcomes
-        outcomeTokens[SHORT].revoke(msg.sender, shortOutcomeTokenCount);
-        outcomeTokens[LONG].revoke(msg.sender, longOutcomeTokenCount);
+        revokeOutcomeTokens(SHORT, msg.sender, shortOutcomeTokenCount);
+        revokeOutcomeTokens(LONG, msg.sender, longOutcomeTokenCount);
         // Payout winnings
         if (!collateralToken.transfer(msg.sender, winnings))
             // Transfer failed
@@ -7,4 +7,5 @@ contract MarketMaker {
 
     function calcCosts(Market market, uint8 outcomeTokenIndex, uint outcomeTokenCount) public constant returns (uint);
     function calcProfits(Market market, uint8 outcomeTokenIndex, uint outcomeTokenCount) public constant returns (uint);
+    function calcMarginalPrices(Market market) public constant returns (uint[], uint[], uint);
 }
@@ -63,6 +63,31 @@ contract LMSRMarketMaker is MarketMaker {
         profits = (costsBefore - costsAfter) * (funding / 10000) * (100000 - 2) / 100000 / ONE;
     }
 
+    /// @dev Returns marginal prices of all outcomes, outcome tokens owned by market and funding of a funded market
+    /// @param market Market contract
+    /// @return Returns marginal prices in fixed point with ONE being 1, outcome token distribution and funding
+    function calcMarginalPrices(Market market)
+        public
+        constant
+        returns (uint[] marginalPrices, uint[] outcomeTokenDistribution, uint funding)
+    {
+        outcomeTokenDistribution = getOutcomeTokenDistribution(market);
+        uint[2] memory outcomeTokenRange = getOutcomeTokenRange(outcomeTokenDistribution);
+        uint invB = Math.ln(outcomeTokenDistribution.length * ONE) / 10000;
+        funding = market.funding();
+        uint fundingDivisor = funding / 10000;
+        // Marginal price of an outcome is its summand of the cost function divided by the sum of all summands
+        marginalPrices = new uint[](outcomeTokenDistribution.length);
+        uint innerSum = 0;
+        uint8 i;
+        for (i=0; i<outcomeTokenDistribution.length; i++) {
+            marginalPrices[i] = Math.exp((outcomeTokenRange[1] - outcomeTokenDistribution[i]) / fundingDivisor * invB);
+            innerSum += marginalPrices[i];
+        }
+        for (i=0; i<outcomeTokenDistribution.length; i++)
+            marginalPrices[i] = marginalPrices[i] * ONE / innerSum;
+    }
+
     /*
      *  Private functions
      */
@@ -90,9 +115,10 @@ contract LMSRMarketMaker is MarketMaker {
         public
         returns (uint[] outcomeTokenDistribution)
     {
-        outcomeTokenDistribution = new uint[](market.eventContract().getOutcomeCount());
+        Event eventContract = market.eventContract();
+        outcomeTokenDistribution = new uint[](eventContract.getOutcomeCount());
         for (uint i=0; i<outcomeTokenDistribution.length; i++)
-            outcomeTokenDistribution[i] = market.eventContract().outcomeTokens(i).balanceOf(market);
+            outcomeTokenDistribution[i] = eventContract.outcomeTokenBalanceOf(uint8(i), market);
     }
 
     /// @dev Returns lowest and highest number of outcome tokens owned by market
@@ -7,10 +7,10 @@ import "MarketMakers/AbstractMarketMaker.sol";
 contract Market {
 
     address public creator;
-    uint public createdAtBlock;
+    uint64 public createdAtBlock;
     Event public eventContract;
+    uint24 public fee;
     MarketMaker public marketMaker;
-    uint public fee;
     uint public funding;
     function fund(uint _funding) public;
     function close() public;
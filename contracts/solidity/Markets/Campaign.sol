@@ -15,16 +15,17 @@ contract Campaign {
     /*
      *  Storage
      */
+    // Fields are ordered to share slots: eventContract with deadline and stage and marketFactory with fee
     Event public eventContract;
+    uint64 public deadline;
+    Stages public stage;
     MarketFactory public marketFactory;
+    uint24 public fee;
     MarketMaker public marketMaker;
     Market public market;
-    uint public fee;
     uint public funding;
-    uint public deadline;
     uint public finalBalance;
     mapping (address => uint) public contributions;
-    Stages public stage;
 
     enum Stages {
         AuctionStarted,
@@ -75,15 +76,16 @@ contract Campaign {
             || address(_marketMaker) == 0
             || _fee >= FEE_RANGE
             || _funding == 0
-            || _deadline < now)
+            || _deadline < now
+            || _deadline >= 2**64)
             // Invalid arguments
             revert();
         eventContract = _eventContract;
         marketFactory = _marketFactory;
         marketMaker = _marketMaker;
-        fee = _fee;
+        fee = uint24(_fee);
         funding = _funding;
-        deadline = _deadline;
+        deadline = uint64(_deadline);
     }
 
     /// @dev Allows to contribute to required market funding
@@ -17,11 +17,12 @@ contract DefaultMarket is Market {
     /*
      *  Storage
      */
+    // Fields are ordered to share slots: creator with createdAtBlock and eventContract with fee
     address public creator;
-    uint public createdAtBlock;
+    uint64 public createdAtBlock;
     Event public eventContract;
+    uint24 public fee;
     MarketMaker public marketMaker;
-    uint public fee;
     uint public funding;
 
     /*
@@ -48,9 +49,9 @@ contract DefaultMarket is Market {
             // Values are null
             revert();
         creator = _creator;
-        createdAtBlock = block.number;
+        createdAtBlock = uint64(block.number);
         eventContract = _eventContract;
-        fee = _fee;
+        fee = uint24(_fee);
         marketMaker = _marketMaker;
     }
 
@@ -75,7 +76,7 @@ contract DefaultMarket is Market {
     {
         uint8 outcomeCount = eventContract.getOutcomeCount();
         for (uint8 i=0; i<outcomeCount; i++)
-            eventContract.outcomeTokens(i).transfer(creator, eventContract.outcomeTokens(i).balanceOf(this));
+            eventContract.transferOutcomeTokens(i, creator, eventContract.outcomeTokenBalanceOf(i, this));
     }
 
     /// @dev Allows market creator to withdraw fees generated by trades
@@ -115,7 +116,7 @@ contract DefaultMarket is Market {
         // Buy all outcomes
         eventContract.buyAllOutcomes(outcomeTokenCosts);
         // Transfer outcome tokens to buyer
-        eventContract.outcomeTokens(outcomeTokenIndex).transfer(msg.sender, outcomeTokenCount);
+        eventContract.transferOutcomeTokens(outcomeTokenIndex, msg.sender, outcomeTokenCount);
     }
 
     /// @dev Allows to sell outcome tokens to market maker
@@ -137,7 +138,7 @@ contract DefaultMarket is Market {
             // Amount of token is too small or profits are too low
             revert();
         // Transfer outcome tokens to markets contract to sell all outcomes
-        eventContract.outcomeTokens(outcomeTokenIndex).transferFrom(msg.sender, this, outcomeTokenCount);
+        eventContract.transferOutcomeTokensFrom(outcomeTokenIndex, msg.sender, this, outcomeTokenCount);
         // Sell all outcomes
         eventContract.sellAllOutcomes(outcomeTokenProfits);
         // Transfer profits to seller
@@ -161,14 +162,14 @@ contract DefaultMarket is Market {
             revert();
         eventContract.buyAllOutcomes(outcomeTokenCount);
         // Short sell selected outcome
-        eventContract.outcomeTokens(outcomeTokenIndex).approve(this, outcomeTokenCount);
+        eventContract.approveOutcomeTokens(outcomeTokenIndex, this, outcomeTokenCount);
         uint profits = this.sell(outcomeTokenIndex, outcomeTokenCount, minProfits);
         costs = outcomeTokenCount - profits;
         // Transfer outcome tokens to buyer
         uint8 outcomeCount = eventContract.getOutcomeCount();
         for (uint8 i =0; i<outcomeCount; i++)
             if (i != outcomeTokenIndex)
-                eventContract.outcomeTokens(i).transfer(msg.sender, outcomeTokenCount);
+                eventContract.transferOutcomeTokens(i, msg.sender, outcomeTokenCount);
         // Send change back to buyer
         if (!eventContract.collateralToken().transfer(msg.sender, profits))
             // Couldn't send user change back
@@ -0,0 +1,134 @@
+pragma solidity 0.4.11;
+import "Markets/AbstractMarket.sol";
+import "Events/AbstractEvent.sol";
+import "Tokens/EtherToken.sol";
+
+
+/// @title Ether market trader contract - Allows to trade on markets using Ether token as collateral in one transaction
+contract EtherMarketTrader {
+
+    /*
+     *  Storage
+     */
+    EtherToken public etherToken;
+
+    /*
+     *  Modifiers
+     */
+    modifier isEtherTokenMarket(Market market) {
+        if (address(market.eventContract().collateralToken()) != address(etherToken))
+            // Market is not using Ether token as collateral
+            revert();
+        _;
+    }
+
+    /*
+     *  Public functions
+     */
+    /// @dev Constructor sets Ether token
+    /// @param _etherToken Ether token contract
+    function EtherMarketTrader(EtherToken _etherToken)
+        public
+    {
+        if (address(_etherToken) == 0)
+            // Value is null
+            revert();
+        etherToken = _etherToken;
+    }
+
+    /// @dev Accepts Ether withdrawn from Ether token
+    function ()
+        public
+        payable
+    {
+        if (msg.sender != address(etherToken))
+            // Only Ether token is allowed to send Ether
+            revert();
+    }
+
+    /// @dev Buys outcome tokens with sent Ether, which limits costs, and refunds unspent Ether
+    /// @param market Market contract
+    /// @param outcomeTokenIndex Index of the outcome token to buy
+    /// @param outcomeTokenCount Amount of outcome tokens to buy
+    /// @return Returns costs in Ether
+    function buy(Market market, uint8 outcomeTokenIndex, uint outcomeTokenCount)
+        public
+        payable
+        isEtherTokenMarket(market)
+        returns (uint costs)
+    {
+        // Wrap Ether and buy outcome tokens with sent value as max costs
+        etherToken.deposit.value(msg.value)();
+        if (!etherToken.approve(market, msg.value))
+            revert();
+        costs = market.buy(outcomeTokenIndex, outcomeTokenCount, msg.value);
+        // Transfer outcome tokens to buyer
+        if (!market.eventContract().transferOutcomeTokens(outcomeTokenIndex, msg.sender, outcomeTokenCount))
+            revert();
+        refund(msg.value - costs);
+    }
+
+    /// @dev Sells outcome tokens approved for this contract and sends profits in Ether
+    /// @param market Market contract
+    /// @param outcomeTokenIndex Index of the outcome token to sell
+    /// @param outcomeTokenCount Amount of outcome tokens to sell
+    /// @param minProfits The minimum profits in Ether to earn for outcome tokens
+    /// @return Returns profits in Ether
+    function sell(Market market, uint8 outcomeTokenIndex, uint outcomeTokenCount, uint minProfits)
+        public
+        isEtherTokenMarket(market)
+        returns (uint profits)
+    {
+        Event eventContract = market.eventContract();
+        // Transfer outcome tokens to this contract and allow market to sell them
+        if (   !eventContract.transferOutcomeTokensFrom(outcomeTokenIndex, msg.sender, this, outcomeTokenCount)
+            || !eventContract.approveOutcomeTokens(outcomeTokenIndex, market, outcomeTokenCount))
+            revert();
+        profits = market.sell(outcomeTokenIndex, outcomeTokenCount, minProfits);
+        refund(profits);
+    }
+
+    /// @dev Short sells outcome tokens with sent Ether, which has to cover the outcome token count, and refunds
+    /// unspent Ether
+    /// @param market Market contract
+    /// @param outcomeTokenIndex Index of the outcome token to short sell
+    /// @param outcomeTokenCount Amount of outcome tokens to short sell
+    /// @param minProfits The minimum profits in Ether to earn for short sold outcome tokens
+    /// @return Returns costs in Ether
+    function shortSell(Market market, uint8 outcomeTokenIndex, uint outcomeTokenCount, uint minProfits)
+        public
+        payable
+        isEtherTokenMarket(market)
+        returns (uint costs)
+    {
+        if (msg.value < outcomeTokenCount)
+            // Sent value does not cover outcome tokens
+            revert();
+        // Wrap Ether and short sell
+        etherToken.deposit.value(msg.value)();
+        if (!etherToken.approve(market, outcomeTokenCount))
+            revert();
+        costs = market.shortSell(outcomeTokenIndex, outcomeTokenCount, minProfits);
+        // Transfer outcome tokens of all other outcomes to buyer
+        Event eventContract = market.eventContract();
+        uint8 outcomeCount = eventContract.getOutcomeCount();
+        for (uint8 i = 0; i < outcomeCount; i++)
+            if (i != outcomeTokenIndex && !eventContract.transferOutcomeTokens(i, msg.sender, outcomeTokenCount))
+                revert();
+        refund(msg.value - costs);
+    }
+
+    /*
+     *  Private functions
+     */
+    /// @dev Unwraps Ether tokens and sends Ether to sender
+    /// @param amount Amount of Ether
+    function refund(uint amount)
+        private
+    {
+        if (amount > 0) {
+            etherToken.withdraw(amount);
+            msg.sender.transfer(amount);
+        }
+    }
+}
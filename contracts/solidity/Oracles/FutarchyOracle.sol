@@ -11,12 +11,13 @@ contract FutarchyOracle is Oracle {
     /*
      *  Storage
      */
+    // Fields are ordered to share slots: creator with deadline and isSet
     address creator;
+    uint64 public deadline;
+    bool public isSet;
     Market[] public markets;
     CategoricalEvent public categoricalEvent;
-    uint public deadline;
     int public outcome;
-    bool public isSet;
 
     /*
      *  Modifiers
@@ -58,15 +59,15 @@ contract FutarchyOracle is Oracle {
     )
         public
     {
-        if (_deadline < now)
-            // Deadline has passed already
+        if (_deadline < now || _deadline >= 2**64)
+            // Deadline has passed already or exceeds storage range
             revert();
         // Create decision event
         categoricalEvent = eventFactory.createCategoricalEvent(collateralToken, this, outcomeCount);
         // Create outcome events
         for (uint8 i=0; i<categoricalEvent.getOutcomeCount(); i++) {
             ScalarEvent scalarEvent = eventFactory.createScalarEvent(
-                categoricalEvent.outcomeTokens(i),
+                Token(address(categoricalEvent.createOutcomeToken(i))),
                 oracle,
                 lowerBound,
                 upperBound
@@ -74,7 +75,7 @@ contract FutarchyOracle is Oracle {
             markets.push(marketFactory.createMarket(scalarEvent, marketMaker, fee));
         }
         creator = _creator;
-        deadline = _deadline;
+        deadline = uint64(_deadline);
     }
 
     /// @dev Funds all markets with equal amount of funding
@@ -125,7 +126,7 @@ contract FutarchyOracle is Oracle {
     {
         outcomeTokenDistribution = new uint[](2);
         for (uint i=0; i<outcomeTokenDistribution.length; i++)
-            outcomeTokenDistribution[i] = market.eventContract().outcomeTokens(i).balanceOf(market);
+            outcomeTokenDistribution[i] = market.eventContract().outcomeTokenBalanceOf(uint8(i), market);
     }
 
     /// @dev Allows to set the oracle outcome based on the market with largest long position
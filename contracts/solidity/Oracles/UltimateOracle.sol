@@ -10,17 +10,18 @@ contract UltimateOracle is Oracle {
     /*
      *  Storage
      */
+    // Fields are ordered to share slots: oracle with spreadMultiplier and all periods with all timestamps
     Oracle public oracle;
-    Token public collateralToken;
     uint8 public spreadMultiplier;
-    uint public challengePeriod;
+    Token public collateralToken;
     uint public challengeAmount;
-    uint public frontRunnerPeriod;
+    uint64 public challengePeriod;
+    uint64 public frontRunnerPeriod;
+    uint64 public outcomeSetTimestamp;
+    uint64 public frontRunnerSetTimestamp;
 
     int public outcome;
-    uint public outcomeSetTimestamp;
     int public frontRunner;
-    uint public frontRunnerSetTimestamp;
 
     uint public totalAmount;
     mapping (int => uint) public totalOutcomeAmounts;
@@ -54,12 +55,15 @@ contract UltimateOracle is Oracle {
             || _frontRunnerPeriod == 0)
             // Values are null
             revert();
+        if (_challengePeriod >= 2**64 || _frontRunnerPeriod >= 2**64)
+            // Periods exceed storage range
+            revert();
         oracle = _oracle;
         collateralToken = _collateralToken;
         spreadMultiplier = _spreadMultiplier;
-        challengePeriod = _challengePeriod;
+        challengePeriod = uint64(_challengePeriod);
         challengeAmount = _challengeAmount;
-        frontRunnerPeriod = _frontRunnerPeriod;
+        frontRunnerPeriod = uint64(_frontRunnerPeriod);
     }
 
     /// @dev Allows to set oracle outcome
@@ -72,7 +76,7 @@ contract UltimateOracle is Oracle {
             // Outcome was set already or cannot be set yet
             revert();
         outcome = oracle.getOutcome();
-        outcomeSetTimestamp = now;
+        outcomeSetTimestamp = uint64(now);
     }
 
     /// @dev Allows to challenge the oracle outcome
@@ -90,7 +94,7 @@ contract UltimateOracle is Oracle {
         totalOutcomeAmounts[_outcome] = challengeAmount;
         totalAmount = challengeAmount;
         frontRunner = _outcome;
-        frontRunnerSetTimestamp = now;
+        frontRunnerSetTimestamp = uint64(now);
     }
 
     /// @dev Allows to challenge the oracle outcome
@@ -114,7 +118,7 @@ contract UltimateOracle is Oracle {
         if (_outcome != frontRunner && totalOutcomeAmounts[_outcome] > totalOutcomeAmounts[frontRunner])
         {
             frontRunner = _outcome;
-            frontRunnerSetTimestamp = now;
+            frontRunnerSetTimestamp = uint64(now);
         }
     }
 
@@ -1,71 +1,122 @@
 pragma solidity 0.4.11;
-import "Tokens/StandardTokenWithOverflowProtection.sol";
 
 
-/// @title Outcome token contract - Issuing and revoking outcome tokens
+/// @title Outcome token ledger contract - Functions to be implemented by events keeping outcome token balances
+contract OutcomeTokenLedger {
+
+    function transferByOutcomeToken(uint8 outcomeTokenIndex, address sender, address to, uint value) public returns (bool);
+    function transferFromByOutcomeToken(uint8 outcomeTokenIndex, address sender, address from, address to, uint value) public returns (bool);
+    function approveByOutcomeToken(uint8 outcomeTokenIndex, address sender, address spender, uint value) public returns (bool);
+    function outcomeTokenBalanceOf(uint8 outcomeTokenIndex, address owner) public constant returns (uint);
+    function outcomeTokenAllowance(uint8 outcomeTokenIndex, address owner, address spender) public constant returns (uint);
+    function outcomeTokenTotalSupply(uint8 outcomeTokenIndex) public constant returns (uint);
+}
+
+
+/// @title Outcome token contract - ERC 20 view on the outcome token balances kept by an event
 /// @author Stefan George - <stefan@gnosis.pm>
-contract OutcomeToken is StandardTokenWithOverflowProtection {
+contract OutcomeToken {
 
     /*
      *  Events
      */
-    event Issue(address indexed owner, uint amount);
-    event Revoke(address indexed owner, uint amount);
+    event Transfer(address indexed from, address indexed to, uint value);
+    event Approval(address indexed owner, address indexed spender, uint value);
 
     /*
      *  Storage
      */
-    address public eventContract;
+    OutcomeTokenLedger public eventContract;
+    uint8 public outcomeTokenIndex;
 
     /*
-     *  Modifiers
+     *  Public functions
      */
-    modifier isEventContract () {
-        if (msg.sender != eventContract)
-            // Only event contract is allowed to proceed
-            revert();
-        _;
+    /// @dev Constructor sets events contract address and outcome index
+    /// @param _outcomeTokenIndex Index of the outcome represented by this token
+    function OutcomeToken(uint8 _outcomeTokenIndex)
+        public
+    {
+        eventContract = OutcomeTokenLedger(msg.sender);
+        outcomeTokenIndex = _outcomeTokenIndex;
     }
 
-    /*
-     *  Public functions
-     */
-    /// @dev Constructor sets events contract address
-    function OutcomeToken()
+    /// @dev Transfers sender's tokens to a given address. Returns success
+    /// @param to Address of token receiver
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transfer(address to, uint value)
         public
+        returns (bool)
     {
-        eventContract = msg.sender;
+        if (!eventContract.transferByOutcomeToken(outcomeTokenIndex, msg.sender, to, value))
+            // Transfer failed
+            revert();
+        Transfer(msg.sender, to, value);
+        return true;
     }
-    
-    /// @dev Events contract issues new tokens for address. Returns success
-    /// @param _for Address of receiver
-    /// @param outcomeTokenCount Number of tokens to issue
-    function issue(address _for, uint outcomeTokenCount)
+
+    /// @dev Allows allowed third party to transfer tokens from one address to another. Returns success
+    /// @param from Address from where tokens are withdrawn
+    /// @param to Address to where tokens are sent
+    /// @param value Number of tokens to transfer
+    /// @return Returns success of function call
+    function transferFrom(address from, address to, uint value)
         public
-        isEventContract
+        returns (bool)
     {
-        if (   !Math.safeToAdd(balances[_for], outcomeTokenCount)
-            || !Math.safeToAdd(totalSupply, outcomeTokenCount))
-            // Overflow operation
+        if (!eventContract.transferFromByOutcomeToken(outcomeTokenIndex, msg.sender, from, to, value))
+            // Transfer failed
             revert();
-        balances[_for] += outcomeTokenCount;
-        totalSupply += outcomeTokenCount;
-        Issue(_for, outcomeTokenCount);
+        Transfer(from, to, value);
+        return true;
     }
 
-    /// @dev Events contract revokes tokens for address. Returns success
-    /// @param _for Address of token holder
-    /// @param outcomeTokenCount Number of tokens to revoke
-    function revoke(address _for, uint outcomeTokenCount)
+    /// @dev Sets approved amount of tokens for spender. Returns success
+    /// @param spender Address of allowed account
+    /// @param value Number of approved tokens
+    /// @return Returns success of function call
+    function approve(address spender, uint value)
         public
-        isEventContract
+        returns (bool)
     {
-        if (   !Math.safeToSubtract(balances[_for], outcomeTokenCount)
-            || !Math.safeToSubtract(totalSupply, outcomeTokenCount))
-            // Overflow operation
+        if (!eventContract.approveByOutcomeToken(outcomeTokenIndex, msg.sender, spender, value))
+            // Approval failed
             revert();
-        balances[_for] -= outcomeTokenCount;
-        totalSupply -= outcomeTokenCount;
-        Revoke(_for, outcomeTokenCount);
+        Approval(msg.sender, spender, value);
+        return true;
+    }
+
+    /// @dev Returns number of allowed tokens for given address
+    /// @param owner Address of token owner
+    /// @param spender Address of token spender
+    /// @return Returns remaining allowance for spender
+    function allowance(address owner, address spender)
+        public
+        constant
+        returns (uint)
+    {
+        return eventContract.outcomeTokenAllowance(outcomeTokenIndex, owner, spender);
+    }
+
+    /// @dev Returns number of tokens owned by given address
+    /// @param owner Address of token owner
+    /// @return Returns balance of owner
+    function balanceOf(address owner)
+        public
+        constant
+        returns (uint)
+    {
+        return eventContract.outcomeTokenBalanceOf(outcomeTokenIndex, owner);
+    }
+
+    /// @dev Returns total number of issued tokens
+    /// @return Returns total supply
+    function totalSupply()
+        public
+        constant
+        returns (uint)
+    {
+        return eventContract.outcomeTokenTotalSupply(outcomeTokenIndex);
     }
 }
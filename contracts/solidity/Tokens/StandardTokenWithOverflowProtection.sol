@@ -1,9 +1,9 @@
 pragma solidity 0.4.11;
 import "Tokens/AbstractToken.sol";
-import "Utils/Math.sol";
 
 
 /// @title Standard token contract with overflow protection - Used for tokens with dynamic supply
+/// Overflow checks are inlined instead of calling the Math library, saving a delegate call per check
 contract StandardTokenWithOverflowProtection is Token {
 
     /*
@@ -24,8 +24,8 @@ contract StandardTokenWithOverflowProtection is Token {
         public
         returns (bool)
     {
-        if (   !Math.safeToSubtract(balances[msg.sender], value)
-            || !Math.safeToAdd(balances[to], value))
+        if (   balances[msg.sender] < value
+            || balances[to] + value < balances[to])
             // Overflow operation
             revert();
         balances[msg.sender] -= value;
@@ -43,9 +43,9 @@ contract StandardTokenWithOverflowProtection is Token {
         public
         returns (bool)
     {
-        if (   !Math.safeToSubtract(balances[from], value)
-            || !Math.safeToSubtract(allowances[from][msg.sender], value)
-            || !Math.safeToAdd(balances[to], value))
+        if (   balances[from] < value
+            || allowances[from][msg.sender] < value
+            || balances[to] + value < balances[to])
             // Overflow operation
             revert();
         balances[from] -= value;
@@ -11,88 +11,107 @@ library Math {
      */
     // This is equal to 1 in our calculations
     uint public constant ONE = 0x10000000000000000;
+    // This is equal to ln(2) in our calculations
+    uint public constant LN2 = 0xb17217f7d1cf79ac;
 
     /*
      *  Public functions
      */
     /// @dev Returns natural exponential function value of given x
-    /// @param x x
+    /// @param x x, less than 192 * LN2
     /// @return Returns e**x
     function exp(uint x)
         public
         constant
         returns (uint)
     {
-        /* This is equivalent to ln(2) */
-        uint ln2 = 0xb17217f7d1cf79ac;
-        uint y = x * ONE / ln2;
-        uint shift = 2**(y / ONE);
-        uint z = y % ONE;
-        uint zpow = z;
+        // Range reduction: e**x = 2**k * e**r with r in [0, ln(2))
+        uint k = x / LN2;
+        if (k > 191)
+            // Result of at least 2**64 * 2**k overflows
+            revert();
+        uint r = x - k * LN2;
+        // Taylor series of e**r in Horner form
         uint result = ONE;
-        result += 0xb172182739bc0e46 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x3d7f78a624cfb9b5 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0xe359bcfeb6e4531 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x27601df2fc048dc * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x5808a728816ee8 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x95dedef350bc9 * zpow / ONE;
-        result += 0x16aee6e8ef;
-        return shift * result;
+        result = ONE + result * r / (14 * ONE);
+        result = ONE + result * r / (13 * ONE);
+        result = ONE + result * r / (12 * ONE);
+        result = ONE + result * r / (11 * ONE);
+        result = ONE + result * r / (10 * ONE);
+        result = ONE + result * r / (9 * ONE);
+        result = ONE + result * r / (8 * ONE);
+        result = ONE + result * r / (7 * ONE);
+        result = ONE + result * r / (6 * ONE);
+        result = ONE + result * r / (5 * ONE);
+        result = ONE + result * r / (4 * ONE);
+        result = ONE + result * r / (3 * ONE);
+        result = ONE + result * r / (2 * ONE);
+        result = ONE + result * r / ONE;
+        // Multiply by 2**k using constant powers of two, k is less than 256
+        if ((k & 128) != 0)
+            result *= 2**128;
+        if ((k & 64) != 0)
+            result *= 2**64;
+        if ((k & 32) != 0)
+            result *= 2**32;
+        if ((k & 16) != 0)
+            result *= 2**16;
+        if ((k & 8) != 0)
+            result *= 2**8;
+        if ((k & 4) != 0)
+            result *= 2**4;
+        if ((k & 2) != 0)
+            result *= 2**2;
+        if ((k & 1) != 0)
+            result *= 2**1;
+        return result;
     }
 
     /// @dev Returns natural logarithm value of given x
-    /// @param x x
+    /// @param x x, at least ONE
     /// @return Returns ln(x)
     function ln(uint x)
         public
         constant
         returns (uint)
     {
-        uint log2e = 0x171547652b82fe177;
-        // binary search for floor(log2(x))
-        uint ilog2 = floorLog2(x);
-        // lagrange interpolation for log2
-        uint z = x / (2**ilog2);
-        uint zpow = ONE;
-        uint const = ONE * 10;
-        uint result = const;
-        result -= 0x443b9c5adb08cc45f * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0xf0a52590f17c71a3f * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x2478f22e787502b023 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x48c6de1480526b8d4c * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x70c18cae824656408c * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x883c81ec0ce7abebb2 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x81814da94fe52ca9f5 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x616361924625d1acf5 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x39f9a16fb9292a608d * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x1b3049a5740b21d65f * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x9ee1408bd5ad96f3e * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x2c465c91703b7a7f4 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x918d2d5f045a4d63 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x14ca095145f44f78 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result -= 0x1d806fc412c1b99 * zpow / ONE;
-        zpow = zpow * z / ONE;
-        result += 0x13950b4e1e89cc * zpow / ONE;
-        return (ilog2 * ONE + result - const) * ONE / log2e;
+        if (x < ONE)
+            // Negative results can't be returned
+            revert();
+        // Range reduction: ln(x) = ilog2 * ln(2) + ln(z) with z in [ONE, 2 * ONE)
+        var (ilog2, z) = reduce(x);
+        // ln(z) = 2 * atanh(t) with t = (z - 1) / (z + 1) in [0, 1/3), summing the odd power series of atanh
+        uint t = (z - ONE) * ONE / (z + ONE);
+        uint t2 = t * t / ONE;
+        uint tpow = t;
+        uint result = t;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 3;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 5;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 7;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 9;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 11;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 13;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 15;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 17;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 19;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 21;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 23;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 25;
+        tpow = tpow * t2 / ONE;
+        result += tpow / 27;
+        return ilog2 * LN2 + 2 * result;
     }
 
     /// @dev Returns base 2 logarithm value of given x
@@ -103,17 +122,7 @@ library Math {
         constant
         returns (uint lo)
     {
-        lo = 0;
-        uint y = x / ONE;
-        uint hi = 191;
-        uint mid = (hi + lo) / 2;
-        while ((lo + 1) != hi) {
-            if (y < 2**mid)
-                hi = mid;
-            else
-                lo = mid;
-            mid = (hi + lo) / 2;
-        }
+        (lo, ) = reduce(x);
     }
 
     /// @dev Returns if an add operation causes an overflow
@@ -137,4 +146,51 @@ library Math {
     {
         return (b <= a);
     }
+
+    /*
+     *  Internal functions
+     */
+    /// @dev Splits x into floor(log2(x / ONE)) and x divided by its power of two, comparing and dividing by constant
+    /// powers of two instead of searching with exponentiations
+    /// @param x x
+    /// @return Returns base 2 logarithm and x / 2**ilog2
+    function reduce(uint x)
+        internal
+        constant
+        returns (uint ilog2, uint z)
+    {
+        z = x;
+        if (z >= ONE * 2**128) {
+            z /= 2**128;
+            ilog2 += 128;
+        }
+        if (z >= ONE * 2**64) {
+            z /= 2**64;
+            ilog2 += 64;
+        }
+        if (z >= ONE * 2**32) {
+            z /= 2**32;
+            ilog2 += 32;
+        }
+        if (z >= ONE * 2**16) {
+            z /= 2**16;
+            ilog2 += 16;
+        }
+        if (z >= ONE * 2**8) {
+            z /= 2**8;
+            ilog2 += 8;
+        }
+        if (z >= ONE * 2**4) {
+            z /= 2**4;
+            ilog2 += 4;
+        }
+        if (z >= ONE * 2**2) {
+            z /= 2**2;
+            ilog2 += 2;
+        }
+        if (z >= ONE * 2**1) {
+            z /= 2**1;
+            ilog2 += 1;
+        }
+    }
 }
@@ -1,5 +1,7 @@
 # contracts package
 from contracts import ROOT_DIR
+from contracts.ethlink import link_bytecode
+from contracts.ethprofiler import EthProfiler
 # ethereum pacakge
 from ethereum import tester as t
 from ethereum.tester import keys, accounts, TransactionFailed, ABIContract
@@ -11,20 +13,24 @@ from os import walk
 import string
 
 
-class AbstractTestContract(TestCase):
+class ContractTester(object):
     """
-    run all tests with python -m unittest discover contracts.tests
+    Compiles and deploys contracts into a tester state. Shared by tests and benchmarks.
     """
 
     HOMESTEAD_BLOCK = 1150000
     CONTRACT_DIR = 'solidity'
+    # compiled dict maps contract paths to unlinked bytecode and abi shared by all tests
+    COMPILED = {}
 
     def __init__(self, *args, **kwargs):
-        super(AbstractTestContract, self).__init__(*args, **kwargs)
+        super(ContractTester, self).__init__(*args, **kwargs)
         self.s = t.state()
         self.solidity = _solidity.solc_wrapper()
         self.s.block.number = self.HOMESTEAD_BLOCK
         t.gas_limit = 4712388
+        # contract names dict maps hex encoded addresses of created contracts to contract names for profiling
+        self.contract_names = {}
 
     @staticmethod
     def is_hex(s):
@@ -40,40 +46,58 @@ class AbstractTestContract(TestCase):
     def contract_at(self, abi, address):
         return ABIContract(self.s, address, abi)
 
-    def create_abi(self, path, libraries=None):
-        path, extra_args = self.get_dirs(path)
+    def get_library_addresses(self, libraries):
+        library_addresses = {}
         if libraries:
             for name, address in libraries.iteritems():
                 if type(address) == str:
                     if self.is_hex(address):
-                        libraries[name] = address
+                        library_addresses[name] = address
                     else:
-                        libraries[name] = address.encode('hex')
+                        library_addresses[name] = address.encode('hex')
                 elif isinstance(address, t.ABIContract):
-                    libraries[name] = address.address.encode('hex')
+                    library_addresses[name] = address.address.encode('hex')
                 else:
                     raise ValueError
-        return ContractTranslator(self.solidity.mk_full_signature(None, path=path, libraries=libraries, extra_args=extra_args))
+        return library_addresses
+
+    def compile(self, path):
+        # contracts are compiled without libraries once and linked for every deployment
+        if path not in self.COMPILED:
+            full_path, extra_args = self.get_dirs(path)
+            combined = self.solidity.combined(None, path=full_path, extra_args=extra_args)
+            self.COMPILED[path] = combined[-1][1]['bin_hex'], combined[-1][1]['abi']
+        return self.COMPILED[path]
+
+    @staticmethod
+    def get_contract_name(path):
+        return path.split('/')[-1].split('.')[0]
+
+    def create_abi(self, path, libraries=None):
+        return ContractTranslator(self.compile(path)[1])
 
     def create_contract(self, path, params=None, libraries=None, sender=None):
-        path, extra_args = self.get_dirs(path)
+        bytecode, abi = self.compile(path)
+        translator = ContractTranslator(abi)
+        bytecode = link_bytecode(bytecode, self.get_library_addresses(libraries)).decode('hex')
         if params:
             params = [x.address if isinstance(x, t.ABIContract) else x for x in params]
-        if libraries:
-            for name, address in libraries.iteritems():
-                if type(address) == str:
-                    if self.is_hex(address):
-                        libraries[name] = address
-                    else:
-                        libraries[name] = address.encode('hex')
-                elif isinstance(address, t.ABIContract):
-                    libraries[name] = address.address.encode('hex')
-                else:
-                    raise ValueError
-        return self.s.abi_contract(None,
-                                   path=path,
-                                   constructor_parameters=params,
-                                   libraries=libraries,
-                                   language='solidity',
-                                   extra_args=extra_args,
-                                   sender=keys[sender if sender else 0])
+            bytecode += translator.encode_constructor_arguments(params)
+        address = self.s.evm(bytecode, sender=keys[sender if sender else 0])
+        self.contract_names[address.encode('hex')] = self.get_contract_name(path)
+        return ABIContract(self.s, translator, address)
+
+    def profile(self, contract, name, *args, **kwargs):
+        """
+        Calls function of contract and returns its result and gas and counts by opcode, contract and function of all
+        executed operations, see EthProfiler. Contracts are identified by the ABIs compiled so far.
+        """
+        contracts = dict((self.get_contract_name(path), abi) for path, (_, abi) in self.COMPILED.items())
+        profiler = EthProfiler(self.s, contracts, self.contract_names)
+        return profiler.profile(getattr(contract, name), *args, address=contract.address.encode('hex'), **kwargs)
+
+
+class AbstractTestContract(ContractTester, TestCase):
+    """
+    run all tests with python -m unittest discover contracts.tests
+    """
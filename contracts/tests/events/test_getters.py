@@ -1,4 +1,4 @@
-from ..abstract_test import AbstractTestContract, accounts
+from ..abstract_test import AbstractTestContract, accounts, TransactionFailed
 
 
 class TestContract(AbstractTestContract):
@@ -11,7 +11,7 @@ class TestContract(AbstractTestContract):
         self.math = self.create_contract('Utils/Math.sol')
         self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
 
     def test(self):
@@ -31,6 +31,16 @@ class TestContract(AbstractTestContract):
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), 0)
         # Validate getters
         self.assertEqual(event.getOutcomeCount(), 2)
-        self.assertEqual(event.getOutcomeTokens(), [event.outcomeTokens(0), event.outcomeTokens(1)])
+        null_address = ''.zfill(40)
+        self.assertEqual(event.getOutcomeTokens(), [null_address, null_address])
+        event.createOutcomeToken(1)
+        self.assertEqual(event.getOutcomeTokens(), [null_address, event.outcomeTokens(1)])
         self.assertEqual(event.getOutcomeTokenDistribution(accounts[buyer]),
                          [collateral_token_count, collateral_token_count])
+        # Outcome count has to fit into uint8
+        self.assertRaises(TransactionFailed, self.event_factory.createCategoricalEvent, self.ether_token.address,
+                          oracle, 256)
+        event = self.contract_at(self.event_factory.createCategoricalEvent(self.ether_token.address, oracle, 255),
+                                 self.event_abi)
+        self.assertEqual(event.getOutcomeCount(), 255)
+        self.assertEqual(event.getOutcomeTokenDistribution(accounts[buyer]), [0] * 255)
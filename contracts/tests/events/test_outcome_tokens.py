@@ -0,0 +1,68 @@
+from ..abstract_test import AbstractTestContract, accounts, keys, TransactionFailed
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.events.test_outcome_tokens
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.event_abi = self.create_abi('Events/AbstractEvent.sol')
+        self.token_abi = self.create_abi('Tokens/OutcomeToken.sol')
+
+    def test(self):
+        # Create event with maximum number of outcomes
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        oracle = self.centralized_oracle_factory.createCentralizedOracle(description_hash)
+        profiling = self.event_factory.createCategoricalEvent(self.ether_token.address, oracle, 255, profiling=True)
+        # Creation fits into a block as no outcome tokens are deployed
+        self.assertLess(profiling['gas'], 4712388)
+        event = self.contract_at(profiling['output'], self.event_abi)
+        null_address = ''.zfill(40)
+        self.assertEqual(event.outcomeTokens(254), null_address)
+        # Buy all outcomes
+        buyer = 0
+        receiver = 1
+        collateral_token_count = 10
+        self.ether_token.deposit(value=collateral_token_count, sender=keys[buyer])
+        self.ether_token.approve(event.address, collateral_token_count, sender=keys[buyer])
+        event.buyAllOutcomes(collateral_token_count, sender=keys[buyer])
+        self.assertEqual(event.outcomeTokenBalanceOf(254, accounts[buyer]), collateral_token_count)
+        # Outcome token view is created on demand
+        outcome_token_address = event.createOutcomeToken(254)
+        self.assertEqual(event.outcomeTokens(254), outcome_token_address)
+        self.assertEqual(event.createOutcomeToken(254), outcome_token_address)
+        outcome_token = self.contract_at(outcome_token_address, self.token_abi)
+        self.assertEqual(outcome_token.outcomeTokenIndex(), 254)
+        self.assertEqual(outcome_token.balanceOf(accounts[buyer]), collateral_token_count)
+        self.assertEqual(outcome_token.totalSupply(), collateral_token_count)
+        # Transfers through view and ledger share balances
+        outcome_token.transfer(accounts[receiver], 4, sender=keys[buyer])
+        self.assertEqual(event.outcomeTokenBalanceOf(254, accounts[receiver]), 4)
+        event.transferOutcomeTokens(254, accounts[receiver], 1, sender=keys[buyer])
+        self.assertEqual(outcome_token.balanceOf(accounts[receiver]), 5)
+        self.assertEqual(outcome_token.balanceOf(accounts[buyer]), collateral_token_count - 5)
+        self.assertEqual(event.outcomeTokenBalanceOf(0, accounts[buyer]), collateral_token_count)
+        # Allowances set through the view are spent through the ledger
+        outcome_token.approve(accounts[receiver], 2, sender=keys[buyer])
+        self.assertEqual(event.outcomeTokenAllowance(254, accounts[buyer], accounts[receiver]), 2)
+        event.transferOutcomeTokensFrom(254, accounts[buyer], accounts[receiver], 2, sender=keys[receiver])
+        self.assertEqual(outcome_token.allowance(accounts[buyer], accounts[receiver]), 0)
+        self.assertRaises(TransactionFailed, outcome_token.transferFrom, accounts[buyer], accounts[receiver], 1,
+                          sender=keys[receiver])
+        # Selling all outcomes is limited by the lowest outcome balance
+        self.assertRaises(TransactionFailed, event.sellAllOutcomes, collateral_token_count, sender=keys[buyer])
+        event.sellAllOutcomes(collateral_token_count - 7, sender=keys[buyer])
+        self.assertEqual(event.outcomeTokenBalanceOf(254, accounts[buyer]), 0)
+        self.assertEqual(event.outcomeTokenBalanceOf(0, accounts[buyer]), 7)
+        self.assertEqual(outcome_token.totalSupply(), 7)
+        # Only views can move tokens on behalf of others
+        self.assertRaises(TransactionFailed, event.transferByOutcomeToken, 0, accounts[buyer], accounts[receiver], 1,
+                          sender=keys[receiver])
+        # Balance too low
+        self.assertRaises(TransactionFailed, event.transferOutcomeTokens, 0, accounts[receiver], 8, sender=keys[buyer])
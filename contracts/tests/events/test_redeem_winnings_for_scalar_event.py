@@ -11,9 +11,8 @@ class TestContract(AbstractTestContract):
         self.math = self.create_contract('Utils/Math.sol')
         self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.event_abi = self.create_abi('Events/ScalarEvent.sol')
-        self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
         self.oracle_abi = self.create_abi('Oracles/CentralizedOracle.sol')
 
     def test(self):
@@ -33,10 +32,8 @@ class TestContract(AbstractTestContract):
         event.buyAllOutcomes(collateral_token_count, sender=keys[buyer])
         self.assertEqual(self.ether_token.balanceOf(event_address), collateral_token_count)
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), 0)
-        outcome_token_1 = self.contract_at(event.outcomeTokens(0), self.token_abi)
-        outcome_token_2 = self.contract_at(event.outcomeTokens(1), self.token_abi)
-        self.assertEqual(outcome_token_1.balanceOf(accounts[buyer]), collateral_token_count)
-        self.assertEqual(outcome_token_2.balanceOf(accounts[buyer]), collateral_token_count)
+        self.assertEqual(event.outcomeTokenBalanceOf(0, accounts[buyer]), collateral_token_count)
+        self.assertEqual(event.outcomeTokenBalanceOf(1, accounts[buyer]), collateral_token_count)
         # Set outcome in oracle contract
         oracle.setOutcome(0)
         self.assertEqual(oracle.getOutcome(), 0)
@@ -47,6 +44,6 @@ class TestContract(AbstractTestContract):
         self.assertTrue(event.isWinningOutcomeSet())
         # Redeem winnings
         self.assertEqual(event.redeemWinnings(sender=keys[buyer]), collateral_token_count)
-        self.assertEqual(outcome_token_1.balanceOf(accounts[buyer]), 0)
-        self.assertEqual(outcome_token_2.balanceOf(accounts[buyer]), 0)
+        self.assertEqual(event.outcomeTokenBalanceOf(0, accounts[buyer]), 0)
+        self.assertEqual(event.outcomeTokenBalanceOf(1, accounts[buyer]), 0)
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), collateral_token_count)
@@ -0,0 +1,69 @@
+from ..abstract_test import AbstractTestContract, keys
+import math
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.market_makers.test_marginal_prices
+    """
+
+    ONE = 2**64
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
+        self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
+        self.event_abi = self.create_abi('Events/AbstractEvent.sol')
+
+    @staticmethod
+    def calc_marginal_prices(outcome_token_distribution, funding):
+        b = funding / math.log(len(outcome_token_distribution))
+        _max = max(outcome_token_distribution)
+        summands = [math.exp((_max - count) / b) for count in outcome_token_distribution]
+        return [summand / sum(summands) for summand in summands]
+
+    def test(self):
+        # Create event
+        outcome_count = 3
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        oracle_address = self.centralized_oracle_factory.createCentralizedOracle(description_hash)
+        event = self.contract_at(self.event_factory.createCategoricalEvent(self.ether_token.address, oracle_address, outcome_count), self.event_abi)
+        # Create market
+        fee = 0  # 0%
+        market = self.contract_at(self.market_factory.createMarket(event.address, self.lmsr.address, fee), self.market_abi)
+        # Fund market
+        investor = 0
+        funding = 10**18
+        self.ether_token.deposit(value=funding, sender=keys[investor])
+        self.ether_token.approve(market.address, funding, sender=keys[investor])
+        market.fund(funding, sender=keys[investor])
+        # All outcomes have the same price
+        marginal_prices, outcome_token_distribution, market_funding = self.lmsr.calcMarginalPrices(market.address)
+        self.assertEqual(outcome_token_distribution, [funding] * outcome_count)
+        self.assertEqual(market_funding, funding)
+        for marginal_price in marginal_prices:
+            self.assertAlmostEqual(float(marginal_price) / self.ONE, 1.0 / outcome_count, places=6)
+        # Buying outcome tokens raises their price
+        trader = 1
+        outcome = 1
+        token_count = 10**18
+        costs = self.lmsr.calcCosts(market.address, outcome, token_count)
+        self.ether_token.deposit(value=costs, sender=keys[trader])
+        self.ether_token.approve(market.address, costs, sender=keys[trader])
+        market.buy(outcome, token_count, costs, sender=keys[trader])
+        marginal_prices, outcome_token_distribution, _ = self.lmsr.calcMarginalPrices(market.address)
+        self.assertEqual(outcome_token_distribution[outcome], funding + costs - token_count)
+        self.assertGreater(marginal_prices[outcome], marginal_prices[0])
+        self.assertAlmostEqual(float(sum(marginal_prices)) / self.ONE, 1, places=6)
+        expected_prices = self.calc_marginal_prices([float(count) for count in outcome_token_distribution], funding)
+        for marginal_price, expected_price in zip(marginal_prices, expected_prices):
+            self.assertAlmostEqual(float(marginal_price) / self.ONE, expected_price, places=4)
+        # Buying a few outcome tokens costs about their marginal price
+        token_count = 10**12
+        costs = self.lmsr.calcCosts(market.address, outcome, token_count)
+        self.assertAlmostEqual(float(costs) / token_count, float(marginal_prices[outcome]) / self.ONE, places=3)
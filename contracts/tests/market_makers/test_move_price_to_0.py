@@ -13,8 +13,7 @@ class TestContract(AbstractTestContract):
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
         self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
         self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
-        self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
 
@@ -51,8 +50,7 @@ class TestContract(AbstractTestContract):
             if profits == 0:
                 break
             # Selling tokens
-            outcome_token = self.contract_at(event.outcomeTokens(outcome), self.token_abi)
-            outcome_token.approve(market.address, token_count, sender=keys[trader])
+            event.approveOutcomeTokens(outcome, market.address, token_count, sender=keys[trader])
             self.assertEqual(market.sell(outcome, token_count, profits, sender=keys[trader]), profits)
         # Selling of tokens is worth less than 1 Wei
         self.assertEqual(profits, 0)
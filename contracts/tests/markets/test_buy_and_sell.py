@@ -13,8 +13,7 @@ class TestContract(AbstractTestContract):
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
         self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
         self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
-        self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
 
@@ -46,14 +45,13 @@ class TestContract(AbstractTestContract):
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), costs)
         self.ether_token.approve(market.address, costs, sender=keys[buyer])
         self.assertEqual(market.buy(outcome, token_count, costs, sender=keys[buyer]), costs)
-        outcome_token = self.contract_at(event.outcomeTokens(outcome), self.token_abi)
-        self.assertEqual(outcome_token.balanceOf(accounts[buyer]), token_count)
+        self.assertEqual(event.outcomeTokenBalanceOf(outcome, accounts[buyer]), token_count)
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), 0)
         # Sell outcome tokens
         outcome_token_profits = self.lmsr.calcProfits(market.address, outcome, token_count)
         fee = market.calcMarketFee(outcome_token_profits)
         profits = outcome_token_profits - fee
-        outcome_token.approve(market.address, token_count, sender=keys[buyer])
+        event.approveOutcomeTokens(outcome, market.address, token_count, sender=keys[buyer])
         self.assertEqual(market.sell(outcome, token_count, profits, sender=keys[buyer]), profits)
-        self.assertEqual(outcome_token.balanceOf(accounts[buyer]), 0)
+        self.assertEqual(event.outcomeTokenBalanceOf(outcome, accounts[buyer]), 0)
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), profits)
@@ -0,0 +1,86 @@
+from ..abstract_test import AbstractTestContract, accounts, keys, TransactionFailed
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.markets.test_buy_and_sell_with_ether
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
+        self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.trader = self.create_contract('Markets/EtherMarketTrader.sol', params=[self.ether_token])
+        self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
+        self.event_abi = self.create_abi('Events/AbstractEvent.sol')
+
+    def test(self):
+        # Create event
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        oracle_address = self.centralized_oracle_factory.createCentralizedOracle(description_hash)
+        event = self.contract_at(self.event_factory.createCategoricalEvent(self.ether_token.address, oracle_address, 2), self.event_abi)
+        # Create market
+        fee = 50000  # 5%
+        market = self.contract_at(self.market_factory.createMarket(event.address, self.lmsr.address, fee), self.market_abi)
+        # Fund market
+        investor = 0
+        funding = 10**18
+        self.ether_token.deposit(value=funding, sender=keys[investor])
+        self.ether_token.approve(market.address, funding, sender=keys[investor])
+        market.fund(funding, sender=keys[investor])
+        # Buy outcome tokens with Ether in three transactions
+        buyer = 1
+        outcome = 0
+        token_count = 10**15
+        costs = self.lmsr.calcCosts(market.address, outcome, token_count)
+        costs += market.calcMarketFee(costs)
+        gas = self.ether_token.deposit(value=costs, sender=keys[buyer], profiling=True)['gas']
+        gas += self.ether_token.approve(market.address, costs, sender=keys[buyer], profiling=True)['gas']
+        gas += market.buy(outcome, token_count, costs, sender=keys[buyer], profiling=True)['gas']
+        self.assertEqual(event.outcomeTokenBalanceOf(outcome, accounts[buyer]), token_count)
+        # Buy outcome tokens with Ether in one transaction, sending more than required
+        costs = self.lmsr.calcCosts(market.address, outcome, token_count)
+        costs += market.calcMarketFee(costs)
+        balance = self.s.block.get_balance(accounts[buyer])
+        profiling = self.trader.buy(market.address, outcome, token_count, value=costs * 2, sender=keys[buyer],
+                                    profiling=True)
+        self.assertEqual(profiling['output'], costs)
+        self.assertLess(profiling['gas'], gas)
+        self.assertEqual(event.outcomeTokenBalanceOf(outcome, accounts[buyer]), token_count * 2)
+        # Unspent Ether was refunded
+        self.assertEqual(self.s.block.get_balance(accounts[buyer]), balance - costs - profiling['gas'])
+        self.assertEqual(self.ether_token.balanceOf(self.trader.address), 0)
+        self.assertEqual(self.s.block.get_balance(self.trader.address), 0)
+        # Buying fails if sent Ether does not cover costs
+        costs = self.lmsr.calcCosts(market.address, outcome, token_count)
+        costs += market.calcMarketFee(costs)
+        self.assertRaises(TransactionFailed, self.trader.buy, market.address, outcome, token_count, value=costs - 1,
+                          sender=keys[buyer])
+        # Sell outcome tokens for Ether
+        profits = self.lmsr.calcProfits(market.address, outcome, token_count)
+        profits -= market.calcMarketFee(profits)
+        event.approveOutcomeTokens(outcome, self.trader.address, token_count, sender=keys[buyer])
+        balance = self.s.block.get_balance(accounts[buyer])
+        profiling = self.trader.sell(market.address, outcome, token_count, profits, sender=keys[buyer],
+                                     profiling=True)
+        self.assertEqual(profiling['output'], profits)
+        self.assertEqual(event.outcomeTokenBalanceOf(outcome, accounts[buyer]), token_count)
+        self.assertEqual(self.s.block.get_balance(accounts[buyer]), balance + profits - profiling['gas'])
+        self.assertEqual(self.ether_token.balanceOf(self.trader.address), 0)
+        # Short sell outcome tokens with Ether
+        opposite_outcome = 1
+        outcome_token_profits = self.lmsr.calcProfits(market.address, outcome, token_count)
+        outcome_token_profits -= market.calcMarketFee(outcome_token_profits)
+        balance = self.s.block.get_balance(accounts[buyer])
+        profiling = self.trader.shortSell(market.address, outcome, token_count, outcome_token_profits,
+                                          value=token_count, sender=keys[buyer], profiling=True)
+        costs = token_count - outcome_token_profits
+        self.assertEqual(profiling['output'], costs)
+        self.assertEqual(event.outcomeTokenBalanceOf(opposite_outcome, accounts[buyer]), token_count)
+        self.assertEqual(self.s.block.get_balance(accounts[buyer]), balance - costs - profiling['gas'])
+        self.assertEqual(self.ether_token.balanceOf(self.trader.address), 0)
+        self.assertEqual(event.outcomeTokenBalanceOf(opposite_outcome, self.trader.address), 0)
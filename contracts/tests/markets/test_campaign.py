@@ -1,4 +1,4 @@
-from ..abstract_test import AbstractTestContract, accounts, keys
+from ..abstract_test import AbstractTestContract, accounts, keys, TransactionFailed
 
 
 class TestContract(AbstractTestContract):
@@ -14,7 +14,7 @@ class TestContract(AbstractTestContract):
         self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
         self.campaign_factory = self.create_contract('Markets/CampaignFactory.sol')
         self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
         self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
@@ -30,6 +30,9 @@ class TestContract(AbstractTestContract):
         fee = 50000  # 5%
         funding = 10**18
         deadline = self.s.block.timestamp + 60*60  # in 1h
+        # Deadline is stored in 64 bits
+        self.assertRaises(TransactionFailed, self.campaign_factory.createCampaigns, event.address,
+                          self.market_factory.address, self.lmsr.address, fee, funding, 2**64)
         campaign = self.contract_at(self.campaign_factory.createCampaigns(event.address, self.market_factory.address,
                                                                           self.lmsr.address, fee, funding, deadline),
                                     self.campaign_abi)
@@ -13,8 +13,7 @@ class TestContract(AbstractTestContract):
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
         self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
         self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
-        self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
 
@@ -47,5 +46,4 @@ class TestContract(AbstractTestContract):
         self.ether_token.approve(market.address, token_count, sender=keys[buyer])
         self.assertEqual(market.shortSell(outcome, token_count, outcome_token_profits - fee, sender=keys[buyer]), costs)
         self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), token_count - costs)
-        outcome_token = self.contract_at(event.outcomeTokens(opposite_outcome), self.token_abi)
-        self.assertEqual(outcome_token.balanceOf(accounts[buyer]), token_count)
+        self.assertEqual(event.outcomeTokenBalanceOf(opposite_outcome, accounts[buyer]), token_count)
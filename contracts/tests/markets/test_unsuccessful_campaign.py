@@ -14,7 +14,7 @@ class TestContract(AbstractTestContract):
         self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
         self.campaign_factory = self.create_contract('Markets/CampaignFactory.sol')
         self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.token_abi = self.create_abi('Tokens/AbstractToken.sol')
         self.event_abi = self.create_abi('Events/AbstractEvent.sol')
         self.oracle_abi = self.create_abi('Oracles/CentralizedOracle.sol')
@@ -8,8 +8,7 @@ class TestContract(AbstractTestContract):
 
     def __init__(self, *args, **kwargs):
         super(TestContract, self).__init__(*args, **kwargs)
-        self.math = self.create_contract('Utils/Math.sol')
-        self.ether_token = self.create_contract('Tokens/EtherToken.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
         self.ultimate_oracle_factory = self.create_contract('Oracles/UltimateOracleFactory.sol')
         self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
         self.ultimate_oracle_abi = self.create_abi('Oracles/UltimateOracle.sol')
@@ -24,6 +23,10 @@ class TestContract(AbstractTestContract):
         challenge_period = 200  # 200s
         challenge_amount = 100  # 100 Wei
         front_runner_period = 50  # 50s
+        # Periods are stored in 64 bits
+        self.assertRaises(TransactionFailed, self.ultimate_oracle_factory.createUltimateOracle,
+                          centralized_oracle.address, self.ether_token.address, spread_multiplier, 2**64,
+                          challenge_amount, front_runner_period)
         ultimate_oracle = self.contract_at(
             self.ultimate_oracle_factory.createUltimateOracle(centralized_oracle.address, self.ether_token.address,
                                                               spread_multiplier, challenge_period, challenge_amount,
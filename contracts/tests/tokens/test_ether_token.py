@@ -0,0 +1,44 @@
+from ..abstract_test import AbstractTestContract, accounts, keys, TransactionFailed
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.tokens.test_ether_token
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+
+    def test(self):
+        holder = 0
+        receiver = 1
+        spender = 2
+        amount = 1000
+        # Issue tokens
+        self.ether_token.deposit(value=amount, sender=keys[holder])
+        self.assertEqual(self.ether_token.balanceOf(accounts[holder]), amount)
+        self.assertEqual(self.ether_token.totalSupply(), amount)
+        # Transfer more than balance fails
+        self.assertRaises(TransactionFailed, self.ether_token.transfer, accounts[receiver], amount + 1,
+                          sender=keys[holder])
+        self.assertTrue(self.ether_token.transfer(accounts[receiver], amount / 2, sender=keys[holder]))
+        self.assertEqual(self.ether_token.balanceOf(accounts[holder]), amount / 2)
+        self.assertEqual(self.ether_token.balanceOf(accounts[receiver]), amount / 2)
+        # Transfer more than allowance fails
+        self.ether_token.approve(accounts[spender], amount / 4, sender=keys[holder])
+        self.assertRaises(TransactionFailed, self.ether_token.transferFrom, accounts[holder], accounts[receiver],
+                          amount / 4 + 1, sender=keys[spender])
+        self.assertTrue(self.ether_token.transferFrom(accounts[holder], accounts[receiver], amount / 4,
+                                                      sender=keys[spender]))
+        self.assertEqual(self.ether_token.allowance(accounts[holder], accounts[spender]), 0)
+        self.assertEqual(self.ether_token.balanceOf(accounts[receiver]), amount * 3 / 4)
+        # Transfer more than balance fails even if allowance is sufficient
+        self.ether_token.approve(accounts[spender], amount, sender=keys[holder])
+        self.assertRaises(TransactionFailed, self.ether_token.transferFrom, accounts[holder], accounts[receiver],
+                          amount / 4 + 1, sender=keys[spender])
+        # Revoke tokens
+        self.assertRaises(TransactionFailed, self.ether_token.withdraw, amount * 3 / 4 + 1, sender=keys[receiver])
+        self.ether_token.withdraw(amount * 3 / 4, sender=keys[receiver])
+        self.assertEqual(self.ether_token.balanceOf(accounts[receiver]), 0)
+        self.assertEqual(self.ether_token.totalSupply(), amount / 4)
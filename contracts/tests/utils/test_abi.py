@@ -0,0 +1,32 @@
+from ..abstract_test import AbstractTestContract
+from contracts import ROOT_DIR
+import json
+import os
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_abi
+    """
+
+    ABI_DIR = os.path.join(ROOT_DIR, 'abi')
+
+    @staticmethod
+    def normalize(abi):
+        # solc doesn't guarantee the order of ABI entries
+        return sorted(json.dumps(entry, sort_keys=True) for entry in abi)
+
+    def test(self):
+        # ABI files are regenerated with ethabi.py whenever a contract's interface changes
+        contract_dir = os.path.join(ROOT_DIR, self.CONTRACT_DIR)
+        checked = 0
+        for root, _, files in os.walk(contract_dir):
+            for file_name in files:
+                abi_path = os.path.join(self.ABI_DIR, file_name.replace('.sol', '.json'))
+                if not file_name.endswith('.sol') or not os.path.exists(abi_path):
+                    continue
+                path = os.path.relpath(os.path.join(root, file_name), contract_dir)
+                with open(abi_path, 'r') as abi_file:
+                    self.assertEqual(self.normalize(json.load(abi_file)), self.normalize(self.compile(path)[1]), path)
+                checked += 1
+        self.assertEqual(checked, len([f for f in os.listdir(self.ABI_DIR) if f.endswith('.json')]))
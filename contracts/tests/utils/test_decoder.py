@@ -0,0 +1,84 @@
+from ..abstract_test import AbstractTestContract, accounts
+from contracts.ethdecoder import EthDecoder
+from contracts.ethlink import link_bytecode
+from contracts.ethtester import EthTesterRpc
+from ethereum.abi import ContractTranslator
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_decoder
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.rpc = EthTesterRpc()
+        self.sender = '0x' + accounts[0].encode('hex')
+        self.decoder = EthDecoder()
+        self.transactions = []
+
+    def send(self, to_address, data, value=0):
+        response = self.rpc.eth_sendTransaction(self.sender, to_address, value=value, data='0x' + data.encode('hex'))
+        self.assertNotIn('error', response)
+        self.transactions.append({'hash': response['result'], 'from': self.sender, 'to': to_address,
+                                  'value': hex(value), 'input': '0x' + data.encode('hex')})
+        return self.rpc.eth_getTransactionReceipt(response['result'])['result']
+
+    def deploy(self, path, libraries=None):
+        bytecode, abi = self.compile(path)
+        bytecode = link_bytecode(bytecode, dict((name, address[2:]) for name, address in (libraries or {}).items()))
+        return self.send(None, bytecode.decode('hex'))['contractAddress'], ContractTranslator(abi)
+
+    def test(self):
+        math, _ = self.deploy('Utils/Math.sol')
+        event_factory, event_factory_translator = self.deploy('Events/EventFactory.sol', {'Math': math})
+        oracle_factory, oracle_factory_translator = self.deploy('Oracles/CentralizedOracleFactory.sol')
+        ether_token, ether_token_translator = self.deploy('Tokens/EtherToken.sol')
+        # Created contracts are read from decoded logs
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        receipt = self.send(oracle_factory, oracle_factory_translator.encode('createCentralizedOracle',
+                                                                             [description_hash]))
+        oracle_creation = self.decoder.decode_log(receipt['logs'][0])
+        self.assertEqual(type(oracle_creation).__name__, 'CentralizedOracleCreation')
+        self.assertEqual(oracle_creation.creator, self.sender)
+        self.assertEqual(oracle_creation.descriptionHash, description_hash)
+        oracle = oracle_creation.centralizedOracle
+        receipt = self.send(event_factory, event_factory_translator.encode('createCategoricalEvent',
+                                                                           [ether_token[2:], oracle[2:], 3]))
+        event_creation = self.decoder.decode_log(receipt['logs'][-1])
+        self.assertEqual(type(event_creation).__name__, 'CategoricalEventCreation')
+        self.assertEqual((event_creation.address, event_creation.collateralToken, event_creation.oracle,
+                          event_creation.outcomeCount), (event_factory, ether_token, oracle, 3))
+        receipt = self.send(event_factory, event_factory_translator.encode('createScalarEvent',
+                                                                           [ether_token[2:], oracle[2:], -100, 100]))
+        event_creation = self.decoder.decode_log(receipt['logs'][-1])
+        self.assertEqual(type(event_creation).__name__, 'ScalarEventCreation')
+        self.assertEqual((event_creation.lowerBound, event_creation.upperBound), (-100, 100))
+        # Token transfers
+        amount = 1000
+        receiver = '0x' + accounts[1].encode('hex')
+        self.send(ether_token, ether_token_translator.encode('deposit', []), amount)
+        self.send(ether_token, ether_token_translator.encode('transfer', [receiver[2:], amount / 4]))
+        # Batch of logs only contains known events
+        logs = self.rpc.eth_getLogs({'fromBlock': '0x0'})['result']
+        records = self.decoder.decode_logs(logs + [dict(logs[0], topics=['0x' + '00' * 32])])
+        self.assertEqual(len(records), len(logs))
+        self.assertEqual([record.log_index for record in records], [int(log['logIndex'], 16) for log in logs])
+        deposit, transfer = records[-2:]
+        self.assertEqual((type(deposit).__name__, deposit.sender, deposit.amount), ('Deposit', self.sender, amount))
+        self.assertEqual((type(transfer).__name__, transfer.from_, transfer.to, transfer.value),
+                         ('Transfer', self.sender, receiver, amount / 4))
+        self.assertEqual(transfer.address, ether_token)
+        self.assertEqual(transfer.transaction_hash, self.transactions[-1]['hash'])
+        # Transaction input
+        records = self.decoder.decode_transactions(self.transactions)
+        # contract creations are skipped
+        self.assertEqual(len(records), len(self.transactions) - 4)
+        self.assertEqual([type(record).__name__ for record in records],
+                         ['createCentralizedOracle', 'createCategoricalEvent', 'createScalarEvent', 'deposit',
+                          'transfer'])
+        self.assertEqual(records[3].ether_value, amount)
+        self.assertEqual((records[4].contract, records[4].to, records[4].value), (ether_token, receiver, amount / 4))
+        self.assertEqual(records[2].lowerBound, -100)
+        # Records of the same signature share their type
+        self.assertIs(type(transfer), self.decoder.types['Transfer(address,address,uint256)'])
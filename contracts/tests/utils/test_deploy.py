@@ -0,0 +1,164 @@
+from ..abstract_test import AbstractTestContract, keys
+from contracts import ROOT_DIR
+from contracts.ethdeploy import EthDeploy
+from contracts.ethjournal import DeployJournal
+from contracts.ethnode import start_node, stop_node
+import json
+import os
+import shutil
+import tempfile
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_deploy
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.server = None
+        self.directory = None
+
+    def setUp(self):
+        self.server = start_node(port=0)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        stop_node(self.server)
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def create(self, private_key_path=None, **kwargs):
+        return EthDeploy('http', 'localhost', self.server.server_address[1], 4000000, 20000000000,
+                         '{}/solidity'.format(ROOT_DIR), False, None, private_key_path, **kwargs)
+
+    def process(self, deploy, instructions):
+        with open(self.path('instructions.json'), 'w') as instructions_file:
+            json.dump(instructions, instructions_file)
+        deploy.process(self.path('instructions.json'))
+        return deploy
+
+    def deploy(self, instructions, **kwargs):
+        """Processes instructions against the node and returns the deployment"""
+        return self.process(self.create(**kwargs), instructions)
+
+    @staticmethod
+    def get_token_instructions(amount=10**18):
+        return [
+            {'type': 'deployment', 'file': 'Tokens/EtherToken.sol'},
+            {'type': 'transaction', 'to': 'EtherToken', 'name': 'deposit', 'value': amount},
+            # Withdrawing all tokens clears balance and total supply, so refunds halve the gas used
+            {'type': 'transaction', 'to': 'EtherToken', 'name': 'withdraw', 'params': [amount]},
+            {'type': 'call', 'to': 'EtherToken', 'name': 'totalSupply', 'assertion': 0}
+        ]
+
+    def test_gas_plan(self):
+        instructions = self.get_token_instructions()
+        self.deploy(instructions, dry_run=True, gas_plan_path=self.path('plan.json'))
+        with open(self.path('plan.json'), 'r') as plan_file:
+            plan = json.load(plan_file)
+        withdrawal = plan['instructions'][2]
+        self.assertEqual(withdrawal['index'], 2)
+        # Gas used after refunds with the default margin is not enough gas
+        self.assertLess(int(withdrawal['gas_used'] * 1.2), withdrawal['gas'])
+        deploy = self.deploy(instructions, gas_plan_path=self.path('plan.json'))
+        self.assertEqual(deploy.total_gas, plan['total_gas'])
+
+    def test_resume(self):
+        instructions = self.get_token_instructions()
+        total_gas = self.deploy(instructions, dry_run=True).total_gas
+        # Interrupted deployment is resumed with gas of completed instructions counted
+        journal_path = self.path('journal.jsonl')
+        deploy = self.deploy(instructions[:2], journal_path=journal_path)
+        self.assertLess(deploy.total_gas, total_gas)
+        deploy = self.deploy(instructions, journal_path=journal_path)
+        self.assertEqual(deploy.total_gas, total_gas)
+        deploy = self.deploy(instructions, journal_path=journal_path)
+        self.assertEqual(deploy.total_gas, total_gas)
+
+    def test_resume_replaced(self):
+        instructions = self.get_token_instructions()
+        total_gas = self.deploy(instructions, dry_run=True).total_gas
+        journal_path = self.path('journal.jsonl')
+        deploy = self.deploy(instructions[:1], journal_path=journal_path)
+        # Deposit was mined, but its replacement with a bumped gas price was journaled after it
+        token = deploy.references['EtherToken']
+        data = deploy.get_translator(deploy.abis[token]).encode('deposit', []).encode('hex')
+        transaction_hash = deploy.json_rpc.eth_sendTransaction(deploy._from, to_address='0x' + token,
+                                                               value=instructions[1]['value'],
+                                                               data='0x' + data)['result']
+        journal = DeployJournal(journal_path)
+        journal.append(1, instructions[1], DeployJournal.SENT, transaction_hash=transaction_hash)
+        journal.append(1, instructions[1], DeployJournal.SENT, transaction_hash='0x' + '12' * 32)
+        journal.close()
+        journal = DeployJournal(journal_path)
+        self.assertEqual(journal.get_in_flight_transactions(1, instructions[1]), [transaction_hash, '0x' + '12' * 32])
+        journal.close()
+        # Resumed deployment accepts the receipt of the replaced transaction
+        deploy = self.deploy(instructions, journal_path=journal_path)
+        self.assertEqual(deploy.total_gas, total_gas)
+
+    def test_pipeline(self):
+        amount = 10**18
+        instructions = [
+            {'type': 'deployment', 'file': 'Tokens/EtherToken.sol', 'label': 'TokenA'},
+            {'type': 'deployment', 'file': 'Tokens/EtherToken.sol', 'label': 'TokenB'},
+            {'type': 'transaction', 'to': 'TokenB', 'name': 'deposit', 'value': amount},
+            {'type': 'call', 'to': 'TokenB', 'name': 'totalSupply', 'assertion': amount}
+        ]
+        # Instructions are sent before receipts of deployments arrived and receipts match predicted addresses
+        deploy = self.deploy(instructions, pipeline=True)
+        self.assertNotEqual(deploy.references['TokenA'], deploy.references['TokenB'])
+        self.assertEqual(deploy.nonces[deploy._from], deploy.get_nonce())
+
+    def test_nonce_gap(self):
+        with open(self.path('key'), 'w') as key_file:
+            key_file.write(keys[0].encode('hex'))
+        deploy = self.create(self.path('key'), pipeline=True)
+        # Nonce of a rejected transaction was reserved, so the next transaction is rejected until the gap is closed
+        deploy.reserve_nonce(deploy._from)
+        self.process(deploy, self.get_token_instructions())
+        self.assertEqual(deploy.nonces[deploy._from], deploy.get_nonce())
+
+    def test_key_pool(self):
+        with open(self.path('keys.txt'), 'w') as key_pool_file:
+            key_pool_file.write('\n'.join(key.encode('hex') for key in keys[1:3]))
+        funding = 10**18
+        fund_abi = {'type': 'function', 'name': 'fund', 'constant': False, 'payable': False, 'outputs': [],
+                    'inputs': [{'type': 'uint256', 'name': '_funding'}]}
+        funding_abi = {'type': 'function', 'name': 'funding', 'constant': True, 'payable': False, 'inputs': [],
+                       'outputs': [{'type': 'uint256', 'name': ''}]}
+        instructions = [
+            {'type': 'deployment', 'file': 'Utils/Math.sol'},
+            {'type': 'deployment', 'file': 'Events/EventFactory.sol', 'libraries': {'Math': 'Math'}},
+            {'type': 'deployment', 'file': 'Tokens/EtherToken.sol'},
+            {'type': 'deployment', 'file': 'Oracles/CentralizedOracleFactory.sol'},
+            {'type': 'deployment', 'file': 'MarketMakers/LMSRMarketMaker.sol', 'libraries': {'Math': 'Math'}},
+            {'type': 'deployment', 'file': 'Markets/DefaultMarketFactory.sol'}
+        ]
+        # Addresses of contracts created by factories are read by a call before the labelled transaction creates them
+        for factory, name, params, label in [
+            ('CentralizedOracleFactory', 'createCentralizedOracle', ['a' * 32], 'Oracle'),
+            ('EventFactory', 'createCategoricalEvent', ['EtherToken', 'Oracle', 2], 'Event'),
+            ('DefaultMarketFactory', 'createMarket', ['Event', 'LMSRMarketMaker', 0], 'Market')
+        ]:
+            instructions += [
+                {'type': 'call', 'to': factory, 'name': name, 'params': params, 'label': label},
+                {'type': 'transaction', 'to': factory, 'name': name, 'params': params, 'label': label,
+                 'group': label}
+            ]
+        instructions += [
+            # Call waits for pending transactions
+            {'type': 'call', 'to': 'Market', 'abi': funding_abi},
+            {'type': 'transaction', 'to': 'EtherToken', 'name': 'deposit', 'value': funding, 'group': 'Market'},
+            {'type': 'transaction', 'to': 'EtherToken', 'name': 'approve', 'params': ['Market', funding],
+             'group': 'Market'},
+            # Only the market's creator can fund it
+            {'type': 'transaction', 'to': 'Market', 'abi': fund_abi, 'params': [funding]},
+            {'type': 'call', 'to': 'Market', 'abi': funding_abi, 'assertion': funding}
+        ]
+        deploy = self.deploy(instructions, key_pool_path=self.path('keys.txt'))
+        self.assertEqual(sum(stats['transactions'] for stats in deploy.lane_stats.values()), 12)
+        self.assertTrue(all(stats['transactions'] for stats in deploy.lane_stats.values()))
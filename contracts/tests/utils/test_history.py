@@ -0,0 +1,132 @@
+from ..abstract_test import AbstractTestContract, accounts
+from contracts.ethdecoder import EthDecoder
+from contracts.ethhistory import EthHistory, from_int128
+from contracts.ethlink import link_bytecode
+from contracts.ethmath import calc_costs, calc_profits
+from contracts.ethtester import EthTesterRpc
+from ethereum.abi import ContractTranslator
+import shutil
+import tempfile
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_history
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.rpc = EthTesterRpc()
+        self.sender = '0x' + accounts[0].encode('hex')
+        self.decoder = EthDecoder()
+        self.directory = None
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def send(self, to_address, translator, name, arguments, value=0):
+        data = translator.encode(name, arguments) if translator else name
+        response = self.rpc.eth_sendTransaction(self.sender, to_address, value=value, data='0x' + data.encode('hex'))
+        self.assertNotIn('error', response)
+        receipt = self.rpc.eth_getTransactionReceipt(response['result'])['result']
+        return receipt, self.decoder.decode_logs(receipt['logs'])
+
+    def call(self, to_address, translator, name, arguments):
+        data = '0x' + translator.encode(name, arguments).encode('hex')
+        result = self.rpc.eth_call(to_address, self.sender, data=data)['result']
+        return translator.decode(name, result[2:].decode('hex'))
+
+    def deploy(self, path, libraries=None):
+        bytecode, abi = self.compile(path)
+        bytecode = link_bytecode(bytecode, dict((name, address[2:]) for name, address in (libraries or {}).items()))
+        receipt, _ = self.send(None, None, bytecode.decode('hex'), None)
+        return receipt['contractAddress'], ContractTranslator(abi)
+
+    def test(self):
+        math, _ = self.deploy('Utils/Math.sol')
+        event_factory, event_factory_translator = self.deploy('Events/EventFactory.sol', {'Math': math})
+        oracle_factory, oracle_factory_translator = self.deploy('Oracles/CentralizedOracleFactory.sol')
+        market_factory, market_factory_translator = self.deploy('Markets/DefaultMarketFactory.sol')
+        lmsr, lmsr_translator = self.deploy('MarketMakers/LMSRMarketMaker.sol', {'Math': math})
+        ether_token, ether_token_translator = self.deploy('Tokens/EtherToken.sol')
+        event_translator = ContractTranslator(self.compile('Events/CategoricalEvent.sol')[1])
+        market_translator = ContractTranslator(self.compile('Markets/DefaultMarket.sol')[1])
+        # Create event and market
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        _, records = self.send(oracle_factory, oracle_factory_translator, 'createCentralizedOracle', [description_hash])
+        oracle = records[-1].centralizedOracle
+        outcome_count = 3
+        _, records = self.send(event_factory, event_factory_translator, 'createCategoricalEvent',
+                               [ether_token[2:], oracle[2:], outcome_count])
+        event = records[-1].categoricalEvent
+        _, records = self.send(market_factory, market_factory_translator, 'createMarket',
+                               [event[2:], lmsr[2:], 50000])
+        market = records[-1].market
+        # Fund market
+        funding = 10**18
+        self.send(ether_token, ether_token_translator, 'deposit', [], funding * 2)
+        self.send(ether_token, ether_token_translator, 'approve', [market[2:], funding])
+        self.send(market, market_translator, 'fund', [funding])
+        funded_block = int(self.rpc.eth_blockNumber()['result'], 16)
+        # History is built incrementally
+        history = EthHistory(self.directory)
+        logs = self.rpc.eth_getLogs({'fromBlock': '0x0'})['result']
+        self.assertEqual(history.update(self.decoder.decode_logs(logs), funded_block), 1)
+        distribution = history.markets[market]['distribution']
+        self.assertEqual(distribution, [funding] * outcome_count)
+        # Buy
+        token_count = 10**16
+        costs = self.call(lmsr, lmsr_translator, 'calcCosts', [market[2:], 0, token_count])[0]
+        self.assertEqual(calc_costs(distribution, funding, 0, token_count), costs)
+        self.send(ether_token, ether_token_translator, 'approve', [market[2:], costs * 2])
+        self.send(market, market_translator, 'buy', [0, token_count, costs * 2])
+        # Sell
+        profits = self.call(lmsr, lmsr_translator, 'calcProfits', [market[2:], 0, token_count / 2])[0]
+        self.send(event, event_translator, 'approveOutcomeTokens', [0, market[2:], token_count / 2])
+        self.send(market, market_translator, 'sell', [0, token_count / 2, 0])
+        # Short sell
+        self.send(ether_token, ether_token_translator, 'approve', [market[2:], token_count])
+        self.send(market, market_translator, 'shortSell', [1, token_count, 0])
+        last_block = int(self.rpc.eth_blockNumber()['result'], 16)
+        # Reopened history only adds new blocks
+        history = EthHistory(self.directory)
+        logs = self.rpc.eth_getLogs({'fromBlock': '0x0'})['result']
+        self.assertEqual(history.update(self.decoder.decode_logs(logs), last_block), 3)
+        self.assertEqual(history.update(self.decoder.decode_logs(logs), last_block), 0)
+        columns = history.query(market)
+        self.assertEqual(len(columns['block']), 4)
+        self.assertEqual(list(columns['outcome']), [-1, 0, 0, 1])
+        self.assertEqual(from_int128(columns['token_count']), [0, token_count, -token_count / 2, -token_count])
+        self.assertEqual(from_int128(columns['cost'])[:3], [funding, costs, -profits])
+        fees = from_int128(columns['fee'])
+        self.assertEqual(fees[0], 0)
+        self.assertEqual(fees[1], costs * 50000 / 1000000)
+        self.assertEqual(fees[2], profits * 50000 / 1000000)
+        # Prices and distribution match the market maker exactly
+        marginal_prices, outcome_token_distribution, _ = self.call(lmsr, lmsr_translator, 'calcMarginalPrices',
+                                                                  [market[2:]])
+        self.assertEqual(history.markets[market]['distribution'], outcome_token_distribution)
+        self.assertEqual([int(price) for price in columns['prices'][-1]], marginal_prices)
+        self.assertEqual(calc_profits(outcome_token_distribution, funding, 2, token_count),
+                         self.call(lmsr, lmsr_translator, 'calcProfits', [market[2:], 2, token_count])[0])
+        # Range queries
+        trade_blocks = list(columns['block'][1:])
+        self.assertEqual(list(history.query(market, trade_blocks[0], trade_blocks[1])['block']), trade_blocks[:2])
+        self.assertEqual(len(history.query(market, last_block + 1)['block']), 0)
+        self.assertEqual(list(history.query(market, to_block=funded_block)['outcome']), [-1])
+        # Funding again adds to the funding of the market
+        self.send(ether_token, ether_token_translator, 'deposit', [], funding)
+        self.send(ether_token, ether_token_translator, 'approve', [market[2:], funding])
+        self.send(market, market_translator, 'fund', [funding])
+        refunded_block = int(self.rpc.eth_blockNumber()['result'], 16)
+        logs = self.rpc.eth_getLogs({'fromBlock': '0x0'})['result']
+        self.assertEqual(history.update(self.decoder.decode_logs(logs), refunded_block), 1)
+        self.assertEqual(history.markets[market]['funding'],
+                         self.call(market, market_translator, 'funding', [])[0])
+        self.assertEqual(history.markets[market]['funding'], funding * 2)
+        marginal_prices, _, _ = self.call(lmsr, lmsr_translator, 'calcMarginalPrices', [market[2:]])
+        self.assertEqual([int(price) for price in history.query(market, refunded_block)['prices'][-1]],
+                         marginal_prices)
@@ -0,0 +1,163 @@
+from ..abstract_test import AbstractTestContract, accounts
+from contracts.ethdecoder import EthDecoder
+from contracts.ethkeeper import EthKeeper, MARKET_CREATED, MARKET_CLOSED
+from contracts.ethlink import link_bytecode
+from contracts.ethnode import EthNode
+from ethereum.abi import ContractTranslator
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_keeper
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.node = EthNode()
+        self.rpc = self.node.rpc
+        self.sender = '0x' + accounts[0].encode('hex')
+        self.decoder = EthDecoder()
+        # records list contains decoded logs of all sent transactions
+        self.records = []
+        self.drop_transactions = False
+
+    def request(self, payload):
+        responses = []
+        for request in payload:
+            if self.drop_transactions and request['method'] in ('eth_sendTransaction', 'eth_sendRawTransaction'):
+                # transaction is accepted, but never reaches a block
+                responses.append({'jsonrpc': '2.0', 'id': request['id'], 'result': '0x' + '12' * 32})
+            else:
+                responses.append(self.node.handle(request))
+        return responses
+
+    def send(self, to_address, translator, name, arguments, value=0):
+        data = translator.encode(name, arguments) if translator else name
+        response = self.rpc.eth_sendTransaction(self.sender, to_address, value=value, data='0x' + data.encode('hex'))
+        self.assertNotIn('error', response)
+        receipt = self.rpc.eth_getTransactionReceipt(response['result'])['result']
+        records = self.decoder.decode_logs(receipt['logs'])
+        self.records += records
+        return receipt, records
+
+    def call(self, to_address, translator, name, arguments=None):
+        data = '0x' + translator.encode(name, arguments or []).encode('hex')
+        result = self.rpc.eth_call(to_address, self.sender, data=data)['result']
+        return translator.decode(name, result[2:].decode('hex'))[0]
+
+    def deploy(self, path, libraries=None, params=None):
+        bytecode, abi = self.compile(path)
+        translator = ContractTranslator(abi)
+        bytecode = link_bytecode(bytecode, dict((name, address[2:]) for name, address in (libraries or {}).items()))
+        bytecode = bytecode.decode('hex') + (translator.encode_constructor_arguments(params) if params else '')
+        receipt, _ = self.send(None, None, bytecode, None)
+        return receipt['contractAddress'], translator
+
+    def create_oracle(self, oracle_factory, oracle_factory_translator):
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        _, records = self.send(oracle_factory, oracle_factory_translator, 'createCentralizedOracle', [description_hash])
+        return records[-1].centralizedOracle
+
+    def advance(self, seconds):
+        self.rpc.state.block.timestamp += seconds
+
+    def test(self):
+        math, _ = self.deploy('Utils/Math.sol')
+        event_factory, event_factory_translator = self.deploy('Events/EventFactory.sol', {'Math': math})
+        oracle_factory, oracle_factory_translator = self.deploy('Oracles/CentralizedOracleFactory.sol')
+        market_factory, _ = self.deploy('Markets/DefaultMarketFactory.sol')
+        lmsr, _ = self.deploy('MarketMakers/LMSRMarketMaker.sol', {'Math': math})
+        ether_token, ether_token_translator = self.deploy('Tokens/EtherToken.sol')
+        campaign_factory, campaign_factory_translator = self.deploy('Markets/CampaignFactory.sol')
+        futarchy_factory, futarchy_factory_translator = self.deploy('Oracles/FutarchyOracleFactory.sol',
+                                                                    params=[event_factory[2:]])
+        ultimate_factory, ultimate_factory_translator = self.deploy('Oracles/UltimateOracleFactory.sol')
+        oracle_translator = ContractTranslator(self.compile('Oracles/CentralizedOracle.sol')[1])
+        event_translator = ContractTranslator(self.compile('Events/AbstractEvent.sol')[1])
+        campaign_translator = ContractTranslator(self.compile('Markets/Campaign.sol')[1])
+        futarchy_translator = ContractTranslator(self.compile('Oracles/FutarchyOracle.sol')[1])
+        # Funded campaign of an event resolved by a centralized oracle
+        oracle = self.create_oracle(oracle_factory, oracle_factory_translator)
+        _, records = self.send(event_factory, event_factory_translator, 'createCategoricalEvent',
+                               [ether_token[2:], oracle[2:], 2])
+        event = records[-1].categoricalEvent
+        funding = 10**18
+        deadline = self.rpc.state.block.timestamp + 60*60  # in 1h
+        _, records = self.send(campaign_factory, campaign_factory_translator, 'createCampaigns',
+                               [event[2:], market_factory[2:], lmsr[2:], 50000, funding, deadline])
+        campaign = records[-1].campaign
+        self.send(ether_token, ether_token_translator, 'deposit', [], funding)
+        self.send(ether_token, ether_token_translator, 'approve', [campaign[2:], funding])
+        self.send(campaign, campaign_translator, 'fund', [funding])
+        # Futarchy oracle resolving its decision event at the deadline
+        futarchy_scalar_oracle = self.create_oracle(oracle_factory, oracle_factory_translator)
+        _, records = self.send(futarchy_factory, futarchy_factory_translator, 'createFutarchyOracle',
+                               [ether_token[2:], futarchy_scalar_oracle[2:], 2, -100, 100, market_factory[2:], lmsr[2:],
+                                50000, deadline])
+        futarchy = records[-1].futarchyOracle
+        decision_event = [record.categoricalEvent for record in records
+                          if type(record).__name__ == 'CategoricalEventCreation'][0]
+        # Event resolved by an ultimate oracle after its challenge period
+        ultimate_base_oracle = self.create_oracle(oracle_factory, oracle_factory_translator)
+        challenge_period = 100
+        _, records = self.send(ultimate_factory, ultimate_factory_translator, 'createUltimateOracle',
+                               [ultimate_base_oracle[2:], ether_token[2:], 2, challenge_period, 10, 50])
+        ultimate = records[-1].ultimateOracle
+        _, records = self.send(event_factory, event_factory_translator, 'createCategoricalEvent',
+                               [ether_token[2:], ultimate[2:], 2])
+        ultimate_event = records[-1].categoricalEvent
+        # Keeper tracks all contracts created by factories
+        poll_interval = 10
+        pending_timeout = 3 * poll_interval
+        keeper = EthKeeper(self.request, '0x' + accounts[1].encode('hex'), gas=10**7, poll_interval=poll_interval,
+                           pending_timeout=pending_timeout, clock=lambda: self.rpc.state.block.timestamp)
+        keeper.track_records(self.records)
+        self.assertEqual(len(keeper.jobs), 8)
+        # Funded campaign creates its market, its dropped transaction is resent after the pending timeout
+        self.drop_transactions = True
+        self.assertEqual(keeper.step(), 1)
+        self.drop_transactions = False
+        self.assertEqual(keeper.step(), 0)
+        self.assertEqual(keeper.jobs[campaign]['state'], 'pending')
+        self.advance(pending_timeout)
+        self.assertEqual(keeper.step(), 1)
+        self.assertEqual(keeper.stats['dropped'], 1)
+        self.assertEqual(keeper.step(), 0)
+        self.assertEqual(self.call(campaign, campaign_translator, 'stage'), MARKET_CREATED)
+        self.assertEqual(keeper.jobs[campaign]['state'], 'waiting')
+        # Resolved event and the campaign waiting for it are sent in one step with consecutive nonces
+        self.send(oracle, oracle_translator, 'setOutcome', [1])
+        self.advance(poll_interval)
+        nonce = keeper.nonce
+        self.assertEqual(keeper.step(), 2)
+        self.assertEqual(keeper.nonce, nonce + 2)
+        self.assertTrue(self.call(event, event_translator, 'isWinningOutcomeSet'))
+        self.assertEqual(self.call(campaign, campaign_translator, 'stage'), MARKET_CLOSED)
+        keeper.step()
+        self.assertEqual(keeper.jobs[campaign]['state'], 'done')
+        self.assertEqual(keeper.stats['failed'], 0)
+        # Futarchy oracle waits for its deadline
+        self.assertEqual(keeper.jobs[decision_event]['state'], 'waiting')
+        self.assertEqual(keeper.step(), 0)
+        self.assertFalse(self.call(futarchy, futarchy_translator, 'isOutcomeSet'))
+        self.rpc.state.block.timestamp = deadline
+        self.assertEqual(keeper.step(), 2)
+        self.assertTrue(self.call(futarchy, futarchy_translator, 'isOutcomeSet'))
+        self.assertTrue(self.call(decision_event, event_translator, 'isWinningOutcomeSet'))
+        # Event of the ultimate oracle waits for the challenge period, it is not read before
+        self.send(ultimate_base_oracle, oracle_translator, 'setOutcome', [1])
+        self.advance(poll_interval)
+        self.assertEqual(keeper.step(), 1)
+        keeper.step()
+        self.assertEqual(keeper.jobs[ultimate]['state'], 'done')
+        settles = keeper.jobs[ultimate]['settles']
+        reads = keeper.stats['reads']
+        self.advance(settles - self.rpc.state.block.timestamp - 1)
+        self.assertEqual(keeper.step(), 0)
+        self.assertFalse(self.call(ultimate_event, event_translator, 'isWinningOutcomeSet'))
+        self.advance(1)
+        self.assertEqual(keeper.step(), 1)
+        self.assertTrue(self.call(ultimate_event, event_translator, 'isWinningOutcomeSet'))
+        # besides the woken event only scalar events of the futarchy oracle waiting for their untracked oracle are read
+        self.assertEqual(keeper.stats['reads'] - reads, 2 * 3 + 3)
+        self.assertEqual(keeper.stats['failed'], 0)
@@ -0,0 +1,36 @@
+from ..abstract_test import AbstractTestContract
+from contracts.ethlink import get_library_names, link_bytecode
+from ethereum import tester as t
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_link
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+
+    def test(self):
+        bytecode, abi = self.compile('MarketMakers/LMSRMarketMaker.sol')
+        self.assertEqual(get_library_names(bytecode), {'Math'})
+        # Placeholders are replaced by library address
+        linked_bytecode = link_bytecode(bytecode, {'Math': self.math.address.encode('hex')})
+        self.assertNotIn('_', linked_bytecode)
+        self.assertIn(self.math.address.encode('hex'), linked_bytecode)
+        self.assertEqual(len(linked_bytecode), len(bytecode))
+        self.assertRaises(ValueError, link_bytecode, bytecode, {})
+        # Bytecode compiled once is linked to libraries at different addresses in another state
+        lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.assertIn(self.math.address, self.s.block.get_code(lmsr.address))
+        self.s = t.state()
+        self.s.block.number = self.HOMESTEAD_BLOCK
+        self.create_contract('Utils/Math.sol')
+        math = self.create_contract('Utils/Math.sol')
+        self.assertNotEqual(math.address, self.math.address)
+        other_lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': math})
+        self.assertEqual(self.compile('MarketMakers/LMSRMarketMaker.sol'), (bytecode, abi))
+        code = self.s.block.get_code(other_lmsr.address)
+        self.assertIn(math.address, code)
+        self.assertNotIn(self.math.address, code)
@@ -0,0 +1,44 @@
+from ..abstract_test import AbstractTestContract
+from contracts import ROOT_DIR
+from contracts.ethload import LoadTest
+from contracts.ethnode import start_node, stop_node
+import os
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_load
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.server = None
+        self.cwd = None
+
+    def setUp(self):
+        self.server = start_node(port=0)
+        # load test deploys contracts with paths relative to the contracts directory
+        self.cwd = os.getcwd()
+        os.chdir(ROOT_DIR)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        stop_node(self.server)
+
+    def test(self):
+        trader_count = 3
+        trades = 4
+        load_test = LoadTest('http', 'localhost', self.server.server_address[1], 1000000, 20000000000, trader_count,
+                             trades, 2, 10**15, 10**18, 10**19, 0.1, 0, poll_interval=0)
+        report = load_test.run()
+        self.assertEqual(report['traders'], trader_count)
+        self.assertEqual(report['failed'], 0)
+        # every trade sends its prerequisite transactions and the trade itself
+        trade_types = ('buy', 'sell', 'shortSell')
+        transaction_types = report['transaction_types']
+        self.assertEqual(sum(transaction_types[t]['transactions'] for t in trade_types if t in transaction_types),
+                         trader_count * trades)
+        self.assertEqual(report['transactions'], sum(stats['transactions'] for stats in transaction_types.values()))
+        for stats in transaction_types.values():
+            self.assertLessEqual(stats['latency_p50'], stats['latency_max'])
+            self.assertLessEqual(stats['gas_min'], stats['gas_mean'])
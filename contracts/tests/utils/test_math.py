@@ -1,4 +1,6 @@
-from ..abstract_test import AbstractTestContract
+from ..abstract_test import AbstractTestContract, TransactionFailed
+from contracts.benchmarks.accuracy import sweep, PREVIOUS_MAX_RELATIVE_ERROR, ONE
+from contracts.ethmath import LN2
 import math
 
 
@@ -18,6 +20,23 @@ class TestContract(AbstractTestContract):
         # EXP
         x = 10
         self.assertAlmostEqual(self.math.exp(x * 2 ** 64) / 2.0 ** 64, math.exp(x), places=2)
+        # Results exceeding 256 bits and negative results are rejected
+        self.assertGreater(self.math.exp(192 * LN2 - 1), 2**255)
+        self.assertRaises(TransactionFailed, self.math.exp, 192 * LN2)
+        self.assertRaises(TransactionFailed, self.math.exp, 200 * ONE)
+        self.assertEqual(self.math.ln(ONE), 0)
+        self.assertRaises(TransactionFailed, self.math.ln, ONE - 1)
+        self.assertRaises(TransactionFailed, self.math.ln, 0)
+        # Floor log2
+        self.assertEqual(self.math.floorLog2(ONE - 1), 0)
+        self.assertEqual(self.math.floorLog2(2 * ONE - 1), 0)
+        self.assertEqual(self.math.floorLog2(2 * ONE), 1)
+        self.assertEqual(self.math.floorLog2(2**256 - 1), 191)
+        # Errors across the input domain are lower than before
+        for function in ('exp', 'ln'):
+            result = sweep(self.math, function, 100)
+            self.assertLess(result['max_relative_error'], PREVIOUS_MAX_RELATIVE_ERROR[function] / 1000)
+        self.assertLess(sweep(self.math, 'ln', 100)['max_absolute_error'], 1e-14)
         # Safe to add
         self.assertFalse(self.math.safeToAdd(2**256 - 1, 1))
         self.assertTrue(self.math.safeToAdd(1, 1))
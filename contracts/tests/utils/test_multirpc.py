@@ -0,0 +1,49 @@
+from ..abstract_test import AbstractTestContract
+from contracts.ethmultirpc import MultiEthJsonRpc
+from contracts.ethnode import start_node, stop_node
+
+
+class ErrorJsonRpc:
+    """Answers every request with an error like an unhealthy node"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': 'unhealthy'}}
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_multirpc
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.servers = []
+
+    def setUp(self):
+        self.servers = [start_node(port=0), start_node(port=0)]
+
+    def tearDown(self):
+        for server in self.servers:
+            stop_node(server)
+
+    def test(self):
+        json_rpc = MultiEthJsonRpc(['http://localhost:{}'.format(server.server_address[1])
+                                    for server in self.servers])
+        primary, secondary = json_rpc.endpoints
+        account = json_rpc.eth_accounts()['result'][0]
+        # Error responses fail over to the next endpoint, which excludes the erroring endpoint
+        endpoint_json_rpcs = [endpoint.json_rpc for endpoint in json_rpc.endpoints]
+        primary.json_rpc = ErrorJsonRpc()
+        self.assertNotIn('error', json_rpc.eth_accounts())
+        self.assertIsNotNone(primary.failed_at)
+        self.assertIsNone(secondary.failed_at)
+        # Errors answered by all endpoints are returned
+        secondary.json_rpc = ErrorJsonRpc()
+        self.assertIn('error', json_rpc.eth_blockNumber())
+        for endpoint, endpoint_json_rpc in zip(json_rpc.endpoints, endpoint_json_rpcs):
+            endpoint.json_rpc = endpoint_json_rpc
+            endpoint.failed_at = None
+        # Pending nonce is read from the node transactions are sent to
+        self.assertNotIn('error', json_rpc.eth_sendTransaction(account, to_address=account, value=1))
+        for _ in range(10):
+            self.assertEqual(json_rpc.eth_getTransactionCount(account, default_block='pending')['result'], '0x1')
@@ -0,0 +1,96 @@
+from ..abstract_test import AbstractTestContract, accounts
+from contracts.ethnode import start_node, stop_node
+from ethereum.abi import ContractTranslator
+from ethereum.utils import sha3
+import json
+import urllib2
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_node
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.server = None
+
+    def setUp(self):
+        self.server = start_node(port=0)
+
+    def tearDown(self):
+        stop_node(self.server)
+
+    def request(self, payload):
+        url = 'http://localhost:{}'.format(self.server.server_address[1])
+        request = urllib2.Request(url, json.dumps(payload), {'Content-Type': 'application/json'})
+        return json.loads(urllib2.urlopen(request).read())
+
+    def call(self, method, *params):
+        response = self.request({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': list(params)})
+        self.assertNotIn('error', response)
+        return response['result']
+
+    def deploy(self, bytecode):
+        transaction_hash = self.call('eth_sendTransaction', {'from': '0x' + accounts[0].encode('hex'),
+                                                             'data': '0x' + bytecode})
+        return self.call('eth_getTransactionReceipt', transaction_hash)
+
+    def test(self):
+        sender = '0x' + accounts[0].encode('hex')
+        # Batch request
+        responses = self.request([
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_accounts', 'params': []},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'eth_getTransactionCount', 'params': [sender, 'latest']},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'eth_unknown', 'params': []}
+        ])
+        self.assertEqual([r['id'] for r in responses], [1, 2, 3])
+        self.assertEqual(responses[0]['result'][0], sender)
+        self.assertEqual(responses[1]['result'], '0x0')
+        self.assertEqual(responses[2]['error']['code'], -32601)
+        # Deploy contract
+        bytecode, abi = self.compile('Tokens/EtherToken.sol')
+        ether_token_address = self.deploy(bytecode)['contractAddress']
+        self.assertEqual(self.call('eth_getTransactionCount', sender, 'latest'), '0x1')
+        # Deposit emits a log
+        translator = ContractTranslator(abi)
+        amount = 1000
+        transaction_hash = self.call('eth_sendTransaction', {
+            'from': sender,
+            'to': ether_token_address,
+            'value': hex(amount),
+            'data': '0x' + translator.encode('deposit', []).encode('hex')
+        })
+        receipt = self.call('eth_getTransactionReceipt', transaction_hash)
+        self.assertEqual(receipt['status'], '0x1')
+        self.assertEqual(len(receipt['logs']), 1)
+        topic = '0x' + sha3('Deposit(address,uint256)').encode('hex')
+        logs = self.call('eth_getLogs', {'fromBlock': '0x0', 'address': ether_token_address, 'topics': [topic]})
+        self.assertEqual(logs, receipt['logs'])
+        self.assertEqual(self.call('eth_getLogs', {'fromBlock': '0x0', 'topics': [None, topic]}), [])
+        # Call balance
+        data = '0x' + translator.encode('balanceOf', [sender]).encode('hex')
+        result = self.call('eth_call', {'from': sender, 'to': ether_token_address, 'data': data}, 'latest')
+        self.assertEqual(translator.decode('balanceOf', result[2:].decode('hex'))[0], amount)
+        # Failed transaction is included with all gas used
+        gas = 100000
+        transaction_hash = self.call('eth_sendTransaction', {
+            'from': sender,
+            'to': ether_token_address,
+            'gas': hex(gas),
+            'data': '0x' + translator.encode('withdraw', [amount + 1]).encode('hex')
+        })
+        receipt = self.call('eth_getTransactionReceipt', transaction_hash)
+        self.assertEqual(receipt['status'], '0x0')
+        self.assertEqual(int(receipt['gasUsed'], 16), gas)
+        self.assertEqual(receipt['logs'], [])
+        nonce = self.call('eth_getTransactionCount', sender, 'latest')
+        # Transaction which can't be paid is rejected
+        response = self.request({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_sendTransaction', 'params': [{
+            'from': sender,
+            'to': ether_token_address,
+            'value': hex(10**31).rstrip('L'),
+            'data': '0x' + translator.encode('deposit', []).encode('hex')
+        }]})
+        self.assertIn('error', response)
+        self.assertEqual(self.call('eth_getTransactionCount', sender, 'latest'), nonce)
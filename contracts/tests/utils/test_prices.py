@@ -0,0 +1,51 @@
+from ..abstract_test import AbstractTestContract
+from contracts import ROOT_DIR
+from contracts.ethload import LoadTest
+from contracts.ethnode import start_node, stop_node
+from contracts.ethprices import MarketPriceReader, ONE
+import os
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_prices
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.server = None
+        self.cwd = None
+
+    def setUp(self):
+        self.server = start_node(port=0)
+        # load test deploys contracts with paths relative to the contracts directory
+        self.cwd = os.getcwd()
+        os.chdir(ROOT_DIR)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        stop_node(self.server)
+
+    def test(self):
+        port = self.server.server_address[1]
+        funding = 10**18
+        # Load test setup deploys the framework and a funded market
+        load_test = LoadTest('http', 'localhost', port, 1000000, 20000000000, 0, 0, 2, 10**15, funding, 0, 0.1, 0)
+        load_test.setup()
+        unfunded_market = load_test.create('DefaultMarketFactory', 'createMarket',
+                                           ['LoadEvent', 'LMSRMarketMaker', LoadTest.FEE], 'UnfundedMarket',
+                                           'Markets/DefaultMarket.sol')
+        no_market = '0x' + '12' * 20
+        # Prices of all markets are read in two batch requests
+        reader = MarketPriceReader('http', 'localhost', port, load_test.lmsr, batch_size=2)
+        prices = reader.get_prices([load_test.market, unfunded_market, no_market])
+        self.assertEqual(reader.client.batches, 2)
+        self.assertEqual(sorted(prices.keys()), sorted([load_test.market, unfunded_market, no_market[2:]]))
+        self.assertEqual(prices[load_test.market], {
+            'marginal_prices': [ONE / 2, ONE / 2],
+            'outcome_token_distribution': [funding, funding],
+            'funding': funding
+        })
+        # Markets without funding can't be priced
+        self.assertIsNone(prices[unfunded_market])
+        self.assertIsNone(prices[no_market[2:]])
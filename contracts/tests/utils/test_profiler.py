@@ -0,0 +1,100 @@
+from ..abstract_test import AbstractTestContract, accounts, keys
+from ethereum import tester as t
+from contracts.ethprofiler import EthProfiler
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_profiler
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
+        self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
+        self.event_abi = self.create_abi('Events/CategoricalEvent.sol')
+
+    def test(self):
+        # Create event
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        oracle_address = self.centralized_oracle_factory.createCentralizedOracle(description_hash)
+        event = self.contract_at(self.event_factory.createCategoricalEvent(self.ether_token.address, oracle_address, 2),
+                                 self.event_abi)
+        # Create and fund market
+        fee = 50000  # 5%
+        market = self.contract_at(self.market_factory.createMarket(event.address, self.lmsr.address, fee),
+                                  self.market_abi)
+        investor = 0
+        funding = 10**18
+        self.ether_token.deposit(value=funding, sender=keys[investor])
+        self.ether_token.approve(market.address, funding, sender=keys[investor])
+        market.fund(funding, sender=keys[investor])
+        # Profile short sell
+        buyer = 1
+        outcome = 0
+        token_count = 10**15
+        outcome_token_profits = self.lmsr.calcProfits(market.address, outcome, token_count)
+        fee = market.calcMarketFee(outcome_token_profits)
+        costs = token_count - outcome_token_profits + fee
+        self.ether_token.deposit(value=token_count, sender=keys[buyer])
+        self.ether_token.approve(market.address, token_count, sender=keys[buyer])
+        profiling, profile = self.profile(market, 'shortSell', outcome, token_count, outcome_token_profits - fee,
+                                          sender=keys[buyer], profiling=True)
+        # Profiling doesn't change results
+        self.assertEqual(profiling['output'], costs)
+        self.assertEqual(self.ether_token.balanceOf(accounts[buyer]), token_count - costs)
+        # Traced gas excludes intrinsic transaction gas
+        self.assertGreater(profile['gas'], 0)
+        self.assertLess(profile['gas'], profiling['gas'] - 21000)
+        # Gas is split between nested calls and library calls
+        for function in ('DefaultMarket.shortSell', 'DefaultMarket.sell', 'LMSRMarketMaker.calcProfits',
+                         'CategoricalEvent.buyAllOutcomes', 'EtherToken.transferFrom', 'Math.ln', 'Math.exp'):
+            self.assertGreater(profile['functions'][function]['gas'], 0)
+        for contract in ('DefaultMarket', 'LMSRMarketMaker', 'CategoricalEvent', 'EtherToken', 'Math'):
+            self.assertIn(contract, profile['contracts'])
+        for op in ('CALL', 'DELEGATECALL', 'SSTORE', 'SLOAD'):
+            self.assertGreater(profile['opcodes'][op]['count'], 0)
+        for group in ('opcodes', 'contracts', 'functions', 'stacks'):
+            self.assertEqual(sum(entry['gas'] for entry in profile[group].values()), profile['gas'])
+        # Stacks start with the called function and end with an opcode
+        stacks = EthProfiler.get_folded_stacks(profile)
+        self.assertIn('DefaultMarket.shortSell;DefaultMarket.sell;LMSRMarketMaker.calcProfits;Math.exp;',
+                      '\n'.join(stacks))
+        for line in stacks:
+            stack, gas = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('DefaultMarket.shortSell;'))
+            self.assertIn(stack.split(';')[-1], profile['opcodes'])
+            self.assertGreater(int(gas), 0)
+
+    def deploy_code(self, code):
+        # init code copies the runtime code following it into memory and returns it
+        init = '60{:02x}80600b6000396000f3'.format(len(code) // 2)
+        return self.s.evm((init + code).decode('hex'))
+
+    @staticmethod
+    def call_code(address, gas):
+        # CALL with gas, address and zero value, input and output, the success flag is popped
+        return '6000' * 5 + '73' + address.encode('hex') + '62{:06x}'.format(gas) + 'f1' + '50'
+
+    def test_nested_calls(self):
+        # Operations after nested calls are attributed to the caller, depth is only traced when a frame starts
+        store = '6001600055' + '00'
+        c = self.deploy_code(store)
+        b = self.deploy_code(self.call_code(c, 50000) + store)
+        # second call to c runs out of gas
+        a = self.deploy_code(self.call_code(b, 100000) + self.call_code(c, 100) + store + '00')
+        names = {a.encode('hex'): 'A', b.encode('hex'): 'B', c.encode('hex'): 'C'}
+        _, profile = EthProfiler(self.s, {}, names).profile(self.s.send, t.k0, a, 0, address=a.encode('hex'))
+        stacks = profile['stacks']
+        self.assertEqual(stacks['A.fallback;B.fallback;C.fallback;SSTORE'], {'count': 1, 'gas': 20000})
+        self.assertEqual(stacks['A.fallback;B.fallback;SSTORE'], {'count': 1, 'gas': 20000})
+        self.assertEqual(stacks['A.fallback;SSTORE'], {'count': 1, 'gas': 20000})
+        self.assertEqual(stacks['A.fallback;C.fallback;PUSH1']['count'], 2)
+        self.assertEqual(stacks['A.fallback;CALL']['count'], 2)
+        self.assertEqual(stacks['A.fallback;B.fallback;CALL']['count'], 1)
+        self.assertEqual(profile['functions']['A.fallback']['count'], 2 * 9 + 4)
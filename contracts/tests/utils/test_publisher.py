@@ -0,0 +1,123 @@
+from ..abstract_test import AbstractTestContract, accounts, keys
+from contracts.ethdecoder import EthDecoder
+from contracts.ethnode import EthNode
+from contracts.ethpublisher import EthPublisher, read_outcomes
+from ethereum.abi import ContractTranslator
+from ethereum.utils import sha3
+# signing
+from bitcoin import ecdsa_raw_sign
+import json
+import os
+import tempfile
+
+SEND_METHODS = ('eth_sendTransaction', 'eth_sendRawTransaction')
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_publisher
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.node = EthNode()
+        self.rpc = self.node.rpc
+        self.sender = '0x' + accounts[0].encode('hex')
+        self.decoder = EthDecoder()
+        # id of the send request rejected in every batch and whether all sends are dropped
+        self.rejected_id = None
+        self.drop_sends = False
+
+    @staticmethod
+    def i2b(_integer, zfill=64):
+        return format(_integer, 'x').zfill(zfill).decode('hex')
+
+    def request(self, payload):
+        responses = []
+        rejected = False
+        for request in payload:
+            if request['method'] in SEND_METHODS and (self.drop_sends or rejected):
+                # transaction is accepted, but never reaches a block
+                responses.append({'jsonrpc': '2.0', 'id': request['id'],
+                                  'result': '0x' + sha3(json.dumps(request)).encode('hex')})
+            elif request['method'] in SEND_METHODS and request['id'] == self.rejected_id:
+                rejected = True
+                responses.append({'jsonrpc': '2.0', 'id': request['id'],
+                                  'error': {'code': -32000, 'message': 'transaction rejected'}})
+            else:
+                responses.append(self.node.handle(request))
+        return responses
+
+    def send(self, to_address, translator, name, arguments):
+        data = translator.encode(name, arguments) if translator else name
+        response = self.rpc.eth_sendTransaction(self.sender, to_address, data='0x' + data.encode('hex'))
+        self.assertNotIn('error', response)
+        receipt = self.rpc.eth_getTransactionReceipt(response['result'])['result']
+        return receipt, self.decoder.decode_logs(receipt['logs'])
+
+    def call(self, to_address, translator, name):
+        result = self.rpc.eth_call(to_address, self.sender, data='0x' + translator.encode(name, []).encode('hex'))
+        return translator.decode(name, result['result'][2:].decode('hex'))[0]
+
+    def create_oracle(self, factory, factory_translator, description, signer):
+        description_hash = sha3(description)
+        v, r, s = ecdsa_raw_sign(description_hash, keys[signer])
+        _, records = self.send(factory, factory_translator, 'createSignedMessageOracle',
+                               [description_hash, v, self.i2b(r), self.i2b(s)])
+        return records[-1].signedMessageOracle
+
+    def test(self):
+        bytecode, abi = self.compile('Oracles/SignedMessageOracleFactory.sol')
+        receipt, _ = self.send(None, None, bytecode.decode('hex'), None)
+        factory, factory_translator = receipt['contractAddress'], ContractTranslator(abi)
+        oracle_translator = ContractTranslator(self.compile('Oracles/SignedMessageOracle.sol')[1])
+        signer = 0
+        outcomes = [1, -100, 2**255 - 1, 0, 42]
+        oracles = [self.create_oracle(factory, factory_translator, 'event {}'.format(i), signer)
+                   for i in range(len(outcomes))]
+        other_oracle = self.create_oracle(factory, factory_translator, 'other event', 1)
+        missing_oracle = '0x' + '12' * 20
+        # Outcomes file lists one oracle and outcome per line
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as outcomes_file:
+            outcomes_file.write('# oracle,outcome\n')
+            for oracle, outcome in zip(oracles[:-1], outcomes[:-1]):
+                outcomes_file.write('{},{}\n'.format(oracle, outcome))
+            outcomes_file.write('{},1\n{},1\n'.format(other_oracle[2:].upper(), missing_oracle))
+        pairs = read_outcomes(path)
+        os.remove(path)
+        self.assertEqual(pairs[:len(outcomes) - 1], zip(oracles[:-1], outcomes[:-1]))
+        self.assertEqual(pairs[-2:], [(other_oracle, 1), (missing_oracle, 1)])
+        # Outcomes are signed in two processes and sent from an unlocked account in batches of two
+        publisher = EthPublisher(self.request, keys[signer], '0x' + accounts[2].encode('hex'), processes=2,
+                                 batch_size=2, pipeline_depth=2, poll_interval=0)
+        stats = publisher.publish(pairs)
+        self.assertEqual(stats, {'published': 4, 'already_set': 0, 'unknown': 1, 'wrong_signer': 1, 'failed': 0})
+        for oracle, outcome in zip(oracles, outcomes)[:-1]:
+            self.assertTrue(self.call(oracle, oracle_translator, 'isOutcomeSet'))
+            self.assertEqual(self.call(oracle, oracle_translator, 'getOutcome'), outcome)
+        self.assertFalse(self.call(other_oracle, oracle_translator, 'isOutcomeSet'))
+        # Transactions signed with a private key skip oracles which are already set
+        publisher = EthPublisher(self.request, keys[signer], '0x' + accounts[3].encode('hex'), keys[3], processes=1,
+                                 poll_interval=0)
+        stats = publisher.publish(zip(oracles, outcomes))
+        self.assertEqual(stats, {'published': 1, 'already_set': 4, 'unknown': 0, 'wrong_signer': 0, 'failed': 0})
+        self.assertEqual(self.call(oracles[-1], oracle_translator, 'getOutcome'), outcomes[-1])
+        # Transaction queued behind a rejected nonce in the middle of a batch is not awaited
+        oracles = [self.create_oracle(factory, factory_translator, 'queued event {}'.format(i), signer)
+                   for i in range(3)]
+        self.rejected_id = 1
+        publisher = EthPublisher(self.request, keys[signer], '0x' + accounts[2].encode('hex'), processes=1,
+                                 batch_size=3, poll_interval=0)
+        stats = publisher.publish([(oracle, 1) for oracle in oracles])
+        self.rejected_id = None
+        self.assertEqual(stats, {'published': 1, 'already_set': 0, 'unknown': 0, 'wrong_signer': 0, 'failed': 2})
+        self.assertEqual([self.call(oracle, oracle_translator, 'isOutcomeSet') for oracle in oracles],
+                         [True, False, False])
+        # Dropped transactions are counted as failed after the pending timeout
+        self.drop_sends = True
+        publisher = EthPublisher(self.request, keys[signer], '0x' + accounts[2].encode('hex'), processes=1,
+                                 poll_interval=0, pending_timeout=0)
+        stats = publisher.publish([(oracle, 1) for oracle in oracles[1:]])
+        self.drop_sends = False
+        self.assertEqual(stats, {'published': 0, 'already_set': 0, 'unknown': 0, 'wrong_signer': 0, 'failed': 2})
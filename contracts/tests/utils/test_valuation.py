@@ -0,0 +1,113 @@
+from ..abstract_test import AbstractTestContract, accounts, keys
+from contracts.ethvaluation import EthValuation, calc_scalar_factors
+
+
+class TestContract(AbstractTestContract):
+    """
+    run test with python -m unittest contracts.tests.utils.test_valuation
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestContract, self).__init__(*args, **kwargs)
+        self.math = self.create_contract('Utils/Math.sol')
+        self.event_factory = self.create_contract('Events/EventFactory.sol', libraries={'Math': self.math})
+        self.centralized_oracle_factory = self.create_contract('Oracles/CentralizedOracleFactory.sol')
+        self.market_factory = self.create_contract('Markets/DefaultMarketFactory.sol')
+        self.lmsr = self.create_contract('MarketMakers/LMSRMarketMaker.sol', libraries={'Math': self.math})
+        self.ether_token = self.create_contract('Tokens/EtherToken.sol')
+        self.market_abi = self.create_abi('Markets/DefaultMarket.sol')
+        self.categorical_event_abi = self.create_abi('Events/CategoricalEvent.sol')
+        self.scalar_event_abi = self.create_abi('Events/ScalarEvent.sol')
+        self.oracle_abi = self.create_abi('Oracles/CentralizedOracle.sol')
+
+    def create_oracle(self):
+        description_hash = "d621d969951b20c5cf2008cbfc282a2d496ddfe75a76afe7b6b32f1470b8a449".decode('hex')
+        return self.contract_at(self.centralized_oracle_factory.createCentralizedOracle(description_hash),
+                                self.oracle_abi)
+
+    def buy_all_outcomes(self, event, count, buyer):
+        self.ether_token.deposit(value=count, sender=keys[buyer])
+        self.ether_token.approve(event.address, count, sender=keys[buyer])
+        event.buyAllOutcomes(count, sender=keys[buyer])
+
+    def test(self):
+        buyer = 1
+        # Categorical event with market
+        categorical_oracle = self.create_oracle()
+        categorical_event = self.contract_at(self.event_factory.createCategoricalEvent(
+            self.ether_token.address, categorical_oracle.address, 3), self.categorical_event_abi)
+        fee = 50000  # 5%
+        market = self.contract_at(self.market_factory.createMarket(categorical_event.address, self.lmsr.address, fee),
+                                  self.market_abi)
+        funding = 10**18
+        self.ether_token.deposit(value=funding)
+        self.ether_token.approve(market.address, funding)
+        market.fund(funding)
+        token_count = 10**16
+        costs = self.lmsr.calcCosts(market.address, 0, token_count) * 2
+        self.ether_token.deposit(value=costs, sender=keys[buyer])
+        self.ether_token.approve(market.address, costs, sender=keys[buyer])
+        market.buy(0, token_count, costs, sender=keys[buyer])
+        set_count = 10**15
+        self.buy_all_outcomes(categorical_event, set_count, buyer)
+        # Scalar events resolving below, within and above their bounds
+        scalar_outcomes = [-150, 33, 150]
+        scalar_events = []
+        scalar_oracles = []
+        for _ in scalar_outcomes:
+            oracle = self.create_oracle()
+            event = self.contract_at(self.event_factory.createScalarEvent(self.ether_token.address, oracle.address,
+                                                                          -100, 100), self.scalar_event_abi)
+            self.buy_all_outcomes(event, 1001, buyer)
+            event.transferOutcomeTokens(0, accounts[0], 500, sender=keys[buyer])
+            scalar_events.append(event)
+            scalar_oracles.append(oracle)
+        # Positions are valued by selling to the market before events are settled
+        _, distribution, market_funding = self.lmsr.calcMarginalPrices(market.address)
+        events = [{'outcome_count': 3, 'distribution': distribution, 'funding': market_funding, 'fee': fee}]
+        events += [{'outcome_count': 2, 'lower_bound': -100, 'upper_bound': 100} for _ in scalar_events]
+        valuation = EthValuation(events)
+        balances = [[categorical_event.outcomeTokenBalanceOf(i, accounts[buyer]) for i in range(3)]]
+        balances += [[event.outcomeTokenBalanceOf(i, accounts[buyer]) for i in range(2)] for event in scalar_events]
+        self.assertEqual(balances[0], [token_count + set_count, set_count, set_count])
+        self.assertEqual(balances[1], [501, 1001])
+        event_indexes = range(len(events))
+        values = valuation.calc_values(event_indexes, balances)
+        liquidation_value = 0
+        for outcome, balance in enumerate(balances[0]):
+            profits = self.lmsr.calcProfits(market.address, outcome, balance)
+            liquidation_value += profits - market.calcMarketFee(profits)
+        self.assertEqual(list(values), [liquidation_value, 0, 0, 0])
+        # Settled events are valued by their winnings
+        categorical_oracle.setOutcome(1)
+        categorical_event.setWinningOutcome()
+        valuation.set_winning_outcome(0, 1)
+        for i, (event, oracle, outcome) in enumerate(zip(scalar_events, scalar_oracles, scalar_outcomes)):
+            oracle.setOutcome(outcome)
+            event.setWinningOutcome()
+            valuation.set_winning_outcome(i + 1, outcome)
+        values = valuation.calc_values(event_indexes, balances)
+        winnings = [event.redeemWinnings(sender=keys[buyer]) for event in [categorical_event] + scalar_events]
+        self.assertEqual(list(values), winnings)
+        self.assertEqual(winnings, [set_count, 501, (501 * 3350 + 1001 * 6650) / 10000, 1001])
+        # Winnings of invalid categorical outcomes can't be redeemed
+        valuation.set_winning_outcome(0, 3)
+        self.assertEqual(list(valuation.calc_winnings([0], balances[:1])), [0])
+
+    def test_scalar_bounds(self):
+        buyer = 1
+        lower_bound, upper_bound, outcome = 0, 957 * 10**73, 927 * 10**73
+        # Converted outcome overflows uint16, so factors wrap around like in Solidity
+        self.assertEqual(calc_scalar_factors(outcome, lower_bound, upper_bound), (10005, 2**256 - 5))
+        oracle = self.create_oracle()
+        event = self.contract_at(self.event_factory.createScalarEvent(self.ether_token.address, oracle.address,
+                                                                      lower_bound, upper_bound), self.scalar_event_abi)
+        self.buy_all_outcomes(event, 1001, buyer)
+        event.transferOutcomeTokens(0, accounts[0], 500, sender=keys[buyer])
+        oracle.setOutcome(outcome)
+        event.setWinningOutcome()
+        valuation = EthValuation([{'outcome_count': 2, 'lower_bound': lower_bound, 'upper_bound': upper_bound,
+                                   'winning_outcome': outcome}])
+        winnings = event.redeemWinnings(sender=keys[buyer])
+        self.assertEqual(list(valuation.calc_winnings([0], [[501, 1001]])), [winnings])
+        self.assertEqual(winnings, (501 * 10005 - 1001 * 5) / 10000)